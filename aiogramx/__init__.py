@@ -1,8 +1,24 @@
+from .base import register_all
 from .calendar import Calendar
 from .checkbox import Checkbox
 from .pagination import Paginator
 from .time_selector import TimeSelectorGrid, TimeSelectorModern
 from .keyboard_meta import ReplyKeyboardMeta
+from .context import WidgetContextMiddleware
+from .storage import (
+    BaseStorage,
+    MemoryStorage,
+    StripedMemoryStorage,
+    PerBotStorage,
+    SQLiteStorage,
+    SharedMemoryStorage,
+)
+from .budget import BudgetManager
+from .sharding import ShardRouterMiddleware, shard_of
+from .stripper import KeyboardStripper
+from .ratelimit import ClickLimiter
+from .scheduler import EditScheduler
+from .templates import WidgetTemplate, register_handler
 
 __all__ = [
     "Paginator",
@@ -11,4 +27,20 @@ __all__ = [
     "TimeSelectorGrid",
     "Checkbox",
     "ReplyKeyboardMeta",
+    "register_all",
+    "WidgetContextMiddleware",
+    "BaseStorage",
+    "MemoryStorage",
+    "StripedMemoryStorage",
+    "PerBotStorage",
+    "SQLiteStorage",
+    "SharedMemoryStorage",
+    "BudgetManager",
+    "ShardRouterMiddleware",
+    "shard_of",
+    "KeyboardStripper",
+    "ClickLimiter",
+    "EditScheduler",
+    "WidgetTemplate",
+    "register_handler",
 ]
@@ -1,16 +1,148 @@
+import asyncio
+import functools
+import gc
+import inspect
+import logging
+import os
+import threading
+import weakref
+from contextvars import ContextVar
 from abc import abstractmethod, ABCMeta
-from typing import Optional, TypeVar, Generic, Type, Dict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from aiogram import Router
-from aiogram.types import CallbackQuery
+from aiogram import Bot, Router, Dispatcher
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup
 from aiogram.filters.callback_data import CallbackData
+from aiogram.methods import TelegramMethod
 from flipcache import LRUDict
 
-from aiogramx.utils import gen_key
+from aiogramx.budget import BudgetManager
+from aiogramx.codec import CallbackCodec, CallbackCodecFilter
+from aiogramx.context import WidgetContext, _current_context, get_context
+from aiogramx.expired import expired_cache
+from aiogramx.metrics import metrics, timed
+from aiogramx.ratelimit import ClickLimiter
+from aiogramx.scheduler import EditScheduler
+from aiogramx.sharding import shard_prefix
+from aiogramx.stripper import KeyboardStripper
+from aiogramx.templates import (
+    TEMPLATE_SEP,
+    WidgetTemplate,
+    _building,
+    template_of,
+    templates,
+)
+from aiogramx.storage import (
+    BaseStorage,
+    MemoryStorage,
+    PerBotStorage,
+    pack_state,
+    unpack_state,
+    write_snapshot,
+    read_snapshot,
+)
+from aiogramx.utils import markup_fingerprint
 
+logger = logging.getLogger(__name__)
 
 TCallbackData = TypeVar("TCallbackData", bound=CallbackData)
 TWidget = TypeVar("TWidget", bound="WidgetBase")
+TConfig = TypeVar("TConfig", bound=tuple)
+
+# Expired widget messages by widget class and language
+_expired_texts: Dict[tuple, str] = {}
+
+# Slots copied into per-user views of broadcast widgets, by widget class
+_view_fields: Dict[type, tuple] = {}
+
+# Guards registration flags of widget classes set up from several threads
+_register_lock = threading.Lock()
+
+# Configurations in use, so that equal ones are shared between widget instances
+_configs = LRUDict(max_items=4096)
+
+# Bot API method left to be returned as the webhook reply of the click being handled,
+# see `WidgetBase.use_webhook_replies`
+_webhook_reply: ContextVar[Optional[list]] = ContextVar(
+    "aiogramx_webhook_reply", default=None
+)
+
+# Fingerprints of the keyboards last sent by widgets, by `(widget key, chat_id, message_id)`
+_shown_markups = LRUDict(max_items=10_000)
+
+# Guards `_configs` and `_shown_markups`, used by widgets created and clicked in several threads
+_cache_lock = threading.Lock()
+
+
+def _mark_shown(shown: tuple, fingerprint: int) -> None:
+    """Records the fingerprint of a keyboard sent to a message."""
+    with _cache_lock:
+        _shown_markups[shown] = fingerprint
+
+
+def intern_config(config: TConfig) -> TConfig:
+    """
+    Returns an equal configuration object already in use, or remembers and returns this one.
+
+    Widgets created from the same call site get equal configurations; interning lets thousands
+    of instances share a single object instead of carrying their own copies of texts and flags.
+
+    Args:
+        config (TConfig): Immutable, hashable configuration, usually a `NamedTuple`.
+
+    Returns:
+        TConfig: The shared configuration object.
+    """
+    try:
+        with _cache_lock:
+            shared = _configs.get(config)
+            if shared is None:
+                _configs[config] = shared = config
+    except TypeError:
+        # Unhashable values (e.g. a list passed by the user) cannot be shared
+        return config
+    return shared
+
+
+class ConfigField:
+    """
+    Descriptor exposing a field of the shared `_config` of a widget as an instance attribute.
+
+    Assigning the attribute replaces the widget's configuration with an updated, interned copy,
+    so other widgets sharing the previous configuration are not affected.
+
+    Args:
+        field (Optional[str]): Name of the configuration field. Defaults to the attribute name.
+    """
+
+    def __init__(self, field: Optional[str] = None):
+        self.field = field
+
+    def __set_name__(self, owner, name):
+        if self.field is None:
+            self.field = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return getattr(instance._config, self.field)
+
+    def __set__(self, instance, value):
+        instance._config = intern_config(
+            instance._config._replace(**{self.field: value})
+        )
 
 
 class WidgetMeta(ABCMeta):
@@ -22,10 +154,29 @@ class WidgetMeta(ABCMeta):
 
     This metaclass enforces a contract that each widget must implement a specific structure for callback data.
 
+    It also keeps a registry of all widget classes by qualified name (`"<module>.<qualname>"`,
+    see `_widget_name`), used to restore persisted widgets, and instruments `render_kb`/`process_cb` implementations to record their latency while
+    metrics are enabled.
+
     Raises:
         TypeError: If `_cb` is not defined, not a subclass of `CallbackData`, or missing a `key` attribute.
     """
 
+    widgets: Dict[str, type] = {}
+
+    @staticmethod
+    def lookup(name: str) -> Optional[type]:
+        """
+        Returns the widget class registered under a qualified name. A plain class name is
+        accepted as well, as long as a single registered class has it.
+        """
+        widget_cls = WidgetMeta.widgets.get(name)
+        if widget_cls is None and "." not in name:
+            found = [w for w in WidgetMeta.widgets.values() if w.__name__ == name]
+            if len(found) == 1:
+                widget_cls = found[0]
+        return widget_cls
+
     def __init__(cls, name, bases, namespace, **kwargs):
         super().__init__(name, bases, namespace)
 
@@ -33,6 +184,9 @@ class WidgetMeta(ABCMeta):
         if cls.__name__ == "WidgetBase":
             return
 
+        cls._widget_name = f"{cls.__module__}.{cls.__qualname__}"
+        WidgetMeta.widgets[cls._widget_name] = cls
+
         # Ensure _cb is defined and is a CallbackData subclass
         cb = getattr(cls, "_cb", None)
         if cb is None:
@@ -47,6 +201,29 @@ class WidgetMeta(ABCMeta):
         if "key" not in cb.model_fields:
             raise TypeError(f"{cls.__name__}._cb must define a 'key' attribute.")
 
+        cls._codec = cls._make_codec()
+
+        if metrics.enabled:
+            cls._instrument(True)
+
+    def _instrument(cls, enabled: bool) -> None:
+        """
+        Wraps the class's own `render_kb`/`process_cb` implementations to record their latency,
+        or restores the plain ones, so that disabled metrics add no call overhead.
+
+        Args:
+            enabled (bool): Whether to wrap or unwrap the implementations.
+        """
+        for attr, hist in (("render_kb", "render"), ("process_cb", "process")):
+            fn = cls.__dict__.get(attr)
+            if not callable(fn) or getattr(fn, "__isabstractmethod__", False):
+                continue
+            wrapped = getattr(fn, "__timed__", False)
+            if enabled and not wrapped:
+                setattr(cls, attr, timed(hist, fn))
+            elif not enabled and wrapped:
+                setattr(cls, attr, fn.__wrapped__)
+
 
 class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
     """
@@ -65,29 +242,189 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         TCallbackData: A subclass of `CallbackData` used for routing and identifying interactions.
         TWidget: The type of the widget subclass.
 
+    Storage capacity and expiry can be set with class keyword arguments, which are inherited
+    by subclasses, or later with `configure_storage()`:
+
+        class MyWidget(WidgetBase[MyCB, "MyWidget"], max_items=50_000, ttl=3600):
+            ...
+
+    Built-in widgets keep per-instance state in `__slots__` and their immutable configuration
+    in a shared, interned `_config` object (see `intern_config` and `ConfigField`). Subclasses
+    that do not declare `__slots__` get a regular instance `__dict__`.
+
     Attributes:
-        _registered (bool): Indicates whether this widget class has been registered with a router.
+        _registered (bool): Indicates whether this widget class has been registered with any router.
+        _routers (weakref.WeakSet): Routers this widget class has been registered with.
+        _max_items (int): Capacity of the widget storage.
+        _ttl (Optional[float]): Idle time in seconds after which widgets expire, None if they never do.
+        _per_user (Optional[int]): Maximum number of widgets per `(chat_id, user_id)` owner.
+        _per_message (bool): Whether a message keeps a single widget, see `MemoryStorage`.
+        _eviction (str): Eviction policy of the storage, "lru", "lfu" or "size".
+        _max_bytes (Optional[int]): Memory budget of the storage for the "size" eviction policy.
+        _key_prefix (str): Shard or worker prefix of widget keys, see `set_shard`.
+        _per_bot (bool): Whether widgets of every bot are kept apart, see `PerBotStorage`.
+        _bot_limits (Dict[int, int]): Storage capacities of particular bots by bot id.
+        _limiter (Optional[ClickLimiter]): Per-user click limit, see `limit_clicks`.
+        _approx_size (int): Approximate memory held by an instance in bytes, see `approx_size`.
     """
 
     _cb: TCallbackData
-    _storage: Dict[str, TWidget]
+    _storage: BaseStorage
+    # Name the class is registered and persisted under, `"<module>.<qualname>"`
+    _widget_name: str
     _registered: bool = False
+    _routers: "weakref.WeakSet[Router]"
+    _max_items: int = 1000
+    _ttl: Optional[float] = None
+    _per_user: Optional[int] = None
+    _per_message: bool = False
+    _eviction: str = "lru"
+    _max_bytes: Optional[int] = None
+    _key_prefix: str = ""
+    _per_bot: bool = False
+    _bot_limits: Dict[int, int] = {}
+    _limiter: Optional[ClickLimiter] = None
+    _webhook_replies: bool = False
+    # Remover of keyboards of dropped widgets, see `setup_keyboard_stripper`
+    _stripper: Optional[KeyboardStripper] = None
+    # Queue of keyboard edits of all widget classes, see `setup_edit_scheduler`
+    _edit_scheduler: Optional[EditScheduler] = None
+    _approx_size: int = 256
+    # Instance attributes holding callables, kept when a newer state is loaded
+    _callables: tuple = ("on_select", "on_back")
+    # Instance attributes holding state changed by clicks, kept per user by broadcast widgets
+    # (see `broadcast`) and lost by widgets rebuilt from a template, which are thus not allowed
+    _user_state: tuple = ()
+    # Actions whose outcome depends only on their callback data, like page navigation:
+    # a newer one supersedes a queued one, and repeating the last applied one is a no-op
+    _navigation_actions: frozenset = frozenset()
+    # Maximum number of clicks waiting while another click on the widget is processed
+    _max_queued_clicks: int = 8
 
-    def __init_subclass__(cls, **kwargs):
+    # Callback data codec settings, see `CallbackCodec`. Classes defining a short prefix opt in
+    # to the precompiled format, others are served by `CallbackData` itself
+    _codec: CallbackCodec
+    _cb_action_field: str = "action"
+    _cb_short_prefix: Optional[str] = None
+    _cb_actions: Dict[str, str] = {}
+    _compact_callbacks: bool = False
+
+    # Key, owner `(chat_id, user_id)` and bound message `(chat_id, message_id)` of an instance,
+    # per-user states of a broadcast widget, callback data of the last applied navigation click
+    # and clicks waiting while another one is processed, see `_process_serialized`, or on
+    # broadcast widgets, views of users whose clicks are processed, see `_process_broadcast`
+    __slots__ = ("_key", "_owner", "_message", "_overlays", "_version", "_flight")
+    _key: str
+    _owner: Optional[tuple]
+    _message: Optional[tuple]
+    _overlays: Optional[LRUDict]
+    _version: Optional[str]
+    _flight: Optional[Union[list, Dict[int, "WidgetBase"]]]
+
+    def __init_subclass__(
+        cls,
+        max_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: Optional[bool] = None,
+        eviction: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        per_bot: Optional[bool] = None,
+        **kwargs,
+    ):
         """
         Automatically initializes an LRU-based storage for the widget subclass,
         used to store and retrieve active widget instances.
+
+        Storage options left as None are inherited from the parent class.
+
+        Args:
+            max_items (Optional[int]): Capacity of the storage.
+            ttl (Optional[float]): Idle time in seconds after which widgets expire.
+            per_user (Optional[int]): Maximum number of widgets per `(chat_id, user_id)` owner.
+            per_message (Optional[bool]): Whether a message keeps a single widget.
+            eviction (Optional[str]): Eviction policy, "lru", "lfu" or "size".
+            max_bytes (Optional[int]): Memory budget of the storage in bytes. Implies the
+                "size" eviction policy unless another one is given.
+            per_bot (Optional[bool]): Whether widgets of every bot are kept apart,
+                with the capacity applying to each bot.
         """
         super().__init_subclass__(**kwargs)
+        if max_items is not None:
+            cls._max_items = max_items
+        if ttl is not None:
+            cls._ttl = ttl
+        if per_user is not None:
+            cls._per_user = per_user
+        if per_message is not None:
+            cls._per_message = per_message
+        if max_bytes is not None:
+            cls._max_bytes = max_bytes
+            cls._eviction = "size"
+        if eviction is not None:
+            cls._eviction = eviction
+        if per_bot is not None:
+            cls._per_bot = per_bot
+
         # Auto-define _storage per subclass
-        cls._storage: Dict[str, TWidget] = LRUDict(max_items=1000)
+        cls._storage = cls._make_storage()
+        cls._storage.bind(cls)
+        cls._routers = weakref.WeakSet()
+
+    @classmethod
+    def _make_storage(cls) -> BaseStorage:
+        """Creates the default in-memory storage with the storage options of this class."""
+        options = {"limits": cls._bot_limits} if cls._per_bot else {}
+        storage_cls = PerBotStorage if cls._per_bot else MemoryStorage
+        return storage_cls(
+            **options,
+            max_items=cls._max_items,
+            ttl=cls._ttl,
+            per_user=cls._per_user,
+            per_message=cls._per_message,
+            key_prefix=cls._key_prefix,
+            eviction=cls._eviction,
+            max_bytes=cls._max_bytes,
+        )
 
     def __init__(self):
         """
         Initializes a new widget instance with a unique key and registers it in the class-level storage.
+
+        Under `WidgetContextMiddleware`, the widget remembers the user it is created for. If it is
+        created while handling a callback and the storage keeps a single widget per message, it takes
+        over the key of the widget bound to the callback message.
+
+        Widgets created from a `WidgetTemplate` get the template code appended to their key.
         """
-        self._key = gen_key(self.__class__._storage, length=4)
-        self.__class__._storage[self._key] = self
+        storage = self.__class__._storage.resolve()
+        ctx = get_context()
+        self._overlays = self._version = self._flight = None
+        key = None
+        if ctx is not None:
+            self._owner = ctx.owner
+            self._message = ctx.message
+            key = storage.key_for_message(self._message)
+            if key is not None:
+                # The message gets a new keyboard, not known to be shown yet
+                with _cache_lock:
+                    _shown_markups.pop((key,) + self._message, None)
+        else:
+            self._owner = self._message = None
+
+        building = _building.get()
+        if building is None:
+            key = key or storage.allocate_key()
+        elif building[1] is not None:
+            key = building[1]
+        else:
+            key = key.partition(TEMPLATE_SEP)[0] if key else storage.allocate_key()
+            key = f"{key}{TEMPLATE_SEP}{building[0].code}"
+
+        self._key = key
+        storage.set_nowait(key, self)
+        if metrics.enabled:
+            metrics.widget(self.__class__.__name__).created += 1
 
     @classmethod
     def from_cb(cls: Type[TWidget], callback_data: TCallbackData) -> Optional[TWidget]:
@@ -100,7 +437,806 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         Returns:
             Optional[TWidget]: The corresponding widget instance, if found.
         """
-        return cls._storage.get(callback_data.key)
+        instance = cls._storage.get_nowait(callback_data.key)
+        if metrics.enabled:
+            cls._record_lookup(instance is not None)
+        if instance is None:
+            instance = cls._rehydrate(callback_data.key)
+        return instance
+
+    @classmethod
+    def _rehydrate(cls: Type[TWidget], key: str) -> Optional[TWidget]:
+        """Rebuilds a lost widget created from a template, if the template is registered."""
+        if TEMPLATE_SEP not in key:
+            return None
+        template = template_of(key)
+        if template is None or template.widget_cls._storage is not cls._storage:
+            return None
+        widget = template.rebuild(key)
+        if metrics.enabled:
+            metrics.widget(cls.__name__).rehydrated += 1
+        return widget
+
+    @classmethod
+    def template(
+        cls,
+        name: str,
+        handlers: Optional[Dict[str, Union[str, Callable]]] = None,
+        code: Optional[str] = None,
+        **options: Any,
+    ) -> WidgetTemplate:
+        """
+        Registers a named template of this widget class, whose widgets are rebuilt on click
+        after being evicted or lost in a restart instead of showing the expired notice.
+
+            @register_handler("booking.date")
+            async def on_date(query, date): ...
+
+            booking = Calendar.template("booking", handlers={"on_select": "booking.date"})
+            await message.answer("Pick a date", reply_markup=booking.create().render_kb())
+
+        Args:
+            name (str): Unique template name, the same in every process.
+            handlers (Optional[Dict[str, Union[str, Callable]]]): Callable constructor
+                arguments, as handlers or names registered with `register_handler`.
+            code (Optional[str]): Short code carried in widget keys, derived from the name
+                by default.
+            **options: Other constructor arguments of the widget.
+
+        Returns:
+            WidgetTemplate: The template, whose `create()` makes new widgets.
+
+        Raises:
+            TypeError: If widgets of this class keep state changed by clicks in the instance,
+                like `Checkbox`, which a rebuilt widget would lose.
+            ValueError: If another template is registered under the same code.
+        """
+        template = WidgetTemplate(cls, name, options, handlers=handlers, code=code)
+        existing = templates.get(template.code)
+        if existing is not None and existing.name != name:
+            raise ValueError(
+                f"Template {name!r} has the same code {template.code!r} as "
+                f"{existing.name!r}, pass a distinct code"
+            )
+        templates[template.code] = template
+        return template
+
+    @classmethod
+    def broadcast(
+        cls: Type[TWidget], *args, max_users: int = 100_000, **kwargs
+    ) -> TWidget:
+        """
+        Creates a widget shared by everybody it is sent to, e.g. a poll broadcast to subscribers.
+
+        The single instance holds the configuration and data, so its markup is rendered once and
+        sent to every recipient. State of each user, like `Checkbox` selections, lives in a small
+        overlay created on the first click that changes it. Clicks are served by the handler
+        installed with `register()` or `register_all()`, every user seeing their own state.
+        Up to `max_users` overlays are kept, users whose overlay was dropped start over.
+
+        The widget is neither owned by the user creating it nor bound to their message.
+        It is pinned in its storage (see `BaseStorage.pin`), so it is never evicted or expired
+        and stays until deleted from the storage. Clicks of a user are processed one at a time,
+        clicks of different users concurrently.
+        Broadcast widgets need an in-process storage and are not saved into snapshots.
+
+        Args:
+            *args: Positional arguments of the widget constructor.
+            max_users (int): Maximum number of per-user overlays.
+            **kwargs: Keyword arguments of the widget constructor.
+
+        Returns:
+            TWidget: The shared widget.
+
+        Raises:
+            TypeError: If the storage of this class does not keep live instances.
+        """
+        if not cls._storage.keeps_instances:
+            raise TypeError(
+                f"Broadcast widgets need an in-process storage, "
+                f"not {type(cls._storage).__name__}"
+            )
+
+        ctx = get_context()
+        token = _current_context.set(
+            WidgetContext(bot_id=ctx.bot_id) if ctx is not None else None
+        )
+        try:
+            widget = cls(*args, **kwargs)
+            cls._storage.pin(widget._key)
+        finally:
+            _current_context.reset(token)
+        widget._overlays = LRUDict(max_items=max_users)
+        return widget
+
+    @property
+    def is_broadcast(self) -> bool:
+        """Indicates whether this widget was created with `broadcast()`."""
+        return self._overlays is not None
+
+    def _user_view(self: TWidget, user_id: int) -> TWidget:
+        """Returns a copy of a broadcast widget carrying the state of a user."""
+        cls = self.__class__
+        fields = _view_fields.get(cls)
+        if fields is None:
+            fields = _view_fields[cls] = tuple(
+                name
+                for klass in cls.__mro__
+                for name in klass.__dict__.get("__slots__", ())
+                if name not in ("_overlays", "_flight")
+            )
+
+        view = cls.__new__(cls)
+        for name in fields:
+            setattr(view, name, getattr(self, name))
+        if hasattr(self, "__dict__"):
+            view.__dict__.update(self.__dict__)
+        view._overlays = view._flight = None
+
+        state = self._overlays.get(user_id)
+        if state is not None:
+            names = cls._user_state
+            if len(names) == 1:
+                setattr(view, names[0], state)
+            else:
+                for name, value in zip(names, state):
+                    setattr(view, name, value)
+        return view
+
+    def _save_user_view(self, user_id: int, view: "WidgetBase") -> None:
+        """Keeps the state of a user view as an overlay, unless it equals the shared state."""
+        names = self._user_state
+        # A single state attribute is kept as is, saving a tuple per user
+        if len(names) == 1:
+            state = getattr(view, names[0])
+            shared = getattr(self, names[0])
+        else:
+            state = tuple(getattr(view, name) for name in names)
+            shared = tuple(getattr(self, name) for name in names)
+        if state == shared:
+            self._overlays.pop(user_id, None)
+        else:
+            self._overlays[user_id] = state
+
+    async def _process_broadcast(self, c: CallbackQuery, callback_data) -> None:
+        """
+        Processes a click on a broadcast widget in a view with the state of the user.
+
+        A click arriving while another click of the same user is processed goes to the view
+        in flight and is queued there (see `_process_serialized`), so that it sees the state
+        left by the first one instead of overwriting it.
+        """
+        if not self._user_state:
+            await self.process_cb(c, callback_data)
+            return
+
+        user_id = c.from_user.id
+        views = self._flight
+        if views is None:
+            views = self._flight = {}
+        view = views.get(user_id)
+        if view is not None:
+            await view._process_serialized(c, callback_data)
+            return
+
+        view = views[user_id] = self._user_view(user_id)
+        try:
+            await view._process_serialized(c, callback_data)
+        finally:
+            del views[user_id]
+            self._save_user_view(user_id, view)
+
+    @classmethod
+    def _record_lookup(cls, hit: bool) -> None:
+        m = metrics.widget(cls.__name__)
+        if hit:
+            m.lookup_hits += 1
+        else:
+            m.lookup_misses += 1
+
+    @classmethod
+    def use_storage(cls, storage: BaseStorage) -> None:
+        """
+        Replaces the storage of this widget class, e.g. with a `SQLiteStorage`.
+
+        Subclasses sharing the current storage with this class (like the time selectors)
+        are switched to the new storage as well. Widgets kept in the previous storage are not migrated.
+
+        Args:
+            storage (BaseStorage): The storage to keep widget instances in.
+        """
+        previous = cls._storage
+        owners = [
+            klass
+            for klass in WidgetMeta.widgets.values()
+            if klass.__dict__.get("_storage") is previous
+        ]
+
+        # Bind to the topmost class owning the storage, so that shared storages keep a stable name
+        root = next((k for k in cls.__mro__[::-1] if k in owners), cls)
+        storage.bind(root)
+
+        for klass in {cls, *owners}:
+            klass._storage = storage
+
+    @classmethod
+    def configure_storage(
+        cls,
+        max_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: Optional[bool] = None,
+        key_prefix: Optional[str] = None,
+        eviction: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Changes capacity, expiry, quotas, key prefix and eviction policy of this widget class
+        storage in place.
+
+        Args:
+            max_items (Optional[int]): New capacity. None keeps the current one.
+            ttl (Optional[float]): New idle time in seconds after which widgets expire.
+                None keeps the current value, 0 disables expiry.
+            per_user (Optional[int]): New maximum number of widgets per `(chat_id, user_id)` owner.
+                None keeps the current value, 0 disables the quota.
+            per_message (Optional[bool]): Whether a message keeps a single widget.
+                None keeps the current value.
+            key_prefix (Optional[str]): Shard or worker prefix of new widget keys.
+                None keeps the current one.
+            eviction (Optional[str]): Eviction policy, "lru", "lfu" or "size".
+                None keeps the current one.
+            max_bytes (Optional[int]): Memory budget of the storage in bytes. Implies the
+                "size" eviction policy unless another one is given.
+
+        Raises:
+            TypeError: If the current storage cannot be reconfigured.
+        """
+        configure = getattr(cls._storage, "configure", None)
+        if configure is None:
+            raise TypeError(
+                f"{type(cls._storage).__name__} of {cls.__name__} cannot be reconfigured"
+            )
+
+        configure(
+            max_items=max_items,
+            ttl=ttl,
+            per_user=per_user,
+            per_message=per_message,
+            key_prefix=key_prefix,
+            eviction=eviction,
+            max_bytes=max_bytes,
+        )
+        if max_bytes is not None:
+            cls._max_bytes = max_bytes
+            cls._eviction = "size"
+        if eviction is not None:
+            cls._eviction = eviction
+        if key_prefix is not None:
+            cls._key_prefix = key_prefix
+        if max_items is not None:
+            cls._max_items = max_items
+        if ttl is not None:
+            cls._ttl = ttl or None
+        if per_user is not None:
+            cls._per_user = per_user or None
+        if per_message is not None:
+            cls._per_message = per_message
+
+    def approx_size(self) -> int:
+        """
+        Returns the approximate memory held by this widget in bytes, used by the "size"
+        eviction policy. Widgets holding variable amounts of data override it.
+
+        Returns:
+            int: Approximate size in bytes.
+        """
+        return self._approx_size
+
+    @classmethod
+    def sweep_storage(cls) -> int:
+        """
+        Drops expired widgets from the storages of this class, or of all classes if
+        called on `WidgetBase`.
+
+        Returns:
+            int: Number of dropped widgets.
+        """
+        removed = 0
+        for storage in cls._storages().values():
+            sweep = getattr(storage, "sweep", None)
+            if sweep is not None:
+                removed += sweep()
+        return removed
+
+    @classmethod
+    def setup_sweeper(cls, dispatcher: Dispatcher, interval: float = 60) -> None:
+        """
+        Runs `sweep_storage()` periodically in background while the dispatcher is running.
+
+        Expired widgets are dropped on access anyway; the sweeper releases memory held by
+        abandoned ones on quiet bots.
+
+        Args:
+            dispatcher (aiogram.Dispatcher): The dispatcher whose lifecycle hooks are used.
+            interval (float): Seconds between sweeps.
+        """
+        task: Optional[asyncio.Task] = None
+
+        async def _sweep_loop():
+            while True:
+                await asyncio.sleep(interval)
+                cls.sweep_storage()
+
+        async def _on_startup():
+            nonlocal task
+            task = asyncio.create_task(_sweep_loop())
+
+        async def _on_shutdown():
+            if task is not None:
+                task.cancel()
+
+        dispatcher.startup.register(_on_startup)
+        dispatcher.shutdown.register(_on_shutdown)
+
+    @staticmethod
+    def setup_keyboard_stripper(
+        dispatcher: Dispatcher,
+        bot: Bot,
+        calls_per_tick: int = 5,
+        interval: float = 1.0,
+        busy_updates: Optional[int] = 20,
+        max_pending: int = 10_000,
+        max_messages: int = 100_000,
+    ) -> KeyboardStripper:
+        """
+        Removes keyboards of evicted and expired widgets in background while the dispatcher
+        is running, within a Bot API call budget and only when the bot is not busy.
+        See `KeyboardStripper` for the meaning of the arguments.
+
+        Applies to storages of all widget classes defined by dispatcher startup.
+
+        Args:
+            dispatcher (aiogram.Dispatcher): The dispatcher whose lifecycle hooks are used.
+            bot (aiogram.Bot): The bot that sent the widget messages.
+
+        Returns:
+            KeyboardStripper: The stripper, e.g. to inspect its pending messages.
+        """
+        stripper = KeyboardStripper(
+            bot,
+            calls_per_tick=calls_per_tick,
+            interval=interval,
+            busy_updates=busy_updates,
+            max_pending=max_pending,
+            max_messages=max_messages,
+        )
+        dispatcher.update.outer_middleware(stripper)
+        task: Optional[asyncio.Task] = None
+
+        async def _on_startup():
+            nonlocal task
+            WidgetBase._stripper = stripper
+            for storage in WidgetBase._storages().values():
+                storage.set_eviction_hook(stripper.on_evict)
+            task = asyncio.create_task(stripper.run())
+
+        async def _on_shutdown():
+            if task is not None:
+                task.cancel()
+            if WidgetBase._stripper is stripper:
+                WidgetBase._stripper = None
+            for storage in WidgetBase._storages().values():
+                storage.set_eviction_hook(None)
+
+        dispatcher.startup.register(_on_startup)
+        dispatcher.shutdown.register(_on_shutdown)
+        return stripper
+
+    @staticmethod
+    def setup_edit_scheduler(
+        dispatcher: Dispatcher,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        max_pending: int = 10_000,
+    ) -> EditScheduler:
+        """
+        Sends keyboard edits of all widgets through a rate-limited queue while the dispatcher is
+        running, keeping only the latest keyboard of every message. See `EditScheduler` for the
+        meaning of the arguments. Its queue depth, edit counts and wait times are reported
+        in widget metrics.
+
+        Args:
+            dispatcher (aiogram.Dispatcher): The dispatcher whose lifecycle hooks are used.
+
+        Returns:
+            EditScheduler: The scheduler, e.g. to inspect its queue.
+        """
+        scheduler = EditScheduler(
+            global_rate=global_rate,
+            chat_rate=chat_rate,
+            chat_burst=chat_burst,
+            max_pending=max_pending,
+        )
+        task: Optional[asyncio.Task] = None
+
+        async def _on_startup():
+            nonlocal task
+            WidgetBase._edit_scheduler = scheduler
+            task = asyncio.create_task(scheduler.run())
+
+        async def _on_shutdown():
+            if WidgetBase._edit_scheduler is scheduler:
+                WidgetBase._edit_scheduler = None
+            if task is not None:
+                task.cancel()
+
+        dispatcher.startup.register(_on_startup)
+        dispatcher.shutdown.register(_on_shutdown)
+        return scheduler
+
+    @staticmethod
+    def set_shard(shard: int, shards: int) -> None:
+        """
+        Makes keys of widgets created by this worker start with its shard id, for deployments
+        running several workers without a shared storage.
+
+        A front proxy or `ShardRouterMiddleware` then reads the owning worker from any widget
+        callback data with `shard_of()` and routes the click there. Applies to in-memory storages
+        of all widget classes, including the ones defined later. Widgets already created keep
+        their keys.
+
+        Args:
+            shard (int): Id of this worker, from 0 to `shards - 1`.
+            shards (int): Number of workers, the same in every worker and in the router.
+        """
+        prefix = shard_prefix(shard, shards)
+        WidgetBase._key_prefix = prefix
+        for storage in WidgetBase._storages().values():
+            if getattr(storage, "configure", None) is not None:
+                storage.widget_cls.configure_storage(key_prefix=prefix)
+
+    @staticmethod
+    def use_per_bot_storage(limits: Optional[Dict[int, int]] = None) -> None:
+        """
+        Keeps widgets of every bot apart, for a process serving many bot tokens.
+
+        In-memory storages of all widget classes, including the ones defined later, are replaced
+        with `PerBotStorage` namespaces with the same options, their capacity applying to each bot.
+        Requires `WidgetContextMiddleware`. Meant to be called on startup, widgets already created
+        are dropped.
+
+        Args:
+            limits (Optional[Dict[int, int]]): Capacities of particular bots by bot id,
+                applied to every widget class.
+        """
+        WidgetBase._per_bot = True
+        WidgetBase._bot_limits = dict(limits or {})
+        for storage in WidgetBase._storages().values():
+            if type(storage) is MemoryStorage:
+                storage.widget_cls.use_storage(storage.widget_cls._make_storage())
+            elif isinstance(storage, PerBotStorage):
+                for bot_id, max_items in WidgetBase._bot_limits.items():
+                    storage.set_limit(bot_id, max_items)
+
+    @staticmethod
+    def setup_budget(
+        dispatcher: Dispatcher,
+        total_items: int,
+        interval: float = 60,
+        min_items: int = 100,
+        expired_weight: float = 4.0,
+    ) -> "BudgetManager":
+        """
+        Shares a single widget budget between the storages of all widget classes,
+        rebalancing their capacities by observed usage every `interval` seconds.
+        Enables metrics collection, which usage is measured with.
+
+        Args:
+            dispatcher (aiogram.Dispatcher): The dispatcher whose lifecycle hooks are used.
+            total_items (int): Number of widgets all storages may hold together.
+            interval (float): Seconds between rebalances.
+            min_items (int): Slots every storage keeps regardless of its usage.
+            expired_weight (float): Weight of a click on an expired widget relative to a hit.
+
+        Returns:
+            BudgetManager: The manager, whose `allocation` holds current capacities.
+        """
+        manager = BudgetManager(
+            total_items, min_items=min_items, expired_weight=expired_weight
+        )
+        manager.setup(dispatcher, interval)
+        return manager
+
+    @staticmethod
+    def enable_metrics(enabled: bool = True) -> None:
+        """
+        Turns collection of widget metrics on or off, for all widget classes.
+
+        Collected are, per widget class: created instances, callback lookup hits and misses,
+        answered clicks on expired widgets, storage evictions by reason, and `render_kb` /
+        `process_cb` latency histograms. Disabled collection costs a flag check per event.
+
+        Args:
+            enabled (bool): Whether to collect metrics.
+        """
+        metrics.enabled = enabled
+        for widget_cls in list(WidgetMeta.widgets.values()):
+            widget_cls._instrument(enabled)
+
+    @classmethod
+    def get_metrics(cls) -> dict:
+        """
+        Returns collected metrics of all widget classes along with current storage sizes
+        and capacities, as a JSON-serializable dict.
+
+        Returns:
+            dict: Metrics snapshot, see `MetricsRegistry.snapshot`.
+        """
+        return metrics.snapshot(cls._metric_storages(), WidgetBase._edit_scheduler)
+
+    @classmethod
+    def get_metrics_text(cls) -> str:
+        """
+        Returns collected metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text, ready to be served on a `/metrics` endpoint.
+        """
+        return metrics.to_prometheus(cls._metric_storages(), WidgetBase._edit_scheduler)
+
+    def dump_state(self) -> Optional[bytes]:
+        """
+        Serializes the widget into compact bytes, which can be restored with `load_state`.
+
+        Callables such as `on_select` or `on_back` are not serialized, only which of them are set.
+
+        Returns:
+            Optional[bytes]: Serialized state, or None if the widget cannot be serialized.
+        """
+        state = self._dump_state()
+        if state is None:
+            return None
+        return pack_state((state, self._callables_mask()))
+
+    def _callables_mask(self) -> int:
+        """Returns a bit mask of the callables (see `_callables`) set on the widget."""
+        mask = 0
+        for i, name in enumerate(self._callables):
+            if getattr(self, name, None) is not None:
+                mask |= 1 << i
+        return mask
+
+    @staticmethod
+    def load_state(cls_name: str, key: str, data: bytes) -> Optional["WidgetBase"]:
+        """
+        Restores a widget serialized with `dump_state`. The widget is not put into storage.
+
+        Args:
+            cls_name (str): Qualified name of the widget class (see `WidgetMeta.lookup`).
+            key (str): Key of the widget instance.
+            data (bytes): Serialized state.
+
+        Returns:
+            Optional[WidgetBase]: The restored widget, or None if the class is unknown or
+                the widget had `on_select`/`on_back` callables that no template gives back.
+        """
+        widget_cls = WidgetMeta.lookup(cls_name)
+        if widget_cls is None:
+            return None
+        state, callables = unpack_state(data)
+        return widget_cls._restore(key, state, callables)
+
+    @classmethod
+    def _restore(
+        cls: Type[TWidget], key: str, state: tuple, callables: int = 0
+    ) -> Optional[TWidget]:
+        """
+        Creates a widget instance from its state tuple without calling `__init__`.
+
+        Returns None if any of the callables set on the saved widget (see `_callables_mask`)
+        is not restored by the template of the widget: such a widget would silently fall back
+        to the default behaviour, so it is treated as expired instead.
+        """
+        widget = cls.__new__(cls)
+        widget._key = key
+        widget._owner = widget._message = widget._overlays = None
+        widget._version = widget._flight = None
+        widget._load_state(state)
+        if TEMPLATE_SEP in key:
+            template = template_of(key)
+            if template is not None:
+                template.attach(widget)
+        if callables and (widget._callables_mask() & callables) != callables:
+            return None
+        return widget
+
+    @staticmethod
+    def _metric_storages() -> Dict[str, BaseStorage]:
+        """Returns storages of all widget classes by the name they report metrics under."""
+        storages = WidgetBase._storages(namespaces=True).values()
+        return {storage.name: storage for storage in storages}
+
+    @classmethod
+    def _storages(cls, namespaces: bool = False) -> Dict[str, BaseStorage]:
+        """
+        Returns distinct storages of this class by the qualified name of their bound class.
+        On `WidgetBase` itself, storages of all widget classes are returned.
+
+        With `namespaces`, each bot namespace of a `PerBotStorage` is returned separately,
+        under a `"<class>@<bot_id>"` name.
+        """
+        classes = WidgetMeta.widgets.values() if cls is WidgetBase else [cls]
+        storages = {}
+        for klass in classes:
+            storage = klass._storage
+            if storage.widget_cls is None:
+                continue
+            if namespaces and isinstance(storage, PerBotStorage):
+                for bot_id, namespace in storage.namespaces().items():
+                    name = storage.widget_cls._widget_name
+                    if bot_id is not None:
+                        name = f"{name}@{bot_id}"
+                    storages[name] = namespace
+            else:
+                storages[storage.widget_cls._widget_name] = storage
+        return storages
+
+    @classmethod
+    def dump_storage(cls, path: str) -> int:
+        """
+        Writes all live widgets into a compact binary snapshot file, preserving their LRU order.
+
+        Called on `WidgetBase`, the snapshot covers every widget class, otherwise only the widgets
+        of this class. Widgets that cannot be serialized (e.g. a lazy `Paginator`) and broadcast
+        widgets are skipped. The `on_select`/`on_back` callables of the saved ones are not saved,
+        only which of them were set.
+
+        Args:
+            path (str): Destination file path. The file is replaced atomically.
+
+        Returns:
+            int: Number of saved widgets.
+        """
+        sections = []
+        total = 0
+        for name, storage in cls._storages(namespaces=True).items():
+            class_names = []
+            class_index = {}
+            entries = []
+            for key, widget in storage.items():
+                # Per-user overlays of broadcast widgets are not saved
+                if widget._overlays is not None:
+                    continue
+                state = widget._dump_state()
+                if state is None:
+                    continue
+                widget_cls = widget.__class__
+                idx = class_index.get(widget_cls)
+                if idx is None:
+                    idx = class_index[widget_cls] = len(class_names)
+                    class_names.append(widget_cls._widget_name)
+                entries.append((key, idx, state, widget._callables_mask()))
+
+            keys = getattr(storage, "keys", None)
+            key_state = keys.get_state() if keys is not None else None
+            sections.append((name, key_state, class_names, entries))
+            total += len(entries)
+
+        write_snapshot(path, sections)
+        return total
+
+    @classmethod
+    def load_storage(cls, path: str) -> int:
+        """
+        Restores widgets saved with `dump_storage` into their class storages, in LRU order.
+        Widgets of a `PerBotStorage` are restored into the namespaces of their bots.
+
+        Sections of widget classes that are unknown or not covered by this class are skipped.
+        Restored widgets come back without their `on_select`/`on_back` callables, so widgets
+        saved with callables are only restored when their template gives them back, the others
+        are left out and clicks on them are handled as clicks on expired widgets.
+        The key allocator state is restored as well, so this is meant to be called on startup,
+        before any widget is created.
+
+        Args:
+            path (str): Snapshot file path.
+
+        Returns:
+            int: Number of restored widgets.
+
+        Raises:
+            ValueError: If the file is not a snapshot or was written by another snapshot format
+                or Python version.
+        """
+        storages = cls._storages()
+        total = 0
+
+        # Restoring allocates lots of small objects, which would trigger many pointless GC passes
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for name, key_state, class_names, entries in read_snapshot(path):
+                storage = storages.get(name)
+                if storage is None:
+                    # A bot namespace not created yet in this process
+                    owner, _, bot_id = name.partition("@")
+                    storage = storages.get(owner)
+                    if not bot_id or not isinstance(storage, PerBotStorage):
+                        continue
+                    storage = storage.namespace(int(bot_id))
+
+                # Restored keys must stay recognized by the key allocator
+                keys = getattr(storage, "keys", None)
+                if keys is not None and key_state is not None:
+                    keys.set_state(key_state)
+                classes = [WidgetMeta.lookup(n) for n in class_names]
+                set_nowait = storage.set_nowait
+                for key, idx, state, callables in entries:
+                    widget_cls = classes[idx]
+                    if widget_cls is None:
+                        continue
+                    widget = widget_cls._restore(key, state, callables)
+                    if widget is None:
+                        continue
+                    set_nowait(key, widget)
+                    total += 1
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return total
+
+    @classmethod
+    def setup_snapshot(cls, dispatcher: Dispatcher, path: str) -> None:
+        """
+        Restores widgets from `path` on dispatcher startup and saves them back on shutdown.
+
+        Snapshots are tied to the Python version that wrote them. A snapshot that cannot be read,
+        e.g. after a Python upgrade, is logged and skipped, so the bot starts with no widgets.
+
+        Args:
+            dispatcher (aiogram.Dispatcher): The dispatcher whose lifecycle hooks are used.
+            path (str): Snapshot file path.
+        """
+
+        async def _on_startup():
+            if not os.path.exists(path):
+                return
+            try:
+                cls.load_storage(path)
+            except (ValueError, EOFError, TypeError):
+                logger.warning("Cannot restore widgets from %s", path, exc_info=True)
+
+        async def _on_shutdown():
+            cls.dump_storage(path)
+
+        dispatcher.startup.register(_on_startup)
+        dispatcher.shutdown.register(_on_shutdown)
+
+    def _dump_state(self) -> Optional[tuple]:
+        """
+        Returns the widget configuration and state as a tuple of plain values,
+        or None if the widget cannot be serialized. Overridden by serializable widgets.
+        """
+        return None
+
+    def _load_state(self, state: tuple) -> None:
+        """
+        Restores attributes from a tuple produced by `_dump_state` on an instance created
+        without calling `__init__`. Overridden by serializable widgets.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} cannot be restored")
+
+    def _reload_state(self, data: bytes) -> None:
+        """
+        Replaces the state of a live instance with a newer one saved by another process
+        with `dump_state`, keeping its callables (see `_callables`), which are not serialized.
+        """
+        kept = [(name, getattr(self, name, None)) for name in self._callables]
+        self._load_state(unpack_state(data)[0])
+        for name, value in kept:
+            setattr(self, name, value)
 
     @property
     def cb(self):
@@ -112,15 +1248,59 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         """
         return self._cb
 
+    @classmethod
+    def _make_codec(cls) -> CallbackCodec:
+        # Classes not supporting the compact format keep the regular one when it is enabled
+        # on a parent class
+        compact = cls._compact_callbacks and CallbackCodec.supports(
+            cls._cb, cls._cb_action_field, cls._cb_short_prefix
+        )
+        return CallbackCodec(
+            cls._cb,
+            action_field=cls._cb_action_field,
+            short_prefix=cls._cb_short_prefix,
+            actions=cls._cb_actions,
+            compact=compact,
+        )
+
+    @classmethod
+    def use_compact_callbacks(cls, enabled: bool = True) -> None:
+        """
+        Switches this widget class to compact callback data, packed with a short prefix and
+        single-character action codes. Callbacks in either format are accepted regardless
+        of this setting, so keyboards already sent keep working.
+
+        Subclasses and classes sharing the storage with this class are switched as well,
+        except for the ones whose callback data does not support the compact format.
+
+        Args:
+            enabled (bool): Whether to pack callback data in compact format.
+
+        Raises:
+            ValueError: If the widget class does not define a short prefix, or its callback
+                data is not supported by the precompiled format, see `CallbackCodec`.
+        """
+        if enabled and hasattr(cls, "_cb") and not cls._codec.fast:
+            raise ValueError(
+                f"{cls.__name__} does not support compact callback data, "
+                f"see CallbackCodec"
+            )
+
+        for klass in [cls, *WidgetMeta.widgets.values()]:
+            if issubclass(klass, cls) or klass._storage is cls._storage:
+                klass._compact_callbacks = enabled
+                if hasattr(klass, "_cb"):
+                    klass._codec = klass._make_codec()
+
     @classmethod
     def filter(cls):
         """
         Returns the filter for processing callback queries for this widget.
 
         Returns:
-            aiogram.filters.callback_data.CallbackDataFilter: The filter for the widget's callback data.
+            CallbackCodecFilter: The filter for the widget's callback data.
         """
-        return cls._cb.filter()
+        return CallbackCodecFilter(cls._codec)
 
     @classmethod
     def register(cls, router: Router) -> None:
@@ -128,22 +1308,338 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         Registers this widget with an Aiogram router. Hooks into the callback query event
         and dispatches control to the widget instance if found, or shows an expired message otherwise.
 
+        Registering with the same router again does nothing, while each of several routers
+        or dispatchers gets its own handler.
+
         Args:
             router (aiogram.Router): The router to register the callback handler with.
         """
-        if cls._registered:
+        with _register_lock:
+            if router in cls._routers:
+                return
+
+            router.callback_query.register(cls.handle_cb, cls.filter())
+            cls._routers.add(router)
+            cls._registered = True
+
+    @classmethod
+    async def handle_cb(
+        cls, c: CallbackQuery, callback_data: TCallbackData
+    ) -> Optional[TelegramMethod]:
+        """
+        Dispatches a callback query to the widget instance it belongs to,
+        or shows an expired message if the instance is gone.
+
+        This is the handler installed by `register()` and `register_all()`.
+
+        Args:
+            c (CallbackQuery): The callback query event from the user.
+            callback_data (TCallbackData): Parsed callback data of this widget class.
+
+        Returns:
+            Optional[TelegramMethod]: With webhook replies enabled, the first Bot API call
+                of the click, left for aiogram to send, see `use_webhook_replies`.
+        """
+        if not cls._webhook_replies:
+            await cls._dispatch_cb(c, callback_data)
+            return None
+
+        reply = []
+        token = _webhook_reply.set(reply)
+        try:
+            await cls._dispatch_cb(c, callback_data)
+        finally:
+            _webhook_reply.reset(token)
+        return reply[0] if reply else None
+
+    @classmethod
+    async def _dispatch_cb(cls, c: CallbackQuery, callback_data) -> None:
+        limiter = cls._limiter
+        if limiter is not None and not limiter.allow(c.from_user.id):
+            if metrics.enabled:
+                metrics.widget(cls.__name__).throttled += 1
+            await cls._reply(c.answer(limiter.text))
             return
 
-        async def _handle(c: CallbackQuery, callback_data: TCallbackData):
-            instance = cls.from_cb(callback_data)
-            if not instance:
-                await c.answer(cls.get_expired_text(c.from_user.language_code or "en"))
-                await c.message.delete_reply_markup()
-                return
-            await instance.process_cb(c, callback_data)
+        storage = cls._storage.resolve()
+        if storage.locks_keys:
+            # Clicks on the widget in other processes wait until this one is saved
+            async with storage.lock(callback_data.key):
+                await cls._dispatch_stored(c, callback_data, storage)
+        else:
+            await cls._dispatch_stored(c, callback_data, storage)
+
+    @classmethod
+    async def _dispatch_stored(
+        cls, c: CallbackQuery, callback_data, storage: BaseStorage
+    ) -> None:
+        key = callback_data.key
+        known = expired_cache.is_known(storage, key)
+        if known or storage.is_stale(key):
+            instance = None
+        else:
+            instance = await storage.get(key)
+
+        if metrics.enabled:
+            cls._record_lookup(instance is not None)
+        if not instance and not known:
+            instance = cls._rehydrate(key)
+
+        if not instance:
+            if metrics.enabled:
+                metrics.widget(cls.__name__).expired_clicks += 1
+            await cls._handle_expired(c, key, known)
+            return
+
+        if instance._overlays is not None:
+            await instance._process_broadcast(c, callback_data)
+        else:
+            await instance._process_serialized(c, callback_data)
+
+        # Re-save the widget, so that state changes reach persistent storages,
+        # unless a new widget has taken over its key in the meantime
+        if await storage.get(key) is instance:
+            await storage.set(key, instance)
+
+    async def _process_serialized(self, c: CallbackQuery, callback_data) -> None:
+        """
+        Processes clicks on the widget one at a time.
+
+        Clicks arriving while another one is processed are queued, up to `_max_queued_clicks`.
+        A navigation click replaces a navigation click queued right before it, so a burst of
+        navigation collapses into a single render of its final state. A navigation click equal
+        to the last applied one targets the state already shown and is only acknowledged.
+        Dropped clicks are answered without work.
+
+        A queued click whose processing fails is logged and answered, and the queue goes on.
+        A failure of the click that started processing is raised once the queue is empty.
+        """
+        queue = self._flight
+        if queue is not None:
+            dropped = None
+            if (
+                queue
+                and self._is_navigation(callback_data)
+                and self._is_navigation(queue[-1][1])
+            ):
+                dropped = queue[-1][0]
+                queue[-1] = (c, callback_data)
+            elif len(queue) < self._max_queued_clicks:
+                queue.append((c, callback_data))
+            else:
+                dropped = c
+
+            if dropped is not None:
+                if metrics.enabled:
+                    metrics.widget(self.__class__.__name__).coalesced += 1
+                await self._reply(dropped.answer())
+            return
+
+        self._flight = queue = []
+        first, error = c, None
+        try:
+            while True:
+                try:
+                    await self._process_click(c, callback_data)
+                except Exception as e:
+                    if c is first:
+                        error = e
+                    else:
+                        logger.exception(
+                            "Failed to process a queued click on %s", self._key
+                        )
+                        await self._answer_quietly(c)
+                if not queue:
+                    break
+                c, callback_data = queue.pop(0)
+        finally:
+            self._flight = None
+            # Clicks still queued when processing was interrupted
+            for c, _ in queue:
+                await self._answer_quietly(c)
+        if error is not None:
+            raise error
+
+    @classmethod
+    async def _answer_quietly(cls, c: CallbackQuery) -> None:
+        """Answers a click, ignoring errors, e.g. if it was answered already."""
+        try:
+            await cls._reply(c.answer())
+        except Exception:
+            pass
+
+    async def _process_click(self, c: CallbackQuery, callback_data) -> None:
+        navigation = self._is_navigation(callback_data)
+        if navigation and c.data is not None and c.data == self._version:
+            if metrics.enabled:
+                metrics.widget(self.__class__.__name__).coalesced += 1
+            await self._reply(c.answer())
+            return
+
+        if c.message is not None:
+            # The clicked message certainly shows the keyboard of this widget, unlike the message
+            # it was created for, which may be e.g. a menu the widget was sent in reply to
+            message = (c.message.chat.id, c.message.message_id)
+            previous, self._message = self._message, message
+            stripper = WidgetBase._stripper
+            if stripper is not None:
+                if previous is not None and previous != message:
+                    stripper.unbind(previous, self._key)
+                stripper.bind(message, self._key)
+        await self.process_cb(c, callback_data)
+        self._version = c.data if navigation else None
+
+    async def _edit_markup(
+        self, c: CallbackQuery, markup: InlineKeyboardMarkup
+    ) -> bool:
+        """
+        Replaces the keyboard of the callback message, through the edit scheduler if one
+        is set up. Widgets call it instead of editing the message directly.
+
+        The edit is skipped when the keyboard equals the one this widget last sent to the
+        message, as Telegram would reject it as not modified. A keyboard counts as sent once
+        its edit succeeded, edits still queued or left as the webhook reply do not.
+
+        Returns:
+            bool: Whether the keyboard was edited or queued, False if it was unchanged.
+        """
+        message = c.message
+        shown = fingerprint = None
+        if message is not None:
+            shown = (self._key, message.chat.id, message.message_id)
+            fingerprint = markup_fingerprint(markup)
+            with _cache_lock:
+                unchanged = (
+                    fingerprint is not None and _shown_markups.get(shown) == fingerprint
+                )
+                if not unchanged:
+                    # Not known until the edit succeeds
+                    _shown_markups.pop(shown, None)
+            if unchanged:
+                if metrics.enabled:
+                    metrics.widget(self.__class__.__name__).unchanged += 1
+                return False
+
+        on_sent = None
+        if fingerprint is not None:
+            on_sent = functools.partial(_mark_shown, shown, fingerprint)
+
+        scheduler = WidgetBase._edit_scheduler
+        if scheduler is not None and message is not None:
+            scheduler.submit(message, markup, on_sent=on_sent)
+        elif await self._reply(message.edit_reply_markup(reply_markup=markup)):
+            if on_sent is not None:
+                on_sent()
+        return True
+
+    @staticmethod
+    async def _reply(method: Any) -> bool:
+        """
+        Sends a Bot API call of a widget, like `c.answer()` or an edit, unless it can be left
+        as the webhook reply of the click being handled, see `use_webhook_replies`.
+        Widgets pass their calls through it instead of awaiting them.
+
+        Returns:
+            bool: Whether the call was made, False if it was left as the webhook reply.
+        """
+        reply = _webhook_reply.get()
+        if reply is not None and not reply and isinstance(method, TelegramMethod):
+            reply.append(method)
+            return False
+        await method
+        return True
+
+    def _is_navigation(self, callback_data) -> bool:
+        action = getattr(callback_data, self._cb_action_field, None)
+        return action in self._navigation_actions
+
+    @classmethod
+    async def _handle_expired(cls, c: CallbackQuery, key: str, known: bool) -> None:
+        """
+        Answers a click on an expired widget and removes its keyboard, unless the key was
+        already handled recently or the keyboard removal is throttled in this chat.
+        """
+        lang = c.from_user.language_code or "en"
+        text = _expired_texts.get((cls, lang))
+        if text is None:
+            text = _expired_texts[(cls, lang)] = cls.get_expired_text(lang)
+        await cls._reply(
+            c.answer(text, cache_time=expired_cache.answer_cache_time or None)
+        )
+        if known:
+            return
+
+        expired_cache.add(cls._storage.resolve(), key)
+        if c.message is not None and expired_cache.allow_strip(c.message.chat.id):
+            await cls._reply(c.message.delete_reply_markup())
+
+    @classmethod
+    def limit_clicks(
+        cls,
+        rate: Optional[float] = 2.0,
+        burst: int = 5,
+        max_users: int = 10_000,
+        text: Optional[str] = None,
+    ) -> Optional[ClickLimiter]:
+        """
+        Limits how fast clicks of a single user on widgets of this class are processed,
+        see `ClickLimiter`. Clicks over the limit are answered without re-rendering.
+
+        Called on `WidgetBase`, the limit applies to all widget classes without their own one,
+        and clicks of a user on any of them share a bucket.
+
+        Args:
+            rate (Optional[float]): Clicks per second allowed after a burst. None removes the limit.
+            burst (int): Number of clicks allowed in a row.
+            max_users (int): Maximum number of users whose click rate is tracked.
+            text (Optional[str]): Text of the answer to throttled clicks. None answers silently.
+
+        Returns:
+            Optional[ClickLimiter]: The installed limiter, None if the limit was removed.
+        """
+        cls._limiter = None
+        if rate is not None:
+            cls._limiter = ClickLimiter(rate, burst, max_users=max_users, text=text)
+        return cls._limiter
 
-        router.callback_query.register(_handle, cls.filter())
-        cls._registered = True
+    @classmethod
+    def use_webhook_replies(cls, enabled: bool = True) -> None:
+        """
+        Returns the first Bot API call of every click from the widget handler instead of
+        sending it, usually the callback answer, or the keyboard edit of widgets that do not
+        answer after editing.
+
+        In webhook mode, aiogram sends a returned call as the webhook response, saving an outbound
+        request per click. It requires `SimpleRequestHandler(..., handle_in_background=False)`,
+        otherwise, and in polling mode, aiogram sends the call itself after the handler returns.
+        Either way, errors of the returned call are only logged by aiogram.
+
+        Called on `WidgetBase`, it applies to all widget classes without their own setting.
+
+        Args:
+            enabled (bool): Whether calls are returned as webhook replies.
+        """
+        cls._webhook_replies = enabled
+
+    @staticmethod
+    def configure_expired(
+        max_keys: Optional[int] = None,
+        ttl: Optional[float] = None,
+        strip_interval: Optional[float] = None,
+        max_chats: Optional[int] = None,
+        answer_cache_time: Optional[int] = None,
+    ) -> None:
+        """
+        Changes how clicks on expired widgets are handled, for all widget classes.
+        Options left as None keep their current values, see `ExpiredClickCache`.
+        """
+        expired_cache.configure(
+            max_keys=max_keys,
+            ttl=ttl,
+            strip_interval=strip_interval,
+            max_chats=max_chats,
+            answer_cache_time=answer_cache_time,
+        )
 
     @property
     def is_registered(self) -> bool:
@@ -151,8 +1647,8 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         Indicates whether this widget's class has been registered with a router.
 
         This property checks the `_registered` class-level flag to determine if the widget type
-        has already been registered via the `register()` method. Note that this reflects registration
-        status at the class level, not per instance.
+        has already been registered with any router via `register()` or `register_all()`. Note that
+        this reflects registration status at the class level, not per instance.
 
         Returns:
             bool: True if the widget's class is registered, False otherwise.
@@ -205,3 +1701,100 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
             InlineKeyboardMarkup: The inline keyboard markup for the widget.
         """
         pass
+
+
+class WidgetRouteFilter(Filter):
+    """
+    Single filter routing callback queries of many widget classes by their callback data prefix.
+
+    Callback data not starting with the common prefix of all routed widgets in either callback
+    data format, regular or compact, is rejected with a single `str.startswith` call. Otherwise, the widget class is looked up in a dict by prefix,
+    and the callback data is unpacked exactly once.
+
+    Args:
+        widgets (Iterable[type]): Widget classes to route.
+    """
+
+    def __init__(self, widgets: Iterable[type]):
+        self.routes: Dict[str, List[type]] = {}
+        # Prefixes by format, which have unrelated shapes: "aiogramx_cal" and "axc"
+        formats: Dict[bool, List[str]] = {}
+        separators = set()
+        for widget_cls in widgets:
+            codec = widget_cls._codec
+            separators.add(codec.sep)
+            for prefix in codec.prefixes:
+                formats.setdefault(prefix == codec.short_prefix, []).append(prefix)
+                classes = self.routes.setdefault(prefix, [])
+                # Subclasses sharing a storage are served by the same handler
+                if all(k._storage is not widget_cls._storage for k in classes):
+                    classes.append(widget_cls)
+
+        if len(separators) > 1:
+            raise ValueError(
+                "All routed widgets must use the same callback data separator"
+            )
+
+        self.sep = separators.pop() if separators else ":"
+        self.common_prefixes = tuple(
+            os.path.commonprefix(prefixes) for prefixes in formats.values()
+        )
+
+    async def __call__(self, query: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        data = query.data
+        if not data or not data.startswith(self.common_prefixes):
+            return False
+
+        classes = self.routes.get(data.split(self.sep, 1)[0])
+        if classes is None:
+            return False
+
+        try:
+            callback_data = classes[0]._codec.unpack(data)
+        except ValueError:
+            return False
+
+        widget_cls = classes[0]
+        if len(classes) > 1:
+            # Several widget classes with own storages share the prefix, find the owner of the key
+            widget_cls = next(
+                (k for k in classes if callback_data.key in k._storage), widget_cls
+            )
+        return {"callback_data": callback_data, "widget_cls": widget_cls}
+
+
+async def _handle_routed(
+    c: CallbackQuery, callback_data: CallbackData, widget_cls: Type[WidgetBase]
+) -> Optional[TelegramMethod]:
+    return await widget_cls.handle_cb(c, callback_data)
+
+
+def register_all(router: Router, widgets: Optional[Iterable[type]] = None) -> None:
+    """
+    Registers a single callback handler serving all widget classes, as an alternative to calling
+    `register()` on each of them. Dispatch cost does not grow with the number of widget types.
+    Widget classes already registered with the router are skipped, and nothing is registered
+    if all of them are.
+
+    Args:
+        router (aiogram.Router): The router to register the callback handler with.
+        widgets (Optional[Iterable[type]]): Widget classes to serve. Defaults to all widget
+            classes defined so far.
+    """
+    if widgets is None:
+        widgets = [w for w in WidgetMeta.widgets.values() if not inspect.isabstract(w)]
+
+    with _register_lock:
+        widgets = [w for w in widgets if router not in w._routers]
+        if not widgets:
+            return
+
+        router.callback_query.register(_handle_routed, WidgetRouteFilter(widgets))
+        for widget_cls in widgets:
+            # Classes sharing the storage (like the time selectors) share the registration state too
+            for klass in widget_cls.__mro__:
+                if klass is widget_cls or (
+                    klass.__dict__.get("_storage") is widget_cls._storage
+                ):
+                    klass._routers.add(router)
+                    klass._registered = True
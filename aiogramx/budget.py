@@ -0,0 +1,179 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Tuple
+
+from aiogram import Dispatcher
+
+from aiogramx.metrics import metrics
+
+
+class BudgetManager:
+    """
+    Splits a process-wide widget budget between the storages of all widget classes, moving
+    capacity to where it is used instead of giving every class a fixed number of slots.
+
+    Each `rebalance()` reads per-class lookup hits and clicks on expired widgets recorded
+    since the previous one (see `aiogramx.metrics`, which the manager turns on), and scores
+    every storage as::
+
+        demand = hits + expired_weight * expired_clicks
+
+    Expired clicks weigh more than hits, since they are users hitting a storage that was
+    too small. Scores are smoothed over rebalances, every storage keeps at least `min_items`
+    slots, and the rest of `total_items` is split in proportion to the smoothed demand.
+    Storages that cannot be reconfigured (e.g. `SQLiteStorage`) are left out.
+
+    Args:
+        total_items (int): Number of widgets all managed storages may hold together.
+        min_items (int): Slots every storage keeps regardless of its demand.
+        expired_weight (float): Weight of a click on an expired widget relative to a hit.
+        smoothing (float): Weight of the previous demand in the smoothed one, between 0 and 1.
+        widgets (Optional[Iterable[type]]): Widget classes to manage. Defaults to all classes,
+            including the ones defined later.
+
+    Raises:
+        ValueError: If the budget cannot give `min_items` to every managed storage.
+    """
+
+    def __init__(
+        self,
+        total_items: int,
+        min_items: int = 100,
+        expired_weight: float = 4.0,
+        smoothing: float = 0.5,
+        widgets: Optional[Iterable[type]] = None,
+    ):
+        if not 0 <= smoothing < 1:
+            raise ValueError("smoothing must be in [0, 1)")
+
+        self.total_items = total_items
+        self.min_items = min_items
+        self.expired_weight = expired_weight
+        self.smoothing = smoothing
+        self.widgets = list(widgets) if widgets is not None else None
+
+        self.allocation: Dict[str, int] = {}
+        self.demand: Dict[str, float] = {}
+        # Counters seen at the previous rebalance, by widget class name
+        self._seen: Dict[str, Tuple[int, int]] = {}
+
+        from aiogramx.base import WidgetBase
+
+        WidgetBase.enable_metrics()
+
+    def _managed(self) -> Dict[str, Tuple[type, list]]:
+        """Returns managed storages by name, with their bound class and all classes using them."""
+        from aiogramx.base import WidgetMeta
+
+        classes = (
+            self.widgets
+            if self.widgets is not None
+            else list(WidgetMeta.widgets.values())
+        )
+        managed = {}
+        for widget_cls in classes:
+            storage = widget_cls._storage
+            root = storage.widget_cls
+            if root is None or getattr(storage, "configure", None) is None:
+                continue
+            managed.setdefault(root.__name__, (root, []))[1].append(widget_cls)
+        return managed
+
+    def _observe(self, classes: list) -> float:
+        """Returns the demand observed since the previous rebalance for a storage."""
+        hits = expired = 0
+        for widget_cls in classes:
+            m = metrics.widget(widget_cls.__name__)
+            seen_hits, seen_expired = self._seen.get(widget_cls.__name__, (0, 0))
+            # Counters go back to zero if the metrics registry was reset
+            hits += max(m.lookup_hits - seen_hits, 0)
+            expired += max(m.expired_clicks - seen_expired, 0)
+            self._seen[widget_cls.__name__] = (m.lookup_hits, m.expired_clicks)
+        return hits + self.expired_weight * expired
+
+    def rebalance(self) -> Dict[str, int]:
+        """
+        Recomputes and applies capacities of all managed storages.
+
+        Returns:
+            Dict[str, int]: New capacity of every managed storage, by bound class name.
+        """
+        managed = self._managed()
+        if not managed:
+            return {}
+
+        spare = self.total_items - self.min_items * len(managed)
+        if spare < 0:
+            raise ValueError(
+                f"Budget of {self.total_items} widgets cannot give {self.min_items} "
+                f"to each of {len(managed)} storages"
+            )
+
+        for name, (_, classes) in managed.items():
+            observed = self._observe(classes)
+            previous = self.demand.get(name)
+            if previous is None:
+                self.demand[name] = observed
+            else:
+                self.demand[name] = (
+                    self.smoothing * previous + (1 - self.smoothing) * observed
+                )
+
+        total_demand = sum(self.demand[name] for name in managed)
+        allocation = {}
+        for name in managed:
+            if total_demand > 0:
+                share = self.demand[name] / total_demand
+            else:
+                share = 1 / len(managed)
+            allocation[name] = self.min_items + int(spare * share)
+
+        for name, (root, _) in managed.items():
+            if root._storage.max_items != allocation[name]:
+                root.configure_storage(max_items=allocation[name])
+
+        self.allocation = allocation
+        return dict(allocation)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns the current allocation along with storage fill and smoothed demand.
+
+        Returns:
+            Dict[str, dict]: `{name: {"capacity": ..., "size": ..., "demand": ...}}`.
+        """
+        return {
+            name: {
+                "capacity": root._storage.max_items,
+                "size": len(root._storage),
+                "demand": self.demand.get(name, 0.0),
+            }
+            for name, (root, _) in self._managed().items()
+        }
+
+    def setup(self, dispatcher: Dispatcher, interval: float = 60) -> None:
+        """
+        Applies the initial allocation on dispatcher startup and rebalances periodically
+        in background while the dispatcher is running.
+
+        Args:
+            dispatcher (aiogram.Dispatcher): The dispatcher whose lifecycle hooks are used.
+            interval (float): Seconds between rebalances.
+        """
+        task: Optional[asyncio.Task] = None
+
+        async def _rebalance_loop():
+            while True:
+                await asyncio.sleep(interval)
+                self.rebalance()
+
+        async def _on_startup():
+            nonlocal task
+            self.rebalance()
+            task = asyncio.create_task(_rebalance_loop())
+
+        async def _on_shutdown():
+            if task is not None:
+                task.cancel()
+
+        dispatcher.startup.register(_on_startup)
+        dispatcher.shutdown.register(_on_shutdown)
@@ -1,14 +1,14 @@
 import calendar
 from dataclasses import dataclass
 from datetime import timedelta, date
-from typing import Optional, Union, Callable, Awaitable
+from typing import Optional, Union, Callable, Awaitable, NamedTuple
 
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import CallbackQuery
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from aiogramx.base import WidgetBase
+from aiogramx.base import WidgetBase, ConfigField, intern_config
 from aiogramx.utils import ibtn, fallback_lang
 
 
@@ -62,6 +62,18 @@ class CalendarResult:
     chosen_date: Optional[date] = None
 
 
+class CalendarConfig(NamedTuple):
+    """Immutable configuration of a `Calendar`, shared between instances created alike."""
+
+    max_range: Optional[timedelta]
+    can_select_past: bool
+    show_quick_buttons: bool
+    lang: str
+    warn_past_text: str
+    warn_future_text: str
+    back_button_text: str
+
+
 class CalendarCB(CallbackData, prefix="aiogramx_calendar"):
     """
     Represents structured callback data for the Calendar widget.
@@ -120,6 +132,31 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
     """
 
     _cb = CalendarCB
+    _cb_short_prefix = "axc"
+    _cb_actions = {
+        "IGNORE": ".",
+        "WARN_PAST": "p",
+        "WARN_FUTURE": "f",
+        "BACK": "b",
+        "DAY": "d",
+        "PREV-YEAR": "{",
+        "NEXT-YEAR": "}",
+        "PREV-MONTH": "<",
+        "NEXT-MONTH": ">",
+    }
+    _navigation_actions = frozenset(
+        ("PREV-YEAR", "NEXT-YEAR", "PREV-MONTH", "NEXT-MONTH")
+    )
+
+    __slots__ = ("_config", "on_select", "on_back")
+
+    max_range = ConfigField()
+    lang = ConfigField()
+    _can_select_past = ConfigField("can_select_past")
+    _show_quick_buttons = ConfigField("show_quick_buttons")
+    _warn_past_text = ConfigField("warn_past_text")
+    _warn_future_text = ConfigField("warn_future_text")
+    _back_button_text = ConfigField("back_button_text")
 
     def __init__(
         self,
@@ -133,17 +170,22 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         warn_future_text: Optional[str] = None,
         back_button_text: Optional[str] = None,
     ):
-        self.max_range = max_range
-        self._can_select_past = can_select_past
-        self._show_quick_buttons = show_quick_buttons
+        lang = fallback_lang(lang)
+        texts = _TEXTS[lang]
+        self._config = intern_config(
+            CalendarConfig(
+                max_range=max_range,
+                can_select_past=can_select_past,
+                show_quick_buttons=show_quick_buttons,
+                lang=lang,
+                warn_past_text=warn_past_text or texts["WARN_PAST"],
+                warn_future_text=warn_future_text or texts["WARN_FUTURE"],
+                back_button_text=back_button_text or texts["BACK"],
+            )
+        )
         self.on_select = on_select
         self.on_back = on_back
 
-        self.lang = fallback_lang(lang)
-        self._warn_past_text = warn_past_text or self._t("WARN_PAST")
-        self._warn_future_text = warn_future_text or self._t("WARN_FUTURE")
-        self._back_button_text = back_button_text or self._t("BACK")
-
         super().__init__()
 
     def _t(self, text_id: str) -> Union[str, list[str]]:
@@ -158,6 +200,21 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         """
         return _TEXTS[self.lang][text_id.upper()]
 
+    def _dump_state(self) -> tuple:
+        max_range, *rest = self._config
+        return (
+            max_range.total_seconds() if max_range is not None else None,
+            *rest,
+        )
+
+    def _load_state(self, state: tuple) -> None:
+        max_range, *rest = state
+        if max_range is not None:
+            max_range = timedelta(seconds=max_range)
+        self._config = intern_config(CalendarConfig(max_range, *rest))
+        self.on_select = None
+        self.on_back = None
+
     @classmethod
     def get_expired_text(cls, lang: str = "en") -> str:
         """
@@ -190,7 +247,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         month = today.month if month is None else month
 
         kb = InlineKeyboardBuilder()
-        ignore_cb = self._cb(action="IGNORE", key=self._key).pack()
+        ignore_cb = self._codec.pack(action="IGNORE", key=self._key)
         empty_btn = ibtn(text="  ", cb=ignore_cb)
         prev_year_btn = next_year_btn = prev_month_btn = next_month_btn = empty_btn
 
@@ -201,7 +258,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
             kb.row(
                 ibtn(
                     text=self._t("TODAY"),
-                    cb=self._cb(
+                    cb=self._codec.pack(
                         action="DAY",
                         year=today.year,
                         month=today.month,
@@ -211,7 +268,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
                 ),
                 ibtn(
                     text=self._t("TOMORROW"),
-                    cb=self._cb(
+                    cb=self._codec.pack(
                         action="DAY",
                         year=tomorrow.year,
                         month=tomorrow.month,
@@ -221,7 +278,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
                 ),
                 ibtn(
                     text=self._t("OVERMORROW"),
-                    cb=self._cb(
+                    cb=self._codec.pack(
                         action="DAY",
                         year=overmorrow.year,
                         month=overmorrow.month,
@@ -235,7 +292,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         if self._can_select_past or month - 1 >= today.month:
             prev_month_btn = ibtn(
                 text="<",
-                cb=self._cb(
+                cb=self._codec.pack(
                     action="PREV-MONTH",
                     year=year,
                     month=month,
@@ -251,7 +308,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         if not self.max_range or next_month - today < self.max_range:
             next_month_btn = ibtn(
                 text=">",
-                cb=self._cb(
+                cb=self._codec.pack(
                     action="NEXT-MONTH",
                     year=year,
                     month=month,
@@ -263,7 +320,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         if self._can_select_past or year - 1 >= today.year:
             prev_year_btn = ibtn(
                 "<<",
-                self._cb(
+                self._codec.pack(
                     action="PREV-YEAR",
                     year=year,
                     month=month,
@@ -277,7 +334,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         ):
             next_year_btn = ibtn(
                 ">>",
-                self._cb(
+                self._codec.pack(
                     action="NEXT-YEAR",
                     year=year,
                     month=month,
@@ -297,13 +354,13 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
                 dt = date(year=year, month=month, day=day)
 
                 if dt < today and not self._can_select_past:
-                    cb = self._cb(action="WARN_PAST", key=self._key).pack()
+                    cb = self._codec.pack(action="WARN_PAST", key=self._key)
                 elif self.max_range and dt > today and dt - today > self.max_range:
-                    cb = self._cb(action="WARN_FUTURE", key=self._key).pack()
+                    cb = self._codec.pack(action="WARN_FUTURE", key=self._key)
                 else:
-                    cb = self._cb(
+                    cb = self._codec.pack(
                         action="DAY", year=year, month=month, day=day, key=self._key
-                    ).pack()
+                    )
 
                 is_today = (
                     day == today.day and month == today.month and year == today.year
@@ -330,7 +387,9 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         kb.row(prev_year_btn, empty_btn, next_year_btn)
 
         # Back Navigator
-        kb.row(ibtn(self._back_button_text, self._cb(action="BACK", key=self._key)))
+        kb.row(
+            ibtn(self._back_button_text, self._codec.pack(action="BACK", key=self._key))
+        )
         return kb.as_markup()
 
     async def process_cb(
@@ -351,72 +410,80 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
             CalendarResult indicating if a date was selected and the selected date. Returns
             None if handled via a registered handler.
         """
-        result = CalendarResult(completed=False, chosen_date=None)
-
-        if data.action == "IGNORE":
-            await c.answer(cache_time=60)
-
-        elif data.action == "WARN_PAST":
-            await c.answer(self._warn_past_text, show_alert=True)
-
-        elif data.action == "WARN_FUTURE":
-            await c.answer(self._warn_future_text, show_alert=True)
-
-        elif data.action == "BACK":
-            if self.on_back:
-                await self.on_back(c)
-            elif self.is_registered:
-                await c.message.edit_text(text="Ok")
-                await c.answer()
-            else:
-                result = CalendarResult(completed=True, chosen_date=None)
-
-        # user selects a date, process the date
-        elif data.action == "DAY":
-            dt = date(data.year, data.month, data.day)
-
-            if self.on_select:
-                await self.on_select(c, dt)
-            elif self.is_registered:
-                await c.message.edit_text(
-                    text=f"{data.year}-{data.month:02d}-{data.day:02d}"
-                )
-                await c.answer()
-            else:
-                result = CalendarResult(completed=True, chosen_date=dt)
-
-        # user navigates to previous year, editing message with new calendar
-        elif data.action == "PREV-YEAR":
-            prev_date = date(data.year, data.month, 1) - timedelta(days=365)
-            await c.message.edit_reply_markup(
-                reply_markup=self.render_kb(prev_date.year, prev_date.month)
-            )
-            await c.answer()
+        handler = self._ACTIONS.get(data.action)
+        result = await handler(self, c, data) if handler is not None else None
 
-        # user navigates to next year, editing message with new calendar
-        elif data.action == "NEXT-YEAR":
-            next_date = date(data.year, data.month, 1) + timedelta(days=365)
-            await c.message.edit_reply_markup(
-                reply_markup=self.render_kb(next_date.year, next_date.month)
-            )
-            await c.answer()
+        if not self.is_registered:
+            return result or CalendarResult(completed=False, chosen_date=None)
+        return None
 
-        # user navigates to previous month, editing message with new calendar
-        elif data.action == "PREV-MONTH":
-            prev_date = date(data.year, data.month, 1) - timedelta(days=1)
-            await c.message.edit_reply_markup(
-                reply_markup=self.render_kb(prev_date.year, prev_date.month)
-            )
-            await c.answer()
+    async def _on_ignore(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._reply(c.answer(cache_time=60))
 
-        # user navigates to next month, editing message with new calendar
-        elif data.action == "NEXT-MONTH":
-            next_date = date(data.year, data.month, 1) + timedelta(days=31)
-            await c.message.edit_reply_markup(
-                reply_markup=self.render_kb(next_date.year, next_date.month)
-            )
-            await c.answer()
+    async def _on_warn_past(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._reply(c.answer(self._warn_past_text, show_alert=True))
 
-        if not self.is_registered:
-            return result
+    async def _on_warn_future(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._reply(c.answer(self._warn_future_text, show_alert=True))
+
+    async def _on_back(
+        self, c: CallbackQuery, data: CalendarCB
+    ) -> Optional[CalendarResult]:
+        if self.on_back:
+            await self.on_back(c)
+        elif self.is_registered:
+            await c.message.edit_text(text="Ok")
+            await self._reply(c.answer())
+        else:
+            return CalendarResult(completed=True, chosen_date=None)
         return None
+
+    # user selects a date, process the date
+    async def _on_day(
+        self, c: CallbackQuery, data: CalendarCB
+    ) -> Optional[CalendarResult]:
+        dt = date(data.year, data.month, data.day)
+
+        if self.on_select:
+            await self.on_select(c, dt)
+        elif self.is_registered:
+            await c.message.edit_text(
+                text=f"{data.year}-{data.month:02d}-{data.day:02d}"
+            )
+            await self._reply(c.answer())
+        else:
+            return CalendarResult(completed=True, chosen_date=dt)
+        return None
+
+    async def _navigate(self, c: CallbackQuery, target: date) -> None:
+        """Edits the message with the calendar of the month containing `target`."""
+        await self._edit_markup(c, self.render_kb(target.year, target.month))
+        await self._reply(c.answer())
+
+    # user navigates to previous year, editing message with new calendar
+    async def _on_prev_year(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._navigate(c, date(data.year, data.month, 1) - timedelta(days=365))
+
+    # user navigates to next year, editing message with new calendar
+    async def _on_next_year(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._navigate(c, date(data.year, data.month, 1) + timedelta(days=365))
+
+    # user navigates to previous month, editing message with new calendar
+    async def _on_prev_month(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._navigate(c, date(data.year, data.month, 1) - timedelta(days=1))
+
+    # user navigates to next month, editing message with new calendar
+    async def _on_next_month(self, c: CallbackQuery, data: CalendarCB) -> None:
+        await self._navigate(c, date(data.year, data.month, 1) + timedelta(days=31))
+
+    _ACTIONS = {
+        "IGNORE": _on_ignore,
+        "WARN_PAST": _on_warn_past,
+        "WARN_FUTURE": _on_warn_future,
+        "BACK": _on_back,
+        "DAY": _on_day,
+        "PREV-YEAR": _on_prev_year,
+        "NEXT-YEAR": _on_next_year,
+        "PREV-MONTH": _on_prev_month,
+        "NEXT-MONTH": _on_next_month,
+    }
@@ -5,10 +5,20 @@ from aiogram.filters.callback_data import CallbackData
 from aiogram.types import CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from aiogramx.base import WidgetBase
+from aiogramx.base import WidgetBase, ConfigField, intern_config
 from aiogramx.utils import ibtn, fallback_lang
 
-from typing import Dict, TypedDict, Callable, Optional, Awaitable, Union, List
+from typing import (
+    Dict,
+    TypedDict,
+    Callable,
+    Optional,
+    Awaitable,
+    Union,
+    List,
+    NamedTuple,
+    Tuple,
+)
 
 
 _TEXTS = {
@@ -60,6 +70,20 @@ class CheckboxResult:
     options: Optional[Dict[str, OptionMeta]] = None
 
 
+class CheckboxConfig(NamedTuple):
+    """
+    Immutable configuration of a `Checkbox`, shared between instances created alike.
+    Selection flags are per-instance state and are not part of it.
+    """
+
+    options: Tuple[Tuple[str, str], ...]  # (key, text) pairs
+    can_select_none: bool
+    has_back_button: bool
+    lang: str
+    back_button_text: str
+    done_button_text: str
+
+
 class CheckboxCB(CallbackData, prefix="aiogramx_chx"):
     """
     Defines the callback data structure for checkbox interactions.
@@ -96,6 +120,19 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
     """
 
     _cb = CheckboxCB
+    _cb_short_prefix = "axb"
+    _cb_actions = {"IGNORE": ".", "CHECK": "c", "DONE": "d", "BACK": "b"}
+
+    # Selected options are kept as a bitmask over `_config.options`
+    __slots__ = ("_config", "_selected", "on_select", "on_back")
+    # Selections are per user in broadcast checkboxes
+    _user_state = ("_selected",)
+
+    lang = ConfigField()
+    _can_select_none = ConfigField("can_select_none")
+    _has_back_button = ConfigField("has_back_button")
+    _back_button_text = ConfigField("back_button_text")
+    _done_button_text = ConfigField("done_button_text")
 
     def __init__(
         self,
@@ -108,35 +145,55 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
         done_button_text: Optional[str] = None,
         back_button_text: Optional[str] = None,
     ):
-        self._options = {}
+        items = []
+        selected = 0
 
         if isinstance(options, list):
-            for key in options:
-                self._options[key] = {"text": key, "flag": False}
+            items = [(key, key) for key in options]
 
         elif isinstance(options, dict):
-            for key, val in options.items():
+            for i, (key, val) in enumerate(options.items()):
                 if val is None:
                     val = {}
-                self._options[key] = {
-                    "text": val.get("text", key),
-                    "flag": bool(val.get("flag", False)),
-                }
+                items.append((key, val.get("text", key)))
+                if val.get("flag", False):
+                    selected |= 1 << i
 
         if not isinstance(options, (dict, list)):
             raise TypeError("Expected list of keys or dict[str, dict] as options")
 
-        self._can_select_none = can_select_none
-        self._has_back_button = has_back_button or bool(on_back)
+        lang = fallback_lang(lang)
+        self._config = intern_config(
+            CheckboxConfig(
+                options=tuple(items),
+                can_select_none=can_select_none,
+                has_back_button=has_back_button or bool(on_back),
+                lang=lang,
+                back_button_text=back_button_text or _TEXTS[lang]["back"],
+                done_button_text=done_button_text or _TEXTS[lang]["done"],
+            )
+        )
+        self._selected = selected
         self.on_select = on_select
         self.on_back = on_back
-        self.lang = fallback_lang(lang)
-
-        self._back_button_text = back_button_text or _TEXTS[self.lang]["back"]
-        self._done_button_text = done_button_text or _TEXTS[self.lang]["done"]
 
         super().__init__()
 
+    @property
+    def _options(self) -> Dict[str, OptionMeta]:
+        """Options with their texts and selection flags, built from the config and the bitmask."""
+        selected = self._selected
+        return {
+            k: {"text": text, "flag": bool(selected >> i & 1)}
+            for i, (k, text) in enumerate(self._config.options)
+        }
+
+    def _option_index(self, key: str) -> int:
+        for i, (k, _) in enumerate(self._config.options):
+            if k == key:
+                return i
+        raise KeyError(key)
+
     def is_selected_any(self) -> bool:
         """
         Checks whether any options are currently selected.
@@ -144,10 +201,30 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
         Returns:
             bool: True if at least one option is selected, False otherwise.
         """
-        for o in self._options.values():
-            if o["flag"] is True:
-                return True
-        return False
+        return self._selected != 0
+
+    def _dump_state(self) -> tuple:
+        options, *rest = self._config
+        selected = self._selected
+        return (
+            tuple(
+                (k, text, bool(selected >> i & 1))
+                for i, (k, text) in enumerate(options)
+            ),
+            *rest,
+        )
+
+    def _load_state(self, state: tuple) -> None:
+        options, *rest = state
+        self._config = intern_config(
+            CheckboxConfig(tuple((k, text) for k, text, _ in options), *rest)
+        )
+        self._selected = 0
+        for i, (_, _, flag) in enumerate(options):
+            if flag:
+                self._selected |= 1 << i
+        self.on_select = None
+        self.on_back = None
 
     async def process_cb(
         self, c: CallbackQuery, data: CheckboxCB
@@ -162,43 +239,58 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
         Returns:
             Optional[CheckboxResult]: A result object if in standalone mode, otherwise None.
         """
-        if data.action == "IGNORE":
-            await c.answer(cache_time=60)
-
-        if data.action == "CHECK":
-            self._options[data.arg]["flag"] = not self._options[data.arg]["flag"]
-            await c.message.edit_reply_markup(reply_markup=self.render_kb())
-
-        elif data.action == "DONE":
-            if not self._can_select_none and not self.is_selected_any():
-                await c.answer(_TEXTS[self.lang]["at_least_one"])
-                if not self.is_registered:
-                    return CheckboxResult(False)
-                return None
-
-            if self.on_select:
-                await self.on_select(c, self._options)
-            elif self.is_registered:
-                await c.message.edit_text(
-                    json.dumps(self._options, indent=2, ensure_ascii=False)
-                )
-                await c.answer()
-            else:
-                return CheckboxResult(True, self._options)
-
-        elif data.action == "BACK":
-            if self.on_back:
-                await self.on_back(c)
-            elif self.is_registered:
-                await c.message.delete()
-                await c.answer("Ok")
-            else:
-                return CheckboxResult(True)
+        handler = self._ACTIONS.get(data.action)
+        result = await handler(self, c, data) if handler is not None else None
 
         if not self.is_registered:
-            return CheckboxResult(False)
+            return result or CheckboxResult(False)
         return None
 
+    async def _on_ignore(self, c: CallbackQuery, data: CheckboxCB) -> None:
+        await self._reply(c.answer(cache_time=60))
+
+    async def _on_check(self, c: CallbackQuery, data: CheckboxCB) -> None:
+        self._selected ^= 1 << self._option_index(data.arg)
+        if not await self._edit_markup(c, self.render_kb()):
+            await self._reply(c.answer())
+
+    async def _on_done(
+        self, c: CallbackQuery, data: CheckboxCB
+    ) -> Optional[CheckboxResult]:
+        if not self._can_select_none and not self.is_selected_any():
+            await self._reply(c.answer(_TEXTS[self.lang]["at_least_one"]))
+            return None
+
+        if self.on_select:
+            await self.on_select(c, self._options)
+        elif self.is_registered:
+            await c.message.edit_text(
+                json.dumps(self._options, indent=2, ensure_ascii=False)
+            )
+            await self._reply(c.answer())
+        else:
+            return CheckboxResult(True, self._options)
+        return None
+
+    async def _on_back(
+        self, c: CallbackQuery, data: CheckboxCB
+    ) -> Optional[CheckboxResult]:
+        if self.on_back:
+            await self.on_back(c)
+        elif self.is_registered:
+            await c.message.delete()
+            await self._reply(c.answer("Ok"))
+        else:
+            return CheckboxResult(True)
+        return None
+
+    _ACTIONS = {
+        "IGNORE": _on_ignore,
+        "CHECK": _on_check,
+        "DONE": _on_done,
+        "BACK": _on_back,
+    }
+
     def render_kb(self):
         """
         Builds and returns the inline keyboard markup for the checkbox interface.
@@ -207,29 +299,30 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
             InlineKeyboardMarkup: The rendered inline keyboard.
         """
         kb = InlineKeyboardBuilder()
-        for k, v in self._options.items():
+        selected = self._selected
+        for i, (k, text) in enumerate(self._config.options):
             kb.add(
                 ibtn(
-                    text=v["text"],
-                    cb=self._cb(action="IGNORE", key=self._key),
+                    text=text,
+                    cb=self._codec.pack(action="IGNORE", key=self._key),
                 ),
                 ibtn(
-                    text="✅" if v["flag"] else "[  ]",
-                    cb=self._cb(action="CHECK", arg=k, key=self._key),
+                    text="✅" if selected >> i & 1 else "[  ]",
+                    cb=self._codec.pack(action="CHECK", arg=k, key=self._key),
                 ),
             )
         kb.adjust(2)
         kb.row(
             ibtn(
                 text=self._done_button_text,
-                cb=self._cb(action="DONE", key=self._key),
+                cb=self._codec.pack(action="DONE", key=self._key),
             )
         )
         if self._has_back_button:
             kb.row(
                 ibtn(
                     text=self._back_button_text,
-                    cb=self._cb(action="BACK", key=self._key),
+                    cb=self._codec.pack(action="BACK", key=self._key),
                 )
             )
         return kb.as_markup()
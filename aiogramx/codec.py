@@ -0,0 +1,193 @@
+from typing import Any, Dict, Optional, Type, Union
+
+from aiogram.filters import Filter
+from aiogram.filters.callback_data import CallbackData, MAX_CALLBACK_LENGTH
+from aiogram.types import CallbackQuery
+
+_setattr = object.__setattr__
+
+# Field types the codec converts itself, others need validation by pydantic
+_FAST_TYPES = (str, int)
+
+
+class CallbackCodec:
+    """
+    Packs and unpacks widget callback data with precompiled format strings, bypassing
+    pydantic validation and serialization of `CallbackData` models.
+
+    By default, packed strings are identical to `CallbackData.pack()` output. In compact mode,
+    a short prefix and single-character action codes are used instead, which leaves more of
+    Telegram's 64-byte callback data budget to the payload. Both formats are always accepted
+    by `unpack`, so switching modes does not break keyboards already sent.
+
+    The precompiled format is opt-in: it is used only with a `short_prefix`, an action field,
+    and `str` and `int` fields only. Other callback data classes, e.g. with `bool` or `Optional`
+    fields, are packed and unpacked by `CallbackData` itself, with pydantic validation.
+
+    Args:
+        cb (Type[CallbackData]): The callback data class.
+        action_field (str): Name of the field holding the action.
+        short_prefix (Optional[str]): Prefix used in compact mode.
+        actions (Optional[Dict[str, str]]): Mapping of actions to their compact codes.
+        compact (bool): Whether to pack callback data in compact mode.
+
+    Raises:
+        ValueError: If compact mode is requested for callback data the precompiled format
+            does not support.
+    """
+
+    def __init__(
+        self,
+        cb: Type[CallbackData],
+        action_field: str = "action",
+        short_prefix: Optional[str] = None,
+        actions: Optional[Dict[str, str]] = None,
+        compact: bool = False,
+    ):
+        self.cb = cb
+        self.sep = cb.__separator__
+        self.fields = tuple(cb.model_fields)
+        self.defaults = tuple(f.default for f in cb.model_fields.values())
+        self.types = tuple(f.annotation for f in cb.model_fields.values())
+        # Whether callback data is packed and unpacked without pydantic
+        self.fast = self.supports(cb, action_field, short_prefix)
+        if compact and not self.fast:
+            raise ValueError(
+                f"Compact mode of {cb.__name__} requires a short prefix, "
+                f"an {action_field!r} field and only str or int fields"
+            )
+        if not self.fast:
+            short_prefix = None
+
+        self.compact = compact
+        self.prefix = short_prefix if compact else cb.__prefix__
+        self.short_prefix = short_prefix
+        self._action_idx = self.fields.index(action_field) if self.fast else None
+        self._int_idx = tuple(i for i, t in enumerate(self.types) if t is int)
+        self._new = cb.__new__
+
+        self._encode_actions = dict(actions or {}) if compact else {}
+        self._decode_actions = {code: a for a, code in (actions or {}).items()}
+        self._format = self.sep.join([self.prefix] + ["{}"] * len(self.fields))
+        self._prefixes = {cb.__prefix__: False}
+        if short_prefix:
+            self._prefixes[short_prefix] = True
+
+    @staticmethod
+    def supports(
+        cb: Type[CallbackData],
+        action_field: str = "action",
+        short_prefix: Optional[str] = None,
+    ) -> bool:
+        """Tells whether a callback data class can use the precompiled and compact formats."""
+        return (
+            bool(short_prefix)
+            and action_field in cb.model_fields
+            and all(f.annotation in _FAST_TYPES for f in cb.model_fields.values())
+        )
+
+    @property
+    def prefixes(self):
+        """All prefixes accepted by `unpack`."""
+        return tuple(self._prefixes)
+
+    def pack(self, **values: Union[str, int]) -> str:
+        """
+        Packs field values into a callback data string. Omitted fields take their defaults.
+
+        Returns:
+            str: Packed callback data.
+
+        Raises:
+            ValueError: If a value contains the separator or the result exceeds 64 bytes.
+        """
+        if not self.fast:
+            return self.cb(**values).pack()
+
+        packed = []
+        for name, default in zip(self.fields, self.defaults):
+            value = values.get(name, default)
+            if value.__class__ is str:
+                if self.sep in value:
+                    raise ValueError(
+                        f"Separator symbol {self.sep!r} can not be used in value {name}={value!r}"
+                    )
+            packed.append(value)
+
+        if self._encode_actions:
+            action = packed[self._action_idx]
+            packed[self._action_idx] = self._encode_actions.get(action, action)
+
+        data = self._format.format(*packed)
+        if (
+            len(data) > MAX_CALLBACK_LENGTH // 4
+            and len(data.encode()) > MAX_CALLBACK_LENGTH
+        ):
+            raise ValueError(
+                f"Resulted callback data is too long! len({data!r}.encode()) > {MAX_CALLBACK_LENGTH}"
+            )
+        return data
+
+    def unpack(self, data: str) -> CallbackData:
+        """
+        Unpacks a callback data string in either format into a callback data instance.
+
+        Args:
+            data (str): Callback data string.
+
+        Returns:
+            CallbackData: Callback data instance, built without validation in the
+                precompiled format.
+
+        Raises:
+            ValueError: If the string does not belong to this callback data class.
+        """
+        if not self.fast:
+            return self.cb.unpack(data)
+
+        prefix, *parts = data.split(self.sep)
+        compact = self._prefixes.get(prefix)
+        if compact is None:
+            raise ValueError(f"Bad prefix ({prefix!r} != {self.cb.__prefix__!r})")
+        if len(parts) != len(self.fields):
+            raise ValueError(
+                f"Callback data {self.cb.__name__!r} takes {len(self.fields)} arguments "
+                f"but {len(parts)} were given"
+            )
+
+        for i in self._int_idx:
+            parts[i] = int(parts[i])
+        if compact:
+            action = parts[self._action_idx]
+            parts[self._action_idx] = self._decode_actions.get(action, action)
+
+        # Same as `model_construct`, minus its per-field default handling:
+        # every field is present here
+        values = dict(zip(self.fields, parts))
+        obj = self._new(self.cb)
+        _setattr(obj, "__dict__", values)
+        _setattr(obj, "__pydantic_fields_set__", set(values))
+        _setattr(obj, "__pydantic_extra__", None)
+        _setattr(obj, "__pydantic_private__", None)
+        return obj
+
+
+class CallbackCodecFilter(Filter):
+    """
+    Callback query filter unpacking callback data with a `CallbackCodec`,
+    a faster equivalent of `CallbackData.filter()`.
+
+    Args:
+        codec (CallbackCodec): The codec of the widget class.
+    """
+
+    def __init__(self, codec: CallbackCodec):
+        self.codec = codec
+
+    async def __call__(self, query: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        if not isinstance(query, CallbackQuery) or not query.data:
+            return False
+        try:
+            return {"callback_data": self.codec.unpack(query.data)}
+        except ValueError:
+            return False
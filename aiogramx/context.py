@@ -0,0 +1,90 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, Update
+
+
+@dataclass(frozen=True)
+class WidgetContext:
+    """
+    Describes the event being handled while widgets are created or used.
+
+    Attributes:
+        chat_id (Optional[int]): Chat the event comes from.
+        user_id (Optional[int]): User who triggered the event.
+        message_id (Optional[int]): Message the callback query was sent from, if any.
+        bot_id (Optional[int]): Bot the event was received by.
+    """
+
+    chat_id: Optional[int] = None
+    user_id: Optional[int] = None
+    message_id: Optional[int] = None
+    bot_id: Optional[int] = None
+
+    @property
+    def owner(self) -> Optional[Tuple[Optional[int], int]]:
+        """Returns `(chat_id, user_id)` used for per-user storage accounting, if the user is known."""
+        if self.user_id is None:
+            return None
+        return self.chat_id, self.user_id
+
+    @property
+    def message(self) -> Optional[Tuple[int, int]]:
+        """Returns `(chat_id, message_id)` of the callback message, if any."""
+        if self.chat_id is None or self.message_id is None:
+            return None
+        return self.chat_id, self.message_id
+
+
+_current_context: ContextVar[Optional[WidgetContext]] = ContextVar(
+    "aiogramx_widget_context", default=None
+)
+
+
+def get_context() -> Optional[WidgetContext]:
+    """Returns the context of the event being handled, if `WidgetContextMiddleware` is installed."""
+    return _current_context.get()
+
+
+class WidgetContextMiddleware(BaseMiddleware):
+    """
+    Middleware exposing the bot, chat, user and callback message of the handled event to widgets.
+
+    Widgets created while handling an event remember its user, which enables per-user storage
+    quotas and reuse of widgets bound to the same message (see `MemoryStorage`). The bot selects
+    the namespace of a `PerBotStorage`.
+
+    Install it as an outer middleware of updates, so that widgets created in any handler see it:
+
+        dp.update.outer_middleware(WidgetContextMiddleware())
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        user = data.get("event_from_user")
+        bot = data.get("bot")
+
+        query = event.callback_query if isinstance(event, Update) else event
+        message_id = None
+        if isinstance(query, CallbackQuery) and query.message is not None:
+            message_id = query.message.message_id
+
+        token = _current_context.set(
+            WidgetContext(
+                chat_id=chat.id if chat else None,
+                user_id=user.id if user else None,
+                message_id=message_id,
+                bot_id=bot.id if bot is not None else None,
+            )
+        )
+        try:
+            return await handler(event, data)
+        finally:
+            _current_context.reset(token)
@@ -0,0 +1,211 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiogramx.base import WidgetBase
+
+
+class EvictionPolicy(ABC):
+    """
+    Decides which widget a `MemoryStorage` evicts when it is full.
+
+    The storage reports every stored, used and removed key to its policy, and asks it for
+    a victim when the item limit is reached or the policy itself reports an overflow
+    (see `overflow`). Expired widgets are dropped by the storage regardless of the policy.
+
+    Attributes:
+        name (str): Name of the policy, as accepted by `make_policy`.
+        tracks_access (bool): Whether the policy needs `access` calls. Storages skip them
+            for policies that do not, keeping lookups as cheap as a dict access.
+    """
+
+    name: str = ""
+    tracks_access: bool = False
+
+    @abstractmethod
+    def insert(self, key: str, widget: "WidgetBase") -> None:
+        """Records a stored widget. Called again when a stored widget is saved anew."""
+
+    def access(self, key: str) -> None:
+        """Records a use of a stored widget, if `tracks_access` is set."""
+
+    @abstractmethod
+    def remove(self, key: str) -> None:
+        """Forgets a widget removed from the storage for any reason."""
+
+    @abstractmethod
+    def victim(self, lru_keys: Iterable[str]) -> str:
+        """
+        Returns the key to evict next.
+
+        Args:
+            lru_keys (Iterable[str]): Stored keys from the least to the most recently used.
+        """
+
+    def overflow(self) -> bool:
+        """Tells whether widgets must be evicted for a reason other than the item limit."""
+        return False
+
+    def reset(self, entries: Iterable[Tuple[str, "WidgetBase"]]) -> None:
+        """
+        Rebuilds the policy state from stored entries, in LRU order.
+
+        Args:
+            entries (Iterable[Tuple[str, WidgetBase]]): Stored `(key, widget)` pairs.
+        """
+        for key, widget in entries:
+            self.insert(key, widget)
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evicts the least recently used widget. This is the default policy."""
+
+    name = "lru"
+
+    def insert(self, key: str, widget: "WidgetBase") -> None:
+        pass
+
+    def remove(self, key: str) -> None:
+        pass
+
+    def victim(self, lru_keys: Iterable[str]) -> str:
+        return next(iter(lru_keys))
+
+
+class LFUPolicy(EvictionPolicy):
+    """
+    Evicts the least frequently used widget, the least recently used one among equally used.
+
+    Uses are counted in frequency buckets, so that insertions, uses and evictions take
+    constant time. Counts saturate at `max_count`, which keeps a widget that was popular
+    long ago from staying in the storage forever.
+
+    Args:
+        max_count (int): Upper bound of use counts.
+    """
+
+    name = "lfu"
+    tracks_access = True
+
+    def __init__(self, max_count: int = 64):
+        self.max_count = max_count
+        self._counts: Dict[str, int] = {}
+        # Use count -> keys with that count, ordered by last use
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        self._min_count = 1
+
+    def insert(self, key: str, widget: "WidgetBase") -> None:
+        if key in self._counts:
+            return
+        self._counts[key] = 1
+        self._buckets.setdefault(1, {})[key] = None
+        self._min_count = 1
+
+    def access(self, key: str) -> None:
+        count = self._counts.get(key)
+        if count is None:
+            return
+
+        bucket = self._buckets[count]
+        if count < self.max_count:
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+                if self._min_count == count:
+                    self._min_count = count + 1
+            count += 1
+            self._counts[key] = count
+            self._buckets.setdefault(count, {})[key] = None
+        else:
+            # Saturated, only refresh the recency among equally used keys
+            del bucket[key]
+            bucket[key] = None
+
+    def remove(self, key: str) -> None:
+        count = self._counts.pop(key, None)
+        if count is None:
+            return
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def victim(self, lru_keys: Iterable[str]) -> str:
+        bucket = self._buckets.get(self._min_count)
+        if bucket is None:
+            # The least used keys were removed for other reasons since
+            self._min_count = min(self._buckets)
+            bucket = self._buckets[self._min_count]
+        return next(iter(bucket))
+
+    def count(self, key: str) -> int:
+        """Returns the use count of a stored key, 0 if it is not stored."""
+        return self._counts.get(key, 0)
+
+
+class SizePolicy(EvictionPolicy):
+    """
+    Bounds the approximate memory held by stored widgets, evicting the least recently used
+    ones until the stored widgets fit `max_bytes`.
+
+    Sizes are reported by the widgets themselves (see `WidgetBase.approx_size`), so a single
+    `Paginator` holding thousands of buttons weighs as much as hundreds of small widgets.
+
+    Args:
+        max_bytes (int): Memory budget of the storage, in bytes.
+    """
+
+    name = "size"
+
+    def __init__(self, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.total = 0
+        self._sizes: Dict[str, int] = {}
+
+    def insert(self, key: str, widget: "WidgetBase") -> None:
+        size = widget.approx_size()
+        self.total += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def remove(self, key: str) -> None:
+        self.total -= self._sizes.pop(key, 0)
+
+    def victim(self, lru_keys: Iterable[str]) -> str:
+        return next(iter(lru_keys))
+
+    def overflow(self) -> bool:
+        # A single widget larger than the budget is still kept
+        return self.total > self.max_bytes and len(self._sizes) > 1
+
+
+POLICIES = {p.name: p for p in (LRUPolicy, LFUPolicy, SizePolicy)}
+
+
+def make_policy(
+    policy: Union[str, EvictionPolicy], max_bytes: Optional[int] = None
+) -> EvictionPolicy:
+    """
+    Returns an eviction policy instance.
+
+    Args:
+        policy (Union[str, EvictionPolicy]): A policy instance, or one of "lru", "lfu", "size".
+        max_bytes (Optional[int]): Memory budget, required by the "size" policy.
+
+    Raises:
+        ValueError: If the policy name is unknown or "size" is requested without `max_bytes`.
+    """
+    if isinstance(policy, EvictionPolicy):
+        return policy
+
+    policy_cls = POLICIES.get(policy)
+    if policy_cls is None:
+        raise ValueError(
+            f"Unknown eviction policy {policy!r}, expected one of {sorted(POLICIES)}"
+        )
+    if policy_cls is SizePolicy:
+        if max_bytes is None:
+            raise ValueError("The 'size' eviction policy requires max_bytes")
+        return SizePolicy(max_bytes)
+    return policy_cls()
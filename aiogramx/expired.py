@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Hashable, Optional
+
+from flipcache import LRUDict
+
+
+class ExpiredClickCache:
+    """
+    Keeps clicks on expired widgets cheap when users hammer old keyboards, e.g. after
+    a restart or a burst of evictions.
+
+    - Keys of expired widgets are remembered for `ttl` seconds in a bounded negative cache.
+      Repeated clicks on a remembered key skip the storage lookup and only get the answer.
+    - Removing the keyboard of an expired widget is throttled per chat to one call
+      every `strip_interval` seconds.
+    - Answers may be cached client-side for `answer_cache_time` seconds, so that repeated
+      clicks on the same button may not even reach the bot.
+
+    The cache is shared by all widget classes and may be used from several threads.
+
+    Args:
+        max_keys (int): Maximum number of remembered expired keys.
+        ttl (float): Seconds an expired key is remembered.
+        strip_interval (float): Minimum seconds between keyboard removals in a chat.
+        max_chats (int): Maximum number of chats throttling is tracked for.
+        answer_cache_time (int): `cache_time` of expired widget answers, 0 disables it.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 10_000,
+        ttl: float = 60.0,
+        strip_interval: float = 5.0,
+        max_chats: int = 10_000,
+        answer_cache_time: int = 30,
+    ):
+        self.ttl = ttl
+        self.strip_interval = strip_interval
+        self.answer_cache_time = answer_cache_time
+        self._keys = LRUDict(max_items=max_keys)
+        self._chats = LRUDict(max_items=max_chats)
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        max_keys: Optional[int] = None,
+        ttl: Optional[float] = None,
+        strip_interval: Optional[float] = None,
+        max_chats: Optional[int] = None,
+        answer_cache_time: Optional[int] = None,
+    ) -> None:
+        """Changes options in place. Options left as None keep their current values."""
+        if ttl is not None:
+            self.ttl = ttl
+        if strip_interval is not None:
+            self.strip_interval = strip_interval
+        if answer_cache_time is not None:
+            self.answer_cache_time = answer_cache_time
+        with self._lock:
+            for cache, max_items in ((self._keys, max_keys), (self._chats, max_chats)):
+                if max_items is not None:
+                    cache._max_items = max_items
+                    while len(cache) > max_items:
+                        cache.popitem(last=False)
+
+    def is_known(self, scope: Hashable, key: str) -> bool:
+        """
+        Tells whether a key was recently found expired.
+
+        Args:
+            scope (Hashable): Namespace of the key, e.g. the widget storage.
+            key (str): Widget key from callback data.
+        """
+        with self._lock:
+            seen = self._keys.get((scope, key))
+            if seen is None:
+                return False
+            if time.monotonic() - seen > self.ttl:
+                del self._keys[(scope, key)]
+                return False
+            return True
+
+    def add(self, scope: Hashable, key: str) -> None:
+        """Remembers a key found expired."""
+        with self._lock:
+            self._keys[(scope, key)] = time.monotonic()
+
+    def allow_strip(self, chat_id: int) -> bool:
+        """
+        Tells whether the keyboard of an expired widget may be removed in a chat now,
+        and if so, records the removal.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last = self._chats.get(chat_id)
+            if last is not None and now - last < self.strip_interval:
+                return False
+            self._chats[chat_id] = now
+            return True
+
+    def clear(self) -> None:
+        """Forgets all remembered keys and chats."""
+        with self._lock:
+            self._keys.clear()
+            self._chats.clear()
+
+
+expired_cache = ExpiredClickCache()
@@ -0,0 +1,139 @@
+import random
+from typing import Optional
+
+from aiogramx.utils import CHARSET
+
+
+BASE = len(CHARSET)
+_DIGITS = {ch: i for i, ch in enumerate(CHARSET)}
+
+# Starts shard prefixes. Not part of `CHARSET`, so keys issued without a shard prefix, including
+# random keys of other storages, never look like they belong to a shard.
+SHARD_MARK = "("
+
+
+class KeyAllocator:
+    """
+    Allocates widget keys from a monotonic counter encoded in `CHARSET`.
+
+    A key consists of an optional shard prefix, a fixed number of slot digits and one generation
+    character. The counter walks over all slots before reusing any of them, and every reuse bumps
+    the generation, so a button of an evicted widget never silently routes to a new widget.
+    Knowing the counter, the allocator tells in O(1) whether a key has been superseded
+    (see `is_stale`).
+
+    The number of slot digits adapts to the capacity of the storage, keeping at least `headroom`
+    times more slots than widgets the storage can hold. The counter starts at a random position,
+    so that keys issued after a restart are unlikely to match keys of the previous process.
+
+    Args:
+        capacity (int): Maximum number of widgets kept by the storage.
+        prefix (str): Shard or worker prefix prepended to every key.
+        headroom (int): Minimum ratio between the number of slots and `capacity`.
+    """
+
+    def __init__(self, capacity: int, prefix: str = "", headroom: int = 4):
+        if any(ch not in _DIGITS for ch in prefix.removeprefix(SHARD_MARK)):
+            raise ValueError(f"Key prefix {prefix!r} contains unsupported characters")
+
+        self.prefix = prefix
+        self.headroom = headroom
+        self.width = 1
+        self.resize(capacity)
+        self._start = self._counter = random.randrange(self.space * BASE)
+
+    @property
+    def space(self) -> int:
+        """Number of distinct slots."""
+        return BASE**self.width
+
+    @property
+    def key_length(self) -> int:
+        """Length of allocated keys including the prefix."""
+        return len(self.prefix) + self.width + 1
+
+    def resize(self, capacity: int) -> None:
+        """
+        Widens slots to fit a new capacity. Slots never shrink, so issued keys stay decodable.
+
+        Args:
+            capacity (int): New maximum number of widgets kept by the storage.
+        """
+        while BASE**self.width < capacity * self.headroom:
+            self.width += 1
+
+    def allocate(self) -> str:
+        """
+        Returns the next key. Runs in constant time.
+
+        Returns:
+            str: A new widget key.
+        """
+        n = self._counter
+        self._counter += 1
+
+        slot, generation = n % self.space, n // self.space
+
+        digits = []
+        for _ in range(self.width):
+            slot, d = divmod(slot, BASE)
+            digits.append(CHARSET[d])
+        digits.reverse()
+        return self.prefix + "".join(digits) + CHARSET[generation % BASE]
+
+    def _decode(self, key: str) -> Optional[int]:
+        """Returns the slot of a key issued by this allocator, or None if it does not look like one."""
+        if len(key) != self.key_length or not key.startswith(self.prefix):
+            return None
+
+        slot = 0
+        for ch in key[len(self.prefix) : -1]:
+            d = _DIGITS.get(ch)
+            if d is None:
+                return None
+            slot = slot * BASE + d
+        return slot
+
+    def is_stale(self, key: str) -> bool:
+        """
+        Tells whether a key has been superseded, i.e. its slot was never issued or was reissued
+        with a newer generation. Keys not shaped like keys of this allocator are never
+        reported as stale, since only a storage lookup can tell about them.
+
+        The allocator only knows the counter: a widget still stored when its slot comes round
+        again keeps a key reported as stale, so storages check their own keys first.
+
+        Args:
+            key (str): Widget key from callback data.
+
+        Returns:
+            bool: True if the key certainly does not belong to a live widget.
+        """
+        slot = self._decode(key)
+        if slot is None:
+            return False
+
+        # Generation of the latest key issued for this slot
+        generation = (self._counter - 1 - slot) // self.space
+        if slot + generation * self.space < self._start:
+            return True
+        return key[-1] != CHARSET[generation % BASE]
+
+    def get_state(self) -> tuple:
+        """Returns the allocator state, to be saved along with the widgets it issued keys for."""
+        return self.prefix, self.width, self._start, self._counter
+
+    def set_state(self, state: tuple) -> None:
+        """
+        Restores a state returned by `get_state`, so that restored keys are recognized.
+
+        The configured prefix is kept. A state saved with another prefix only widens the slots:
+        its keys can never collide with keys issued under the current prefix.
+
+        Args:
+            state (tuple): Saved allocator state.
+        """
+        prefix, width, start, counter = state
+        self.width = max(self.width, width)
+        if prefix == self.prefix:
+            self._start, self._counter = start, counter
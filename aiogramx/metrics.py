@@ -0,0 +1,352 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aiogramx.scheduler import EditScheduler
+    from aiogramx.storage import BaseStorage
+
+
+# Upper bounds of latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values, in the Prometheus sense.
+
+    Args:
+        buckets (Iterable[float]): Sorted upper bounds of the buckets. An implicit `+Inf`
+            bucket is always added.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Returns `(upper_bound, cumulative_count)` pairs, ending with `+Inf`."""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class WidgetMetrics:
+    """
+    Counters and latency histograms of a single widget class.
+
+    Attributes:
+        created (int): Widget instances created.
+        lookup_hits (int): Callback lookups that found the widget instance.
+        lookup_misses (int): Callback lookups for widgets no longer in storage.
+        expired_clicks (int): Clicks on expired widgets answered by the registered handler.
+        rehydrated (int): Lost widgets rebuilt from their template on lookup.
+        throttled (int): Clicks answered without processing by the per-user click limit.
+        coalesced (int): Clicks answered without processing because they were superseded by
+            a newer click on the same widget, or repeated the last applied one.
+        unchanged (int): Keyboard edits skipped because the keyboard was already shown.
+        evictions (Dict[str, int]): Widgets dropped from the storage bound to this class, by reason:
+            "capacity", "expired", "quota" or "replaced".
+        render (Histogram): `render_kb` latency in seconds.
+        process (Histogram): `process_cb` latency in seconds.
+    """
+
+    __slots__ = (
+        "created",
+        "lookup_hits",
+        "lookup_misses",
+        "expired_clicks",
+        "rehydrated",
+        "throttled",
+        "coalesced",
+        "unchanged",
+        "evictions",
+        "render",
+        "process",
+    )
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.created = 0
+        self.lookup_hits = 0
+        self.lookup_misses = 0
+        self.expired_clicks = 0
+        self.rehydrated = 0
+        self.throttled = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.evictions: Dict[str, int] = {}
+        self.render = Histogram(buckets)
+        self.process = Histogram(buckets)
+
+    def snapshot(self) -> dict:
+        return {
+            "created": self.created,
+            "lookup_hits": self.lookup_hits,
+            "lookup_misses": self.lookup_misses,
+            "expired_clicks": self.expired_clicks,
+            "rehydrated": self.rehydrated,
+            "throttled": self.throttled,
+            "coalesced": self.coalesced,
+            "unchanged": self.unchanged,
+            "evictions": dict(self.evictions),
+            "render_seconds": self.render.snapshot(),
+            "process_seconds": self.process.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    """
+    Collects widget metrics per widget class, without any external dependency.
+
+    Collection is disabled by default. Instrumented code checks the `enabled` attribute before
+    doing anything else, so a disabled registry costs a single attribute lookup per event.
+
+    Counters and histograms are updated without a lock to keep that cost low. When widgets are
+    used from several threads, concurrent updates may be lost, so values are approximate.
+
+    Args:
+        buckets (Iterable[float]): Upper bounds of latency histogram buckets, in seconds.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._widgets: Dict[str, WidgetMetrics] = {}
+
+    def widget(self, name: str) -> WidgetMetrics:
+        """Returns metrics of a widget class, creating them on first use."""
+        m = self._widgets.get(name)
+        if m is None:
+            # Threads creating metrics of the same class at once get the same object
+            m = self._widgets.setdefault(name, WidgetMetrics(self.buckets))
+        return m
+
+    def reset(self) -> None:
+        """Drops all collected values."""
+        self._widgets.clear()
+
+    def evicted(self, name: str, reason: str, count: int = 1) -> None:
+        evictions = self.widget(name).evictions
+        evictions[reason] = evictions.get(reason, 0) + count
+
+    def snapshot(
+        self,
+        storages: Optional[Dict[str, "BaseStorage"]] = None,
+        edits: Optional["EditScheduler"] = None,
+    ) -> dict:
+        """
+        Returns collected values as a dict.
+
+        Args:
+            storages (Optional[Dict[str, BaseStorage]]): Storages by bound class name,
+                whose current size and capacity are reported as well.
+            edits (Optional[EditScheduler]): Edit scheduler whose queue is reported as well.
+
+        Returns:
+            dict: `{"widgets": {name: {...}}, "storages": {name: {"size": ..., "capacity": ...}}}`,
+                with an `"edits"` entry if an edit scheduler is given.
+        """
+        result = {
+            "widgets": {name: m.snapshot() for name, m in self._widgets.items()},
+            "storages": {
+                name: {
+                    "size": len(storage),
+                    "capacity": getattr(storage, "max_items", None),
+                }
+                for name, storage in (storages or {}).items()
+            },
+        }
+        if edits is not None:
+            result["edits"] = edits.snapshot()
+        return result
+
+    def to_prometheus(
+        self,
+        storages: Optional[Dict[str, "BaseStorage"]] = None,
+        edits: Optional["EditScheduler"] = None,
+        namespace: str = "aiogramx",
+    ) -> str:
+        """
+        Renders collected values in the Prometheus text exposition format.
+
+        Args:
+            storages (Optional[Dict[str, BaseStorage]]): Storages by bound class name,
+                whose current size and capacity are exported as gauges.
+            edits (Optional[EditScheduler]): Edit scheduler whose queue depth, edit counts
+                and wait times are exported as well.
+            namespace (str): Prefix of metric names.
+
+        Returns:
+            str: Metrics text, ready to be served on a `/metrics` endpoint.
+        """
+        lines = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            full = f"{namespace}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        widgets = sorted(self._widgets.items())
+
+        name = family("widgets_created_total", "counter", "Widget instances created.")
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}"}} {m.created}')
+
+        name = family("lookups_total", "counter", "Widget lookups by callback key.")
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}",result="hit"}} {m.lookup_hits}')
+            lines.append(f'{name}{{widget="{widget}",result="miss"}} {m.lookup_misses}')
+
+        name = family(
+            "expired_clicks_total", "counter", "Clicks on expired widgets answered."
+        )
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}"}} {m.expired_clicks}')
+
+        name = family(
+            "rehydrated_total", "counter", "Lost widgets rebuilt from their template."
+        )
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}"}} {m.rehydrated}')
+
+        name = family(
+            "throttled_clicks_total", "counter", "Clicks over the per-user click limit."
+        )
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}"}} {m.throttled}')
+
+        name = family(
+            "coalesced_clicks_total",
+            "counter",
+            "Clicks superseded by a newer or equal click on the same widget.",
+        )
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}"}} {m.coalesced}')
+
+        name = family(
+            "unchanged_edits_total",
+            "counter",
+            "Keyboard edits skipped because the keyboard was already shown.",
+        )
+        for widget, m in widgets:
+            lines.append(f'{name}{{widget="{widget}"}} {m.unchanged}')
+
+        name = family("evictions_total", "counter", "Widgets dropped from storage.")
+        for widget, m in widgets:
+            for reason, count in sorted(m.evictions.items()):
+                lines.append(f'{name}{{widget="{widget}",reason="{reason}"}} {count}')
+
+        for attr, metric, help_text in (
+            ("render", "render_seconds", "Latency of render_kb."),
+            ("process", "process_seconds", "Latency of process_cb."),
+        ):
+            name = family(metric, "histogram", help_text)
+            for widget, m in widgets:
+                hist: Histogram = getattr(m, attr)
+                for bound, count in hist.cumulative():
+                    lines.append(
+                        f'{name}_bucket{{widget="{widget}",le="{bound}"}} {count}'
+                    )
+                lines.append(f'{name}_sum{{widget="{widget}"}} {hist.sum}')
+                lines.append(f'{name}_count{{widget="{widget}"}} {hist.count}')
+
+        if storages:
+            size = family("storage_size", "gauge", "Widgets currently stored.")
+            capacity = family("storage_capacity", "gauge", "Storage capacity.")
+            for widget, storage in sorted(storages.items()):
+                lines.append(f'{size}{{storage="{widget}"}} {len(storage)}')
+                max_items = getattr(storage, "max_items", None)
+                if max_items is not None:
+                    lines.append(f'{capacity}{{storage="{widget}"}} {max_items}')
+
+        if edits is not None:
+            name = family("edit_queue_depth", "gauge", "Messages waiting for an edit.")
+            lines.append(f"{name} {edits.depth}")
+            name = family("edits_total", "counter", "Keyboard edits by outcome.")
+            for result in ("sent", "superseded", "retried", "dropped", "failed"):
+                lines.append(f'{name}{{result="{result}"}} {getattr(edits, result)}')
+            name = family(
+                "edit_wait_seconds", "histogram", "Time edits waited in the queue."
+            )
+            for bound, count in edits.wait.cumulative():
+                lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+            lines.append(f"{name}_sum {edits.wait.sum}")
+            lines.append(f"{name}_count {edits.wait.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def timed(hist_attr: str, fn):
+    """
+    Wraps a `render_kb` or `process_cb` implementation to record its latency into the
+    widget class histogram named `hist_attr`. Both plain and coroutine functions are supported.
+
+    Widget classes are only wrapped while metrics are enabled (see `WidgetBase.enable_metrics`),
+    so the wrapper measures unconditionally and disabled metrics cost nothing on these calls.
+    The original function stays available as `__wrapped__`.
+    """
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(self, *args, **kwargs)
+            finally:
+                getattr(metrics.widget(self.__class__.__name__), hist_attr).observe(
+                    time.perf_counter() - start
+                )
+
+    else:
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                getattr(metrics.widget(self.__class__.__name__), hist_attr).observe(
+                    time.perf_counter() - start
+                )
+
+    wrapper.__timed__ = True
+    return wrapper
@@ -1,11 +1,11 @@
 from math import ceil
-from typing import Optional, List, Awaitable, Protocol, Callable
+from typing import Optional, List, Awaitable, Protocol, Callable, NamedTuple
 
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import InlineKeyboardButton, CallbackQuery, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from aiogramx.base import WidgetBase
+from aiogramx.base import WidgetBase, ConfigField, intern_config
 from aiogramx.utils import ibtn, fallback_lang
 
 
@@ -35,6 +35,15 @@ class LazyButtonLoader(Protocol):
         ...
 
 
+class PaginatorConfig(NamedTuple):
+    """Immutable configuration of a `Paginator`, shared between instances created alike."""
+
+    per_page: int
+    per_row: int
+    lang: str
+    back_button_text: str
+
+
 class PaginatorCB(CallbackData, prefix="aiogramx_pg"):
     """Callback data structure for paginator interactions.
 
@@ -81,6 +90,27 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
     """
 
     _cb = PaginatorCB
+    _cb_short_prefix = "axp"
+    _cb_actions = {"PASS": ".", "NAV": "n", "BACK": "b", "SEL": "s"}
+    _navigation_actions = frozenset(("NAV",))
+
+    __slots__ = (
+        "_config",
+        "_data",
+        "_count",
+        "_lazy_data",
+        "_lazy_count",
+        "on_select",
+        "on_back",
+    )
+
+    # Approximate memory held by a single `InlineKeyboardButton`
+    _button_size = 1100
+
+    per_page = ConfigField()
+    per_row = ConfigField()
+    lang = ConfigField()
+    _back_button_text = ConfigField("back_button_text")
 
     def __init__(
         self,
@@ -113,8 +143,15 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
         if not (1 <= per_page <= 94):
             raise ValueError("per_page must be between 1 and 94")
 
-        self.per_page = per_page
-        self.per_row = per_row
+        lang = fallback_lang(lang)
+        self._config = intern_config(
+            PaginatorConfig(
+                per_page=per_page,
+                per_row=per_row,
+                lang=lang,
+                back_button_text=back_button_text or _TEXTS[lang]["back"],
+            )
+        )
         self._data = data
         self._count = len(data) if data is not None else None
         self._lazy_data = lazy_data
@@ -122,8 +159,6 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
 
         self.on_select = on_select
         self.on_back = on_back
-        self.lang = fallback_lang(lang)
-        self._back_button_text = back_button_text or _TEXTS[self.lang]["back"]
 
         super().__init__()
 
@@ -138,7 +173,7 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
         Returns:
             str: Packed callback data string.
         """
-        return self._cb(action=action, data=data, key=self._key).pack()
+        return self._codec.pack(action=action, data=data, key=self._key)
 
     @property
     def is_lazy(self) -> bool:
@@ -150,6 +185,38 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
         """
         return self._lazy_data is not None
 
+    def approx_size(self) -> int:
+        """
+        Returns the approximate memory held by the paginator, growing with its static buttons.
+
+        Returns:
+            int: Approximate size in bytes.
+        """
+        if self._data is None:
+            return self._approx_size
+        return self._approx_size + len(self._data) * self._button_size
+
+    def _dump_state(self) -> Optional[tuple]:
+        # Lazy loaders are callables and cannot be serialized
+        if self.is_lazy:
+            return None
+
+        buttons = tuple(b.model_dump(exclude_none=True) for b in self._data)
+        per_page, per_row, lang, back_button_text = self._config
+        return per_page, per_row, buttons, lang, back_button_text
+
+    def _load_state(self, state: tuple) -> None:
+        per_page, per_row, buttons, lang, back_button_text = state
+        self._config = intern_config(
+            PaginatorConfig(per_page, per_row, lang, back_button_text)
+        )
+        self._data = [InlineKeyboardButton(**b) for b in buttons]
+        self._count = len(self._data)
+        self._lazy_data = None
+        self._lazy_count = None
+        self.on_select = None
+        self.on_back = None
+
     async def get_count(self) -> int:
         """
         Retrieve total number of items for pagination.
@@ -244,29 +311,43 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
         Returns:
             Optional[PaginatorCB]: Callback data for further use, or None if handled internally.
         """
-        if data.action == "PASS":
-            await c.answer(cache_time=120)
-
-        elif data.action == "NAV":
-            page = int(data.data)
-            await c.message.edit_reply_markup(reply_markup=await self.render_kb(page))
-            await c.answer()
-
-        elif data.action == "BACK":
-            if self.on_back:
-                await self.on_back(c)
-            elif self.is_registered:
-                await c.message.edit_text("Ok")
-                await c.answer()
-            else:
-                return data
-
-        elif data.action == "SEL":
-            if self.on_select:
-                await self.on_select(c, data.data)
-            elif self.is_registered:
-                pass
-            else:
-                return data
+        handler = self._ACTIONS.get(data.action)
+        if handler is None:
+            return None
+        return await handler(self, c, data)
+
+    async def _on_pass(self, c: CallbackQuery, data: PaginatorCB) -> None:
+        await self._reply(c.answer(cache_time=120))
 
+    async def _on_nav(self, c: CallbackQuery, data: PaginatorCB) -> None:
+        page = int(data.data)
+        await self._edit_markup(c, await self.render_kb(page))
+        await self._reply(c.answer())
+
+    async def _on_back(
+        self, c: CallbackQuery, data: PaginatorCB
+    ) -> Optional[PaginatorCB]:
+        if self.on_back:
+            await self.on_back(c)
+        elif self.is_registered:
+            await c.message.edit_text("Ok")
+            await self._reply(c.answer())
+        else:
+            return data
         return None
+
+    async def _on_sel(
+        self, c: CallbackQuery, data: PaginatorCB
+    ) -> Optional[PaginatorCB]:
+        if self.on_select:
+            await self.on_select(c, data.data)
+        elif not self.is_registered:
+            return data
+        return None
+
+    _ACTIONS = {
+        "PASS": _on_pass,
+        "NAV": _on_nav,
+        "BACK": _on_back,
+        "SEL": _on_sel,
+    }
@@ -0,0 +1,68 @@
+import time
+from typing import Hashable, Optional
+
+from flipcache import LRUDict
+
+
+class ClickLimiter:
+    """
+    Token bucket limiting how fast clicks of a single user are processed, so that a user tapping
+    a button repeatedly does not spend the bot's Bot API rate limit on a re-render per tap.
+
+    Every user may click `burst` times in a row, and then `rate` times per second. Clicks over
+    the limit are answered right away, without looking up, processing or re-rendering the widget.
+    Buckets of up to `max_users` users are kept, the least recently active are dropped and start
+    over with a full bucket.
+
+    Args:
+        rate (float): Clicks per second a user's bucket refills with.
+        burst (int): Bucket size, the number of clicks allowed in a row.
+        max_users (int): Maximum number of users whose buckets are kept.
+        text (Optional[str]): Text of the answer to throttled clicks. None answers silently.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 5,
+        max_users: int = 10_000,
+        text: Optional[str] = None,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("Click rate must be positive and burst at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.text = text
+        self._buckets = LRUDict(max_items=max_users)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, user_id: Hashable) -> bool:
+        """
+        Takes a token from the bucket of a user.
+
+        Args:
+            user_id (Hashable): Id of the clicking user.
+
+        Returns:
+            bool: Whether the click may be processed.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            self._buckets[user_id] = [self.burst - 1, now]
+            return True
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def clear(self) -> None:
+        """Forgets the buckets of all users."""
+        self._buckets.clear()
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
+
+from aiogramx.metrics import Histogram
+from aiogramx.ratelimit import ClickLimiter
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of edit wait time histogram buckets, in seconds
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class EditScheduler:
+    """
+    Queue of keyboard edits of all widgets, sent within Telegram flood limits instead of right
+    away from `process_cb`.
+
+    Widgets submit their re-rendered keyboards, and a background task sends them in submission
+    order, at most `global_rate` edits per second in total and `chat_rate` per second in a chat,
+    after a burst of `chat_burst`. Only the latest keyboard waiting for a message is kept, older
+    ones are dropped unsent. When Telegram still answers with a flood wait, sending pauses for
+    the requested time and the edit is retried, unless a newer keyboard has been submitted.
+
+    Up to `max_pending` messages wait for an edit, the oldest are dropped first. Rate limits of
+    up to `max_chats` chats are tracked.
+
+    Attributes:
+        sent (int): Edits sent.
+        superseded (int): Keyboards replaced by a newer one before being sent.
+        retried (int): Edits answered with a flood wait and queued again.
+        dropped (int): Edits dropped because the queue was full.
+        failed (int): Edits given up on after an error other than a flood wait or
+            a bad request, like a blocked bot or a network failure.
+        wait (Histogram): Seconds edits waited in the queue.
+
+    Args:
+        global_rate (float): Edits per second in total.
+        chat_rate (float): Edits per second in a single chat after a burst.
+        chat_burst (int): Edits allowed in a row in a single chat.
+        max_pending (int): Maximum number of messages waiting for an edit.
+        max_chats (int): Maximum number of chats whose rate is tracked.
+        interval (float): Seconds between sending rounds while edits are waiting.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        max_pending: int = 10_000,
+        max_chats: int = 10_000,
+        interval: float = 0.05,
+    ):
+        if global_rate <= 0:
+            raise ValueError("Global edit rate must be positive")
+
+        self.global_rate = global_rate
+        self.max_pending = max_pending
+        self.interval = interval
+        self.sent = 0
+        self.superseded = 0
+        self.retried = 0
+        self.dropped = 0
+        self.failed = 0
+        self.wait = Histogram(WAIT_BUCKETS)
+
+        # (chat_id, message_id) -> (message, markup, submission time, success callback)
+        self._pending: "OrderedDict[Tuple[int, int], tuple]" = OrderedDict()
+        self._in_flight = set()
+        self._tasks = set()
+        self._chats = ClickLimiter(chat_rate, chat_burst, max_users=max_chats)
+        self._tokens = global_rate
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        # Created by `run` in the loop it runs in: before Python 3.10, an event created
+        # outside of a running loop is bound to the wrong one
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting for an edit."""
+        return len(self._pending)
+
+    def submit(
+        self,
+        message: Any,
+        markup: Optional[InlineKeyboardMarkup],
+        on_sent: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Queues an edit of the keyboard of a message, replacing any edit of it still waiting.
+
+        Args:
+            message (Message): The message to edit, bound to the bot that sent it.
+            markup (Optional[InlineKeyboardMarkup]): The new keyboard.
+            on_sent (Optional[Callable[[], None]]): Called once the edit succeeded. Not called
+                if the edit fails, is dropped or is replaced by a newer one.
+        """
+        key = (message.chat.id, message.message_id)
+        previous = self._pending.get(key)
+        if previous is not None:
+            # Keeps its place in the queue and its wait time
+            self._pending[key] = (message, markup, previous[2], on_sent)
+            self.superseded += 1
+        else:
+            self._pending[key] = (message, markup, time.monotonic(), on_sent)
+            if len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Starts sending waiting edits, as many as the rate limits allow right now.
+
+        Returns:
+            int: Number of edits started.
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.global_rate, self._tokens + (now - self._refilled) * self.global_rate
+        )
+        self._refilled = now
+        if now < self._paused_until:
+            return 0
+
+        started = 0
+        for key in list(self._pending):
+            if self._tokens < 1:
+                break
+            # Edits of a message are sent one at a time, so that they cannot overtake each other
+            if key in self._in_flight or not self._chats.allow(key[0]):
+                continue
+
+            message, markup, submitted, on_sent = self._pending.pop(key)
+            self._tokens -= 1
+            self.wait.observe(now - submitted)
+            self._in_flight.add(key)
+            task = asyncio.create_task(self._send(key, message, markup, on_sent))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started += 1
+        return started
+
+    async def _send(
+        self, key: tuple, message: Any, markup: Any, on_sent: Optional[Callable]
+    ) -> None:
+        try:
+            await message.edit_reply_markup(reply_markup=markup)
+            self.sent += 1
+            if on_sent is not None:
+                on_sent()
+        except TelegramRetryAfter as e:
+            self.retried += 1
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + e.retry_after
+            )
+            if key not in self._pending:
+                self._pending[key] = (message, markup, time.monotonic(), on_sent)
+                self._pending.move_to_end(key, last=False)
+        except TelegramBadRequest:
+            # Message deleted, too old to edit, or showing this keyboard already
+            pass
+        except Exception as e:
+            # Blocked by the user, network or server errors: give up on this edit only
+            self.failed += 1
+            logger.warning(
+                "Failed to edit keyboard of message %s in chat %s: %r",
+                key[1],
+                key[0],
+                e,
+            )
+        finally:
+            self._in_flight.discard(key)
+
+    def snapshot(self) -> dict:
+        """Returns queue depth, edit counters and the wait time histogram as a dict."""
+        return {
+            "depth": self.depth,
+            "sent": self.sent,
+            "superseded": self.superseded,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "wait_seconds": self.wait.snapshot(),
+        }
+
+    async def run(self) -> None:
+        """Sends waiting edits until cancelled."""
+        self._wakeup = asyncio.Event()
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            self.flush()
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,151 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, Update
+
+from aiogramx.keys import BASE, SHARD_MARK
+from aiogramx.utils import CHARSET
+
+_DIGITS = {ch: i for i, ch in enumerate(CHARSET)}
+
+# Callback data prefix -> (separator, index of the key among separated parts)
+_routes: Dict[str, Tuple[str, int]] = {}
+_routed_count = 0
+
+
+def shard_width(shards: int) -> int:
+    """Returns the number of key characters holding a shard id, given the number of shards."""
+    width = 1
+    while BASE**width < shards:
+        width += 1
+    return width
+
+
+def shard_prefix(shard: int, shards: int) -> str:
+    """
+    Encodes a shard id as a fixed-width widget key prefix, starting with `SHARD_MARK`.
+
+    Args:
+        shard (int): Id of this worker, from 0 to `shards - 1`.
+        shards (int): Number of workers.
+
+    Returns:
+        str: Key prefix of the shard.
+
+    Raises:
+        ValueError: If the shard id is out of range.
+    """
+    if not 0 <= shard < shards:
+        raise ValueError(f"Shard id {shard} is out of range for {shards} shards")
+
+    digits = []
+    for _ in range(shard_width(shards)):
+        shard, d = divmod(shard, BASE)
+        digits.append(CHARSET[d])
+    return SHARD_MARK + "".join(reversed(digits))
+
+
+def _key_routes() -> Dict[str, Tuple[str, int]]:
+    """Returns callback data routes of all widget classes, refreshed when classes are added."""
+    global _routed_count
+    from aiogramx.base import WidgetMeta
+
+    if _routed_count != len(WidgetMeta.widgets):
+        for widget_cls in WidgetMeta.widgets.values():
+            codec = widget_cls._codec
+            for prefix in codec.prefixes:
+                _routes[prefix] = (codec.sep, codec.fields.index("key") + 1)
+        _routed_count = len(WidgetMeta.widgets)
+    return _routes
+
+
+def shard_of(data: Optional[str], shards: int) -> Optional[int]:
+    """
+    Extracts the shard id from callback data of any AiogramX widget.
+
+    Only needs the callback data string and the number of shards, so it can run in a front proxy
+    as well as in the workers. Widget classes must be imported, so that their callback data
+    prefixes are known.
+
+    Args:
+        data (Optional[str]): Callback data of a callback query.
+        shards (int): Number of workers, as passed to `WidgetBase.set_shard()`.
+
+    Returns:
+        Optional[int]: Id of the worker owning the widget, or None if the callback data does not
+            belong to a widget or its key carries no valid shard prefix, e.g. keys issued before
+            `WidgetBase.set_shard()` or by storages generating random keys.
+    """
+    if not data:
+        return None
+
+    routes = _key_routes()
+    route = None
+    for sep in {sep for sep, _ in routes.values()}:
+        route = routes.get(data.partition(sep)[0])
+        if route is not None:
+            break
+    if route is None:
+        return None
+
+    sep, idx = route
+    parts = data.split(sep)
+    if idx >= len(parts):
+        return None
+
+    width = shard_width(shards)
+    key = parts[idx]
+    if len(key) <= width + 1 or key[0] != SHARD_MARK:
+        return None
+
+    shard = 0
+    for ch in key[1 : width + 1]:
+        d = _DIGITS.get(ch)
+        if d is None:
+            return None
+        shard = shard * BASE + d
+    return shard if shard < shards else None
+
+
+class ShardRouterMiddleware(BaseMiddleware):
+    """
+    Middleware forwarding clicks on widgets created by another worker to that worker.
+
+    With `WidgetBase.set_shard()`, widget keys start with the id of the worker that created
+    the widget. Callback queries whose widget belongs to another shard are passed to `forward`
+    instead of the handlers; all other events are handled as usual.
+
+    Install it as an outer middleware of updates, so that `forward` receives the whole update:
+
+        dp.update.outer_middleware(ShardRouterMiddleware(shard, shards, forward))
+
+    Args:
+        shard (int): Id of this worker.
+        shards (int): Number of workers.
+        forward (Callable[[int, TelegramObject], Awaitable[Any]]): Coroutine function called with
+            the owning shard id and the event, e.g. posting the update to that worker's webhook.
+    """
+
+    def __init__(
+        self,
+        shard: int,
+        shards: int,
+        forward: Callable[[int, TelegramObject], Awaitable[Any]],
+    ):
+        shard_prefix(shard, shards)  # validate
+        self.shard = shard
+        self.shards = shards
+        self.forward = forward
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        query = event.callback_query if isinstance(event, Update) else event
+        if isinstance(query, CallbackQuery):
+            owner = shard_of(query.data, self.shards)
+            if owner is not None and owner != self.shard:
+                return await self.forward(owner, event)
+        return await handler(event, data)
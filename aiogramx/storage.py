@@ -0,0 +1,1688 @@
+import asyncio
+import itertools
+import logging
+import marshal
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    AsyncIterator,
+    Callable,
+    Optional,
+    Iterator,
+    List,
+    Tuple,
+    Dict,
+    Union,
+    TYPE_CHECKING,
+)
+
+from flipcache import LRUDict
+
+from aiogramx.context import get_context
+from aiogramx.eviction import EvictionPolicy, make_policy
+from aiogramx.keys import BASE, KeyAllocator
+from aiogramx.metrics import metrics
+from aiogramx.utils import CHARSET, gen_key
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+if TYPE_CHECKING:
+    from aiogramx.base import WidgetBase
+
+logger = logging.getLogger(__name__)
+
+
+class BaseStorage(ABC):
+    """
+    Interface for storages that keep track of live widget instances.
+
+    Every widget class owns a storage bound to it via `bind()`. The callback handler installed
+    by `WidgetBase.register()` goes through the asynchronous `get`/`set`/`delete`/`touch` methods.
+    Widget constructors and `WidgetBase.from_cb` cannot await, so storages also provide
+    synchronous `*_nowait` counterparts. Local storages implement only the synchronous methods,
+    the asynchronous ones delegate to them by default.
+    """
+
+    widget_cls: Optional[type] = None
+    # Name the storage reports metrics under, the bound class name by default
+    name: Optional[str] = None
+    # Whether the storage keeps live widget instances rather than copies of their state
+    keeps_instances: bool = False
+    # Called with `(key, widget, reason)` when a widget is dropped for a reason other than
+    # an explicit deletion, see `set_eviction_hook`
+    on_evict: Optional[Callable[[str, "WidgetBase", str], None]] = None
+    # Whether clicks must hold `lock()` on the widget key, see `lock`
+    locks_keys: bool = False
+
+    def bind(self, widget_cls: type) -> None:
+        """
+        Binds the storage to the widget class whose instances it keeps.
+
+        Args:
+            widget_cls (type): The widget class owning this storage.
+        """
+        self.widget_cls = widget_cls
+        self.name = widget_cls.__name__
+
+    def resolve(self) -> "BaseStorage":
+        """
+        Returns the storage serving the event being handled. Namespaced storages return
+        the namespace of the current bot, others return themselves.
+        """
+        return self
+
+    @abstractmethod
+    def get_nowait(self, key: str) -> Optional["WidgetBase"]:
+        """Returns the widget stored under `key` or None, marking it as recently used."""
+
+    @abstractmethod
+    def set_nowait(self, key: str, widget: "WidgetBase") -> None:
+        """Stores `widget` under `key`, replacing any previous value."""
+
+    @abstractmethod
+    def delete_nowait(self, key: str) -> None:
+        """Removes the widget stored under `key`, if any."""
+
+    @abstractmethod
+    def touch_nowait(self, key: str) -> None:
+        """Marks the widget stored under `key` as recently used without loading it."""
+
+    @abstractmethod
+    def __contains__(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        pass
+
+    def key_for_message(self, message: Optional[tuple]) -> Optional[str]:
+        """Returns the key of the widget bound to a `(chat_id, message_id)` message, if tracked."""
+        return None
+
+    def set_eviction_hook(
+        self, hook: Optional[Callable[[str, "WidgetBase", str], None]]
+    ) -> None:
+        """
+        Sets a function called with `(key, widget, reason)` whenever the storage drops a widget
+        by itself. Reasons are "capacity", "expired", "quota" and "replaced", as in metrics.
+        Storages that cannot tell when widgets are dropped never call it.
+
+        Args:
+            hook (Optional[Callable[[str, WidgetBase, str], None]]): The hook, None removes it.
+        """
+        self.on_evict = hook
+
+    @asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[None]:
+        """
+        Holds a lock on a widget key while a click on the widget is loaded, processed and saved.
+
+        Storages shared between processes set `locks_keys` and implement it, so that clicks on
+        the same widget in different processes do not overwrite each other's updates.
+        The default implementation does nothing.
+
+        Args:
+            key (str): Key of the widget.
+        """
+        yield
+
+    def allocate_key(self) -> str:
+        """
+        Returns a key not used by any stored widget.
+
+        The default implementation draws random keys, which suits storages shared
+        between processes that cannot coordinate a counter.
+        """
+        return gen_key(self, length=4)
+
+    def is_stale(self, key: str) -> bool:
+        """Tells whether a key certainly does not belong to a stored widget, without a lookup."""
+        return False
+
+    def pin(self, key: str) -> None:
+        """
+        Keeps the widget stored under `key` until it is deleted: it is no longer evicted,
+        expired or counted against capacity and quotas. Storages that cannot pin widgets keep
+        them like any other.
+
+        Args:
+            key (str): Key of a stored widget.
+        """
+
+    def items(self) -> List[Tuple[str, "WidgetBase"]]:
+        """
+        Returns all stored widgets from the least to the most recently used.
+
+        The default implementation loads every widget through `get_nowait`,
+        storages able to do it cheaper should override it.
+        """
+        result = []
+        for key in self:
+            widget = self.get_nowait(key)
+            if widget is not None:
+                result.append((key, widget))
+        return result
+
+    async def get(self, key: str) -> Optional["WidgetBase"]:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, widget: "WidgetBase") -> None:
+        self.set_nowait(key, widget)
+
+    async def delete(self, key: str) -> None:
+        self.delete_nowait(key)
+
+    async def touch(self, key: str) -> None:
+        self.touch_nowait(key)
+
+
+class MemoryStorage(BaseStorage):
+    """
+    In-process LRU storage of widget instances. This is the default storage of every widget class.
+
+    When `ttl` is set, widgets not used for longer than `ttl` seconds expire. Expired widgets are
+    dropped lazily on lookup, a few more are swept on every write, and `sweep()` can be called
+    periodically to drop the rest. Since widgets are ordered by last use, expired ones are always
+    at the front of the storage, so sweeping never scans live widgets.
+
+    When `per_user` is set, each `(chat_id, user_id)` owner may hold at most that many widgets,
+    and creating one more evicts the oldest widget of the same owner rather than the least
+    recently used widget of everybody. Owners are known when widgets are created under
+    `WidgetContextMiddleware`.
+
+    When `per_message` is enabled, a message keeps at most one widget: binding a widget to
+    a message drops the widget previously bound to it, and widgets created while handling a
+    callback from that message reuse its key instead of allocating a new one.
+
+    Keys are issued by a `KeyAllocator`, so allocation takes constant time however full the
+    storage is, and keys of evicted widgets are recognized as stale without a lookup.
+
+    Pinned widgets (see `pin`), such as broadcast widgets, are kept apart from the others
+    until deleted.
+
+    The widget evicted when the storage is full is chosen by its eviction policy: the least
+    recently used one ("lru", default), the least frequently used one ("lfu"), or, with "size",
+    the least recently used ones until the approximate size of stored widgets fits `max_bytes`
+    (see `aiogramx.eviction`).
+
+    Args:
+        max_items (int): Maximum number of widgets to keep. The least recently used widget
+            is evicted once the limit is reached.
+        ttl (Optional[float]): Idle time in seconds after which a widget expires. None disables expiry.
+        per_user (Optional[int]): Maximum number of widgets per owner. None disables the quota.
+        per_message (bool): Whether to keep a single widget per message.
+        key_prefix (str): Shard or worker prefix of allocated keys.
+        eviction (Union[str, EvictionPolicy]): Eviction policy, "lru", "lfu", "size" or
+            a policy instance.
+        max_bytes (Optional[int]): Memory budget in bytes, required by the "size" policy.
+    """
+
+    keeps_instances = True
+
+    # Upper bound of expired widgets dropped per write, keeps writes O(1)
+    _SWEEP_STEP = 2
+
+    def __init__(
+        self,
+        max_items: int = 1000,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: bool = False,
+        key_prefix: str = "",
+        eviction: Union[str, EvictionPolicy] = "lru",
+        max_bytes: Optional[int] = None,
+    ):
+        self.keys = KeyAllocator(capacity=max_items, prefix=key_prefix)
+        self.policy = make_policy(eviction, max_bytes)
+        self._track_access = self.policy.tracks_access
+        self.max_items = max_items
+        self.ttl = ttl
+        self.per_user = per_user
+        self.per_message = per_message
+        self._data = LRUDict(max_items=max_items)
+        self._atime: Dict[str, float] = {}
+        self._owned: Dict[tuple, Dict[str, None]] = {}
+        self._owner_of: Dict[str, tuple] = {}
+        self._by_message: Dict[tuple, str] = {}
+        self._message_of: Dict[str, tuple] = {}
+        # Widgets kept out of capacity, expiry and quotas, see `pin`
+        self._pinned: Dict[str, "WidgetBase"] = {}
+
+    def configure(
+        self,
+        max_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: Optional[bool] = None,
+        key_prefix: Optional[str] = None,
+        eviction: Optional[Union[str, EvictionPolicy]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Changes capacity, expiry, quotas, key prefix and eviction policy of the storage in place.
+
+        Args:
+            max_items (Optional[int]): New capacity, the least recently used widgets are evicted
+                if the storage holds more. None keeps the current capacity.
+            ttl (Optional[float]): New idle time in seconds after which widgets expire.
+                None keeps the current value, 0 disables expiry.
+            per_user (Optional[int]): New per-owner quota, applied to newly stored widgets.
+                None keeps the current value, 0 disables the quota.
+            per_message (Optional[bool]): Whether to keep a single widget per message,
+                applied to newly stored widgets. None keeps the current value.
+            key_prefix (Optional[str]): New prefix of allocated keys. None keeps the current one.
+            eviction (Optional[Union[str, EvictionPolicy]]): New eviction policy.
+                None keeps the current one, or switches to "size" if `max_bytes` is given.
+            max_bytes (Optional[int]): New memory budget of the "size" policy.
+        """
+        if eviction is not None or max_bytes is not None:
+            if eviction is None:
+                eviction = "size"
+            if max_bytes is None:
+                max_bytes = getattr(self.policy, "max_bytes", None)
+            policy = make_policy(eviction, max_bytes)
+            policy.reset(self._data.items())
+            self.policy = policy
+            self._track_access = policy.tracks_access
+            while policy.overflow():
+                self._evict()
+
+        if key_prefix is not None:
+            self.keys = KeyAllocator(capacity=self.max_items, prefix=key_prefix)
+        if per_user is not None:
+            self.per_user = per_user or None
+            if self.per_user is None:
+                self._owned.clear()
+                self._owner_of.clear()
+
+        if per_message is not None:
+            self.per_message = per_message
+            if not per_message:
+                self._by_message.clear()
+                self._message_of.clear()
+
+        if ttl is not None:
+            if ttl and self.ttl is None:
+                now = time.monotonic()
+                self._atime = dict.fromkeys(self._data, now)
+            self.ttl = ttl or None
+            if self.ttl is None:
+                self._atime.clear()
+
+        if max_items is not None:
+            self.max_items = max_items
+            self.keys.resize(max_items)
+            self._data._max_items = max_items
+            while len(self._data) > max_items:
+                self._evict()
+
+    def _evict(self, reason: str = "capacity") -> None:
+        key = self.policy.victim(self._data)
+        widget = self._data.pop(key)
+        self._forget(key)
+        if metrics.enabled:
+            self._record_eviction(reason)
+        if self.on_evict is not None:
+            self.on_evict(key, widget, reason)
+
+    def _remove(self, key: str, reason: Optional[str] = None) -> None:
+        widget = self._data.pop(key, None)
+        if widget is not None:
+            self._forget(key)
+            if reason is not None:
+                if metrics.enabled:
+                    self._record_eviction(reason)
+                if self.on_evict is not None:
+                    self.on_evict(key, widget, reason)
+
+    def _record_eviction(self, reason: str) -> None:
+        if self.name is not None:
+            metrics.evicted(self.name, reason)
+
+    def _forget(self, key: str) -> None:
+        """Drops bookkeeping of a key already removed from the storage."""
+        self._atime.pop(key, None)
+        self.policy.remove(key)
+
+        owner = self._owner_of.pop(key, None)
+        if owner is not None:
+            keys = self._owned[owner]
+            del keys[key]
+            if not keys:
+                del self._owned[owner]
+
+        message = self._message_of.pop(key, None)
+        if message is not None and self._by_message.get(message) == key:
+            del self._by_message[message]
+
+    def _index(self, key: str, widget: "WidgetBase") -> None:
+        """Records owner and message of a newly stored widget, enforcing quotas."""
+        owner = widget._owner
+        if self.per_user and owner is not None and key not in self._owner_of:
+            keys = self._owned.setdefault(owner, {})
+            while len(keys) >= self.per_user:
+                self._remove(next(iter(keys)), reason="quota")
+            keys[key] = None
+            self._owner_of[key] = owner
+
+        message = widget._message
+        if self.per_message and message is not None:
+            # A widget clicked on another message than the one it was created for moves there
+            moved = self._message_of.get(key)
+            if (
+                moved is not None
+                and moved != message
+                and self._by_message.get(moved) == key
+            ):
+                del self._by_message[moved]
+            previous = self._by_message.get(message)
+            if previous is not None and previous != key:
+                self._remove(previous, reason="replaced")
+            self._by_message[message] = key
+            self._message_of[key] = message
+
+    def key_for_message(self, message: Optional[tuple]) -> Optional[str]:
+        """
+        Returns the key of the widget bound to a message, if `per_message` is enabled.
+
+        Args:
+            message (Optional[tuple]): `(chat_id, message_id)` of the message.
+
+        Returns:
+            Optional[str]: Key of the bound widget, or None.
+        """
+        if not self.per_message or message is None:
+            return None
+        return self._by_message.get(message)
+
+    def _is_expired(self, key: str, now: float) -> bool:
+        return now - self._atime.get(key, now) > self.ttl
+
+    def _sweep(self, now: float, limit: Optional[int] = None) -> int:
+        expired = []
+        for key in self._data:
+            if (limit is not None and len(expired) >= limit) or not self._is_expired(
+                key, now
+            ):
+                break
+            expired.append(key)
+
+        for key in expired:
+            self._remove(key, reason="expired")
+        return len(expired)
+
+    def sweep(self) -> int:
+        """
+        Drops all expired widgets.
+
+        Returns:
+            int: Number of dropped widgets.
+        """
+        if self.ttl is None:
+            return 0
+        return self._sweep(time.monotonic())
+
+    def allocate_key(self) -> str:
+        key = self.keys.allocate()
+        # Only widgets kept alive for a whole generation cycle can still hold a reissued key
+        while key in self._data or key in self._pinned:
+            key = self.keys.allocate()
+        return key
+
+    def is_stale(self, key: str) -> bool:
+        # A widget kept alive over a whole generation cycle holds a key the counter has moved past
+        return (
+            key not in self._data
+            and key not in self._pinned
+            and self.keys.is_stale(key)
+        )
+
+    def pin(self, key: str) -> None:
+        widget = self._data.pop(key, None)
+        if widget is not None:
+            self._forget(key)
+            self._pinned[key] = widget
+
+    def get_nowait(self, key: str) -> Optional["WidgetBase"]:
+        if self.ttl is None:
+            widget = self._data.get(key)
+            if widget is None:
+                return self._pinned.get(key) if self._pinned else None
+            if self._track_access:
+                self.policy.access(key)
+            return widget
+
+        now = time.monotonic()
+        if key not in self._data:
+            return self._pinned.get(key) if self._pinned else None
+        if self._is_expired(key, now):
+            self._remove(key, reason="expired")
+            return None
+
+        self._atime[key] = now
+        if self._track_access:
+            self.policy.access(key)
+        return self._data[key]
+
+    def set_nowait(self, key: str, widget: "WidgetBase") -> None:
+        if self._pinned and key in self._pinned:
+            self._pinned[key] = widget
+            return
+
+        if self.ttl is not None:
+            now = time.monotonic()
+            self._sweep(now, limit=self._SWEEP_STEP)
+            self._atime[key] = now
+
+        if self.per_user or self.per_message:
+            self._index(key, widget)
+
+        if key not in self._data and len(self._data) >= self.max_items:
+            self._evict()
+        self._data[key] = widget
+
+        policy = self.policy
+        policy.insert(key, widget)
+        while policy.overflow():
+            self._evict()
+
+    def delete_nowait(self, key: str) -> None:
+        if self._pinned.pop(key, None) is None:
+            self._remove(key)
+
+    def touch_nowait(self, key: str) -> None:
+        if key not in self._data:
+            return
+        self._data.mark_as_used(key)
+        if self.ttl is not None:
+            self._atime[key] = time.monotonic()
+        if self._track_access:
+            self.policy.access(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data or key in self._pinned
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._pinned)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([*self._data, *self._pinned])
+
+    def items(self) -> List[Tuple[str, "WidgetBase"]]:
+        # Iterating over the underlying dict does not affect the LRU order
+        return [*self._data.items(), *self._pinned.items()]
+
+
+class _StripedKeys:
+    """Saves and restores the key allocator states of all stripes of a `StripedMemoryStorage`."""
+
+    def __init__(self, stripes: List[MemoryStorage]):
+        self._stripes = stripes
+
+    def get_state(self) -> tuple:
+        return tuple(stripe.keys.get_state() for stripe in self._stripes)
+
+    def set_state(self, state: tuple) -> None:
+        for stripe, stripe_state in zip(self._stripes, state):
+            stripe.keys.set_state(stripe_state)
+
+
+class StripedMemoryStorage(BaseStorage):
+    """
+    Thread-safe in-process storage, for widgets created and used from several threads,
+    e.g. one event loop per bot token in its own thread, or free-threaded CPython.
+
+    Widgets are spread over `stripes` independent `MemoryStorage` stripes, each guarded by
+    its own lock, so threads working with different stripes never wait for each other.
+    The stripe of a widget is encoded in its key right after the shard prefix. Widgets created
+    under `WidgetContextMiddleware` go to the stripe of their chat, others are spread
+    round-robin. All widgets of a user and of a message thus share a stripe, which keeps
+    per-user and per-message quotas exact.
+
+    Capacity and memory budget are split evenly between stripes, so eviction is LRU (or LFU)
+    within each stripe rather than across the whole storage.
+
+    Args:
+        stripes (int): Number of stripes, at most the size of the key character set.
+        max_items (int): Maximum number of widgets to keep in total.
+        ttl (Optional[float]): Idle time in seconds after which a widget expires. None disables expiry.
+        per_user (Optional[int]): Maximum number of widgets per owner. None disables the quota.
+        per_message (bool): Whether to keep a single widget per message.
+        key_prefix (str): Shard or worker prefix of allocated keys.
+        eviction (str): Eviction policy of every stripe, "lru", "lfu" or "size".
+        max_bytes (Optional[int]): Memory budget in bytes in total, required by the "size" policy.
+    """
+
+    keeps_instances = True
+
+    def __init__(
+        self,
+        stripes: int = 16,
+        max_items: int = 1000,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: bool = False,
+        key_prefix: str = "",
+        eviction: str = "lru",
+        max_bytes: Optional[int] = None,
+    ):
+        if not 0 < stripes <= BASE:
+            raise ValueError(f"Number of stripes must be between 1 and {BASE}")
+
+        self.max_items = max_items
+        self._prefix_len = len(key_prefix)
+        self._stripes = [
+            MemoryStorage(
+                max_items=self._split(max_items, stripes),
+                ttl=ttl,
+                per_user=per_user,
+                per_message=per_message,
+                key_prefix=key_prefix + CHARSET[i],
+                eviction=eviction,
+                max_bytes=self._split(max_bytes, stripes) if max_bytes else None,
+            )
+            for i in range(stripes)
+        ]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._index = {CHARSET[i]: i for i in range(stripes)}
+        self._next = itertools.count()
+        self.keys = _StripedKeys(self._stripes)
+
+    @staticmethod
+    def _split(total: int, stripes: int) -> int:
+        return max(-(-total // stripes), 1)
+
+    def bind(self, widget_cls: type) -> None:
+        super().bind(widget_cls)
+        # Stripes report evictions under the owning widget class
+        for stripe in self._stripes:
+            stripe.bind(widget_cls)
+
+    def set_eviction_hook(
+        self, hook: Optional[Callable[[str, "WidgetBase", str], None]]
+    ) -> None:
+        super().set_eviction_hook(hook)
+        for stripe in self._stripes:
+            stripe.set_eviction_hook(hook)
+
+    def _stripe_of(self, key: str) -> Optional[int]:
+        """Returns the stripe holding a key, or None if the key was not issued by this storage."""
+        if len(key) <= self._prefix_len:
+            return None
+        return self._index.get(key[self._prefix_len])
+
+    def configure(
+        self,
+        max_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: Optional[bool] = None,
+        key_prefix: Optional[str] = None,
+        eviction: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Changes capacity, expiry, quotas, key prefix and eviction policy of all stripes in place.
+        Arguments are the same as of `MemoryStorage.configure`, with `max_items` and `max_bytes`
+        being totals split between stripes.
+        """
+        n = len(self._stripes)
+        if max_items is not None:
+            self.max_items = max_items
+        if key_prefix is not None:
+            self._prefix_len = len(key_prefix)
+
+        for i, (stripe, lock) in enumerate(zip(self._stripes, self._locks)):
+            with lock:
+                stripe.configure(
+                    max_items=self._split(max_items, n) if max_items else max_items,
+                    ttl=ttl,
+                    per_user=per_user,
+                    per_message=per_message,
+                    key_prefix=(
+                        key_prefix + CHARSET[i] if key_prefix is not None else None
+                    ),
+                    eviction=eviction,
+                    max_bytes=self._split(max_bytes, n) if max_bytes else max_bytes,
+                )
+
+    def sweep(self) -> int:
+        """
+        Drops all expired widgets, one stripe at a time.
+
+        Returns:
+            int: Number of dropped widgets.
+        """
+        removed = 0
+        for stripe, lock in zip(self._stripes, self._locks):
+            with lock:
+                removed += stripe.sweep()
+        return removed
+
+    def allocate_key(self) -> str:
+        ctx = get_context()
+        anchor = None
+        if ctx is not None:
+            anchor = ctx.chat_id if ctx.chat_id is not None else ctx.user_id
+        if anchor is not None:
+            # Same stripe as `key_for_message` looks up for messages of this chat
+            i = hash(anchor) % len(self._stripes)
+        else:
+            i = next(self._next) % len(self._stripes)
+        with self._locks[i]:
+            return self._stripes[i].allocate_key()
+
+    def key_for_message(self, message: Optional[tuple]) -> Optional[str]:
+        if message is None:
+            return None
+        i = hash(message[0]) % len(self._stripes)
+        with self._locks[i]:
+            return self._stripes[i].key_for_message(message)
+
+    def is_stale(self, key: str) -> bool:
+        i = self._stripe_of(key)
+        if i is None:
+            return False
+        with self._locks[i]:
+            return self._stripes[i].is_stale(key)
+
+    def get_nowait(self, key: str) -> Optional["WidgetBase"]:
+        i = self._stripe_of(key)
+        if i is None:
+            return None
+        with self._locks[i]:
+            return self._stripes[i].get_nowait(key)
+
+    def set_nowait(self, key: str, widget: "WidgetBase") -> None:
+        i = self._stripe_of(key)
+        if i is None:
+            # A key of another storage, e.g. restored from an older snapshot
+            i = hash(key) % len(self._stripes)
+        with self._locks[i]:
+            self._stripes[i].set_nowait(key, widget)
+
+    def delete_nowait(self, key: str) -> None:
+        i = self._stripe_of(key)
+        if i is None:
+            return
+        with self._locks[i]:
+            self._stripes[i].delete_nowait(key)
+
+    def touch_nowait(self, key: str) -> None:
+        i = self._stripe_of(key)
+        if i is None:
+            return
+        with self._locks[i]:
+            self._stripes[i].touch_nowait(key)
+
+    def pin(self, key: str) -> None:
+        i = self._stripe_of(key)
+        if i is None:
+            return
+        with self._locks[i]:
+            self._stripes[i].pin(key)
+
+    def __contains__(self, key: str) -> bool:
+        i = self._stripe_of(key)
+        return i is not None and key in self._stripes[i]
+
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self._stripes)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key, _ in self.items()])
+
+    def items(self) -> List[Tuple[str, "WidgetBase"]]:
+        # In LRU order within each stripe
+        result = []
+        for stripe, lock in zip(self._stripes, self._locks):
+            with lock:
+                result.extend(stripe.items())
+        return result
+
+
+class PerBotStorage(BaseStorage):
+    """
+    In-process storage keeping the widgets of every bot apart, for one process serving many
+    bot tokens, e.g. several bots polled by a single `Dispatcher`.
+
+    Each bot gets its own `MemoryStorage` namespace, created on first use, with its own capacity,
+    quotas and key allocator. A busy bot thus evicts only its own widgets. The bot is taken from
+    the `WidgetContext`, so `WidgetContextMiddleware` must be installed; widgets created outside
+    of any update go to a default namespace. Storage sizes, capacities and evictions are reported
+    per bot, under `"<class>@<bot_id>"` names.
+
+    Args:
+        max_items (int): Maximum number of widgets to keep per bot.
+        ttl (Optional[float]): Idle time in seconds after which a widget expires. None disables expiry.
+        per_user (Optional[int]): Maximum number of widgets per owner. None disables the quota.
+        per_message (bool): Whether to keep a single widget per message.
+        key_prefix (str): Shard or worker prefix of allocated keys.
+        eviction (str): Eviction policy of every namespace, "lru", "lfu" or "size".
+        max_bytes (Optional[int]): Memory budget in bytes per bot, required by the "size" policy.
+        limits (Optional[Dict[int, int]]): Capacities of particular bots by bot id,
+            overriding `max_items`.
+    """
+
+    keeps_instances = True
+
+    def __init__(
+        self,
+        max_items: int = 1000,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: bool = False,
+        key_prefix: str = "",
+        eviction: str = "lru",
+        max_bytes: Optional[int] = None,
+        limits: Optional[Dict[int, int]] = None,
+    ):
+        self.max_items = max_items
+        self.limits: Dict[int, int] = dict(limits or {})
+        self._options = dict(
+            ttl=ttl,
+            per_user=per_user,
+            per_message=per_message,
+            key_prefix=key_prefix,
+            eviction=eviction,
+            max_bytes=max_bytes,
+        )
+        self._namespaces: Dict[Optional[int], MemoryStorage] = {}
+        self._lock = threading.Lock()
+
+    def _bind_namespace(self, bot_id: Optional[int], storage: MemoryStorage) -> None:
+        storage.bind(self.widget_cls)
+        if bot_id is not None:
+            storage.name = f"{self.name}@{bot_id}"
+        storage.set_eviction_hook(self.on_evict)
+
+    def bind(self, widget_cls: type) -> None:
+        super().bind(widget_cls)
+        for bot_id, storage in self._namespaces.items():
+            self._bind_namespace(bot_id, storage)
+
+    def set_eviction_hook(
+        self, hook: Optional[Callable[[str, "WidgetBase", str], None]]
+    ) -> None:
+        super().set_eviction_hook(hook)
+        for storage in self._namespaces.values():
+            storage.set_eviction_hook(hook)
+
+    def namespace(self, bot_id: Optional[int]) -> MemoryStorage:
+        """
+        Returns the storage of a bot, creating it on first use.
+
+        Args:
+            bot_id (Optional[int]): Id of the bot, None for the default namespace.
+        """
+        storage = self._namespaces.get(bot_id)
+        if storage is not None:
+            return storage
+
+        with self._lock:
+            storage = self._namespaces.get(bot_id)
+            if storage is None:
+                storage = MemoryStorage(
+                    max_items=self.limits.get(bot_id, self.max_items), **self._options
+                )
+                if self.widget_cls is not None:
+                    self._bind_namespace(bot_id, storage)
+                self._namespaces[bot_id] = storage
+        return storage
+
+    def namespaces(self) -> Dict[Optional[int], MemoryStorage]:
+        """Returns storages of all bots seen so far by bot id."""
+        return dict(self._namespaces)
+
+    def resolve(self) -> MemoryStorage:
+        ctx = get_context()
+        bot_id = ctx.bot_id if ctx is not None else None
+        storage = self._namespaces.get(bot_id)
+        return storage if storage is not None else self.namespace(bot_id)
+
+    def set_limit(self, bot_id: int, max_items: Optional[int]) -> None:
+        """
+        Changes the capacity of a single bot.
+
+        Args:
+            bot_id (int): Id of the bot.
+            max_items (Optional[int]): New capacity, None reverts to the common `max_items`.
+        """
+        if max_items is None:
+            self.limits.pop(bot_id, None)
+        else:
+            self.limits[bot_id] = max_items
+        storage = self._namespaces.get(bot_id)
+        if storage is not None:
+            storage.configure(max_items=self.limits.get(bot_id, self.max_items))
+
+    def configure(
+        self,
+        max_items: Optional[int] = None,
+        ttl: Optional[float] = None,
+        per_user: Optional[int] = None,
+        per_message: Optional[bool] = None,
+        key_prefix: Optional[str] = None,
+        eviction: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Changes options of all bots in place, including the ones seen later. Arguments are
+        the same as of `MemoryStorage.configure`, `max_items` is not applied to bots with
+        their own limit.
+        """
+        options = dict(
+            ttl=ttl,
+            per_user=per_user,
+            per_message=per_message,
+            key_prefix=key_prefix,
+            eviction=eviction,
+            max_bytes=max_bytes,
+        )
+        for name, value in options.items():
+            if value is not None:
+                self._options[name] = value
+        if ttl is not None:
+            self._options["ttl"] = ttl or None
+        if per_user is not None:
+            self._options["per_user"] = per_user or None
+        if max_bytes is not None and eviction is None:
+            self._options["eviction"] = "size"
+        if max_items is not None:
+            self.max_items = max_items
+
+        with self._lock:
+            for bot_id, storage in self._namespaces.items():
+                storage.configure(
+                    max_items=max_items if bot_id not in self.limits else None,
+                    **options,
+                )
+
+    def sweep(self) -> int:
+        """
+        Drops expired widgets of all bots.
+
+        Returns:
+            int: Number of dropped widgets.
+        """
+        return sum(storage.sweep() for storage in self.namespaces().values())
+
+    def allocate_key(self) -> str:
+        return self.resolve().allocate_key()
+
+    def key_for_message(self, message: Optional[tuple]) -> Optional[str]:
+        return self.resolve().key_for_message(message)
+
+    def is_stale(self, key: str) -> bool:
+        return self.resolve().is_stale(key)
+
+    def get_nowait(self, key: str) -> Optional["WidgetBase"]:
+        return self.resolve().get_nowait(key)
+
+    def set_nowait(self, key: str, widget: "WidgetBase") -> None:
+        self.resolve().set_nowait(key, widget)
+
+    def delete_nowait(self, key: str) -> None:
+        self.resolve().delete_nowait(key)
+
+    def touch_nowait(self, key: str) -> None:
+        self.resolve().touch_nowait(key)
+
+    def pin(self, key: str) -> None:
+        self.resolve().pin(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.resolve()
+
+    def __len__(self) -> int:
+        return sum(len(storage) for storage in self.namespaces().values())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key, _ in self.items()])
+
+    def items(self) -> List[Tuple[str, "WidgetBase"]]:
+        # Keys of different bots may be equal, snapshots save every namespace separately
+        result = []
+        for storage in self.namespaces().values():
+            result.extend(storage.items())
+        return result
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    File-backed widget storage built on the standard `sqlite3` module.
+
+    Widgets are persisted with their compact state (see `WidgetBase.dump_state`), so they survive
+    restarts and can be served by any process using the same database file. Live instances are
+    additionally kept in an in-process LRU cache, which preserves their `on_select`/`on_back`
+    callables as long as the process is running. Widgets restored from the database come back
+    without those callables: unless their template gives them back, widgets created with
+    callables are then treated as expired, the others fall back to the default registered
+    behaviour.
+
+    Every write stamps the row with a new random version. A cached instance is refreshed in place
+    when the row was saved by another process since, and is saved with a conditional update
+    over the version it was loaded with, so that a stale copy never overwrites a newer state.
+    Clicks additionally hold a lease on the widget row (see `lock`): a click on the same widget
+    in another process retries taking the lease until the first click is saved or the lease
+    times out after `lease_timeout` seconds.
+
+    The asynchronous methods used by the callback handler run database queries in a worker
+    thread, off the event loop. Widget constructors and `WidgetBase.from_cb` go through
+    the synchronous methods and still query the database on the calling thread.
+
+    Widgets whose state cannot be serialized (e.g. a lazy `Paginator`) are kept in the local
+    cache only.
+
+    Several widget classes may share the same database file, each of them is stored in its own
+    namespace named after the qualified name of the bound widget class.
+
+    Args:
+        path (str): Path to the SQLite database file.
+        table (str): Name of the table used to store widgets.
+        max_items (Optional[int]): Maximum number of persisted widgets per namespace.
+            The least recently used ones are pruned when exceeded. None disables the limit.
+        cache_size (int): Number of live instances kept in the in-process cache.
+        lease_timeout (float): Seconds after which a lease of a click that was not saved,
+            e.g. in a crashed process, is taken over.
+    """
+
+    _PRUNE_EVERY = 100
+    # Seconds between attempts to take a lease held by another process
+    _LEASE_POLL = 0.02
+    # Columns added after the first release, created on older tables
+    _COLUMNS = (
+        ("version", "version INTEGER NOT NULL DEFAULT 0"),
+        ("lease_owner", "lease_owner INTEGER NOT NULL DEFAULT 0"),
+        ("lease_until", "lease_until REAL NOT NULL DEFAULT 0"),
+    )
+
+    locks_keys = True
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "aiogramx_widgets",
+        max_items: Optional[int] = None,
+        cache_size: int = 1000,
+        lease_timeout: float = 10.0,
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+
+        self.path = path
+        self.table = table
+        self.max_items = max_items
+        self.lease_timeout = lease_timeout
+        self.namespace = ""
+        # Key -> (live instance, row version it was loaded or saved with, None if not persisted)
+        self._cache = LRUDict(max_items=cache_size)
+        self._writes = 0
+        # Guards the connection and the cache, used from the event loop and worker threads
+        self._lock = threading.RLock()
+        # Identifies leases taken by this storage
+        self._lease_owner = random.getrandbits(62) or 1
+        # Key -> number of clicks of this process holding the lease
+        self._held: Dict[str, int] = {}
+
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(ddl for _, ddl in self._COLUMNS)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "ns TEXT NOT NULL, key TEXT NOT NULL, cls TEXT NOT NULL, "
+            f"state BLOB NOT NULL, atime REAL NOT NULL, {columns}, "
+            "PRIMARY KEY (ns, key)) WITHOUT ROWID"
+        )
+        existing = {r[1] for r in self._conn.execute(f"PRAGMA table_info({table})")}
+        for column, ddl in self._COLUMNS:
+            if column not in existing:
+                # Table created by an older release
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_atime ON {table} (ns, atime)"
+        )
+
+    def bind(self, widget_cls: type) -> None:
+        super().bind(widget_cls)
+        self.namespace = widget_cls._widget_name
+
+    def get_nowait(self, key: str) -> Optional["WidgetBase"]:
+        from aiogramx.base import WidgetBase
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] is None:
+                # Kept in this process only
+                return cached[0]
+
+            row = self._conn.execute(
+                f"SELECT cls, state, version FROM {self.table} WHERE ns = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                # Pruned or deleted by another process
+                if cached is not None:
+                    del self._cache[key]
+                return None
+
+            cls, state, version = row
+            if cached is not None:
+                widget = cached[0]
+                if cached[1] != version:
+                    widget._reload_state(state)
+                    self._cache[key] = (widget, version)
+                return widget
+
+            widget = WidgetBase.load_state(cls, key, state)
+            if widget is None:
+                return None
+
+            self._cache[key] = (widget, version)
+            self.touch_nowait(key)
+            return widget
+
+    def set_nowait(self, key: str, widget: "WidgetBase") -> None:
+        state = widget.dump_state()
+        with self._lock:
+            if state is None:
+                self._cache[key] = (widget, None)
+                return
+
+            version = random.getrandbits(62)
+            cls = widget._widget_name
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] is widget and cached[1] is not None:
+                # Save over the state this instance was loaded with only
+                updated = self._conn.execute(
+                    f"UPDATE {self.table} SET cls = ?, state = ?, atime = ?, version = ? "
+                    "WHERE ns = ? AND key = ? AND version = ?",
+                    (cls, state, time.time(), version, self.namespace, key, cached[1]),
+                ).rowcount
+                if not updated and self._keep_newer(key, widget):
+                    return
+            else:
+                updated = 0
+
+            if not updated:
+                # New widget, a widget taking over the key, or a row pruned in the meantime
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    "(ns, key, cls, state, atime, version) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, cls, state, time.time(), version),
+                )
+            self._cache[key] = (widget, version)
+            self._writes += 1
+
+            if self.max_items and self._writes % self._PRUNE_EVERY == 0:
+                self.prune()
+
+    def _keep_newer(self, key: str, widget: "WidgetBase") -> bool:
+        """
+        Handles a conditional update that found another version of the row: reloads the newer
+        state saved by another process into the instance instead of overwriting it.
+
+        Returns:
+            bool: Whether the row exists, False if it was pruned or deleted.
+        """
+        row = self._conn.execute(
+            f"SELECT state, version FROM {self.table} WHERE ns = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return False
+        logger.warning(
+            "Widget %s of %s was saved by another process in the meantime, "
+            "keeping the newer state",
+            key,
+            self.namespace,
+        )
+        widget._reload_state(row[0])
+        self._cache[key] = (widget, row[1])
+        return True
+
+    def delete_nowait(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE ns = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def touch_nowait(self, key: str) -> None:
+        with self._lock:
+            self._cache.mark_as_used(key)
+            self._conn.execute(
+                f"UPDATE {self.table} SET atime = ? WHERE ns = ? AND key = ?",
+                (time.time(), self.namespace, key),
+            )
+
+    async def get(self, key: str) -> Optional["WidgetBase"]:
+        return await asyncio.to_thread(self.get_nowait, key)
+
+    async def set(self, key: str, widget: "WidgetBase") -> None:
+        await asyncio.to_thread(self.set_nowait, key, widget)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.delete_nowait, key)
+
+    async def touch(self, key: str) -> None:
+        await asyncio.to_thread(self.touch_nowait, key)
+
+    @asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[None]:
+        """
+        Holds a lease on the widget row while a click is processed. Another process taking
+        the lease retries until it is released or times out. Clicks of this process share
+        the lease, they are serialized by the widget itself.
+        """
+        self._held[key] = self._held.get(key, 0) + 1
+        try:
+            while not await asyncio.to_thread(self._take_lease, key):
+                await asyncio.sleep(self._LEASE_POLL)
+            yield
+        finally:
+            held = self._held.pop(key) - 1
+            if held:
+                self._held[key] = held
+            else:
+                await asyncio.to_thread(self._release_lease, key)
+
+    def _take_lease(self, key: str) -> bool:
+        """Takes the lease on a widget row, returns False while another process holds it."""
+        now = time.time()
+        with self._lock:
+            taken = self._conn.execute(
+                f"UPDATE {self.table} SET lease_owner = ?, lease_until = ? "
+                "WHERE ns = ? AND key = ? AND (lease_until < ? OR lease_owner = ?)",
+                (
+                    self._lease_owner,
+                    now + self.lease_timeout,
+                    self.namespace,
+                    key,
+                    now,
+                    self._lease_owner,
+                ),
+            ).rowcount
+            if taken:
+                return True
+            # Nothing to lease if the widget is not persisted
+            row = self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE ns = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            return row is None
+
+    def _release_lease(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE {self.table} SET lease_until = 0 "
+                "WHERE ns = ? AND key = ? AND lease_owner = ?",
+                (self.namespace, key, self._lease_owner),
+            )
+
+    def prune(self) -> int:
+        """
+        Removes the least recently used widgets exceeding `max_items`.
+
+        Returns:
+            int: Number of removed widgets.
+        """
+        if not self.max_items:
+            return 0
+
+        with self._lock:
+            excess = len(self) - self.max_items
+            if excess <= 0:
+                return 0
+
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE ns = ? AND key IN ("
+                f"SELECT key FROM {self.table} WHERE ns = ? ORDER BY atime LIMIT ?)",
+                (self.namespace, self.namespace, excess),
+            )
+            return excess
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] is None:
+                return True
+            row = self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE ns = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE ns = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key FROM {self.table} WHERE ns = ? ORDER BY atime",
+                (self.namespace,),
+            ).fetchall()
+        return iter([r[0] for r in rows])
+
+
+class SharedMemoryStorage(BaseStorage):
+    """
+    Widget storage shared by processes on a single host, kept in a memory-mapped file
+    with a fixed-size slot table. Put the file on a RAM-backed filesystem such as `/dev/shm`
+    for memory speed.
+
+    Every widget is stored in one fixed-size slot as its compact state (see
+    `WidgetBase.dump_state`), so any worker process can serve any widget callback without
+    a network hop. Slots are grouped in buckets of `ways` slots. A key always maps to the same
+    bucket, and a full bucket evicts its least recently used slot. Processes lock only
+    the bucket they work with (POSIX record locks), so workers rarely wait for each other.
+    New keys are reserved in their bucket under the same lock, so two processes never issue
+    the same key.
+
+    Every write stamps the slot with the next value of a counter kept per bucket, which never
+    goes back, even when a slot is evicted and reused.
+
+    Like `SQLiteStorage`, each process keeps live instances in a local LRU cache to preserve
+    their `on_select`/`on_back` callables. A cached instance is refreshed in place when another
+    process has saved a newer state. Widgets restored from the shared table without a cached
+    instance come back without callables. Widgets whose state cannot be serialized or does not
+    fit a slot (e.g. a `Paginator` with many buttons) are kept in the local cache only.
+
+    Several widget classes may share the same file, each of them is stored in its own
+    namespace named after the qualified name of the bound widget class. All processes must
+    open the file with the same `slots`, `ways` and `slot_size`.
+
+    Requires a POSIX system.
+
+    Args:
+        path (str): Path of the shared file, created if missing, e.g. "/dev/shm/aiogramx".
+        slots (int): Number of slots, rounded up to a multiple of `ways`.
+        slot_size (int): Size of a slot in bytes, including a 40-byte header.
+        ways (int): Number of slots per bucket.
+        cache_size (int): Number of live instances kept in the in-process cache.
+
+    Raises:
+        ValueError: If the file exists with a different layout.
+        RuntimeError: If the platform does not support file record locks.
+    """
+
+    # Header: magic, version, slot size, ways, buckets
+    _HEADER = struct.Struct("<4sBxHII")
+    _HEADER_SIZE = 64
+    _MAGIC = b"AGXM"
+    _VERSION = 2
+    # Bucket header: counter of writes, source of slot versions
+    _BUCKET = struct.Struct("<Q")
+    # Slot: used, key length, key, namespace hash, class hash, access time, version, state length
+    _SLOT = struct.Struct("<BB16sIIQIH")
+    _KEY_SIZE = 16
+    _SLOT_ATIME = struct.Struct("<Q")
+    _SLOT_ATIME_OFFSET = 26
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 100_000,
+        slot_size: int = 256,
+        ways: int = 8,
+        cache_size: int = 1000,
+    ):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryStorage requires POSIX file locks")
+        if slot_size <= self._SLOT.size:
+            raise ValueError(f"slot_size must be larger than {self._SLOT.size}")
+
+        self.path = path
+        self.slot_size = slot_size
+        self.ways = ways
+        self.buckets = -(-slots // ways)
+        self.max_items = self.buckets * ways
+        self.namespace = ""
+        self._ns = 0
+        # Key -> (live instance, slot version it was loaded or saved with, None if not shared)
+        self._cache = LRUDict(max_items=cache_size)
+        self._class_names: Dict[int, str] = {}
+        # Record locks do not exclude threads of the same process
+        self._lock = threading.Lock()
+        self._bucket_size = self._BUCKET.size + ways * slot_size
+
+        size = self._HEADER_SIZE + self.buckets * self._bucket_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self._HEADER_SIZE, 0)
+        try:
+            header = self._HEADER.pack(
+                self._MAGIC, self._VERSION, slot_size, ways, self.buckets
+            )
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+            elif os.pread(self._fd, self._HEADER.size, 0) != header:
+                raise ValueError(f"{path} was created with a different layout")
+        except BaseException:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self._HEADER_SIZE, 0)
+            os.close(self._fd)
+            raise
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, self._HEADER_SIZE, 0)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def bind(self, widget_cls: type) -> None:
+        super().bind(widget_cls)
+        self.namespace = widget_cls._widget_name
+        self._ns = zlib.crc32(self.namespace.encode())
+
+    def _bucket(self, key: str) -> int:
+        """Returns the offset of the bucket a key maps to."""
+        h = zlib.crc32(key.encode(), self._ns)
+        return self._HEADER_SIZE + (h % self.buckets) * self._bucket_size
+
+    @contextmanager
+    def _locked(self, offset: int, exclusive: bool = True):
+        with self._lock:
+            mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            fcntl.lockf(self._fd, mode, self._bucket_size, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._bucket_size, offset)
+
+    def _slots(self, bucket: int) -> range:
+        """Returns offsets of the slots of a bucket."""
+        return range(
+            bucket + self._BUCKET.size, bucket + self._bucket_size, self.slot_size
+        )
+
+    def _find(self, bucket: int, key: bytes) -> Optional[int]:
+        """Returns the offset of the slot holding a key in a locked bucket."""
+        mm, unpack_from = self._mm, self._SLOT.unpack_from
+        for offset in self._slots(bucket):
+            used, key_len, slot_key, ns, *_ = unpack_from(mm, offset)
+            if used and ns == self._ns and slot_key[:key_len] == key:
+                return offset
+        return None
+
+    def _read(self, key: str) -> Optional[Tuple[int, int, bytes]]:
+        """Returns `(class hash, version, state)` of a shared widget and marks it as used."""
+        bucket = self._bucket(key)
+        with self._locked(bucket):
+            offset = self._find(bucket, key.encode())
+            if offset is None:
+                return None
+            _, _, _, _, cls, _, version, size = self._SLOT.unpack_from(self._mm, offset)
+            self._SLOT_ATIME.pack_into(
+                self._mm, offset + self._SLOT_ATIME_OFFSET, time.time_ns()
+            )
+            start = offset + self._SLOT.size
+            return cls, version, self._mm[start : start + size]
+
+    def _write(self, key: str, cls: int, state: bytes) -> int:
+        """Saves a state into the slot of a key, evicting the LRU slot of a full bucket."""
+        bucket = self._bucket(key)
+        with self._locked(bucket):
+            return self._write_locked(bucket, key.encode(), cls, state)
+
+    def _write_locked(self, bucket: int, encoded: bytes, cls: int, state: bytes) -> int:
+        """Saves a state into the slot of a key in a locked bucket, returns the slot version."""
+        mm, unpack_from = self._mm, self._SLOT.unpack_from
+        offset = self._find(bucket, encoded)
+        if offset is None:
+            oldest = None
+            for slot in self._slots(bucket):
+                used, *_, atime, _, _ = unpack_from(mm, slot)
+                if not used:
+                    offset = slot
+                    break
+                if oldest is None or atime < oldest:
+                    oldest, offset = atime, slot
+
+        counter = self._BUCKET.unpack_from(mm, bucket)[0] + 1
+        self._BUCKET.pack_into(mm, bucket, counter)
+        # Slots keep the low 32 bits, a cached copy would have to miss 2**32 writes
+        version = counter & 0xFFFFFFFF
+
+        self._SLOT.pack_into(
+            mm,
+            offset,
+            1,
+            len(encoded),
+            encoded,
+            self._ns,
+            cls,
+            time.time_ns(),
+            version,
+            len(state),
+        )
+        start = offset + self._SLOT.size
+        mm[start : start + len(state)] = state
+        return version
+
+    def allocate_key(self) -> str:
+        """
+        Returns a random key not used in the shared table, reserved in its bucket right away,
+        so that no other process can issue it before the widget is saved.
+        """
+        while True:
+            key = gen_key(self._cache, length=4)
+            bucket = self._bucket(key)
+            encoded = key.encode()
+            with self._locked(bucket):
+                if self._find(bucket, encoded) is None:
+                    # An empty slot of no class, filled when the widget is saved
+                    self._write_locked(bucket, encoded, 0, b"")
+                    return key
+
+    def _class_name(self, cls: int) -> Optional[str]:
+        from aiogramx.base import WidgetMeta
+
+        name = self._class_names.get(cls)
+        if name is None:
+            self._class_names = {zlib.crc32(n.encode()): n for n in WidgetMeta.widgets}
+            name = self._class_names.get(cls)
+        return name
+
+    def get_nowait(self, key: str) -> Optional["WidgetBase"]:
+        from aiogramx.base import WidgetBase
+
+        if len(key) > self._KEY_SIZE:
+            return None
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[1] is None:
+            # Kept in this process only
+            return cached[0]
+
+        shared = self._read(key)
+        if shared is None:
+            # Evicted or deleted by another process
+            if cached is not None:
+                del self._cache[key]
+            return None
+
+        cls, version, state = shared
+        if not cls:
+            # Key reserved for a widget not saved yet
+            return None
+        if cached is not None:
+            widget = cached[0]
+            if cached[1] != version:
+                widget._reload_state(state)
+                self._cache[key] = (widget, version)
+            return widget
+
+        name = self._class_name(cls)
+        if name is None:
+            return None
+        widget = WidgetBase.load_state(name, key, state)
+        if widget is not None:
+            self._cache[key] = (widget, version)
+        return widget
+
+    def set_nowait(self, key: str, widget: "WidgetBase") -> None:
+        state = widget.dump_state()
+        if (
+            state is None
+            or len(key) > self._KEY_SIZE
+            or len(state) > self.slot_size - self._SLOT.size
+        ):
+            self._cache[key] = (widget, None)
+            return
+
+        cls = zlib.crc32(widget._widget_name.encode())
+        self._cache[key] = (widget, self._write(key, cls, state))
+
+    def delete_nowait(self, key: str) -> None:
+        self._cache.pop(key, None)
+        if len(key) > self._KEY_SIZE:
+            return
+        bucket = self._bucket(key)
+        with self._locked(bucket):
+            offset = self._find(bucket, key.encode())
+            if offset is not None:
+                self._mm[offset] = 0
+
+    def touch_nowait(self, key: str) -> None:
+        self._cache.mark_as_used(key)
+        if len(key) > self._KEY_SIZE:
+            return
+        bucket = self._bucket(key)
+        with self._locked(bucket):
+            offset = self._find(bucket, key.encode())
+            if offset is not None:
+                self._SLOT_ATIME.pack_into(
+                    self._mm, offset + self._SLOT_ATIME_OFFSET, time.time_ns()
+                )
+
+    def _scan(self) -> List[Tuple[int, str]]:
+        """Returns `(access time, key)` of all shared widgets of this namespace, unlocked."""
+        result = []
+        mm, unpack_from = self._mm, self._SLOT.unpack_from
+        end = self._HEADER_SIZE + self.buckets * self._bucket_size
+        for bucket in range(self._HEADER_SIZE, end, self._bucket_size):
+            for offset in self._slots(bucket):
+                used, key_len, key, ns, cls, atime, _, _ = unpack_from(mm, offset)
+                # Keys reserved for widgets not saved yet have no class
+                if used and ns == self._ns and cls:
+                    result.append((atime, key[:key_len].decode()))
+        return result
+
+    def close(self) -> None:
+        """Unmaps and closes the shared file. The file itself is kept for other processes."""
+        self._mm.close()
+        os.close(self._fd)
+
+    def __contains__(self, key: str) -> bool:
+        cached = self._cache.get(key)
+        if cached is not None and cached[1] is None:
+            return True
+        if len(key) > self._KEY_SIZE:
+            return False
+        bucket = self._bucket(key)
+        with self._locked(bucket, exclusive=False):
+            return self._find(bucket, key.encode()) is not None
+
+    def _local_keys(self) -> List[str]:
+        """Returns keys of widgets kept in this process only."""
+        return [key for key, (_, version) in self._cache.items() if version is None]
+
+    def __len__(self) -> int:
+        return len(self._scan()) + len(self._local_keys())
+
+    def __iter__(self) -> Iterator[str]:
+        keys = [key for _, key in sorted(self._scan())]
+        keys.extend(self._local_keys())
+        return iter(keys)
+
+
+SNAPSHOT_MAGIC = b"AGXS"
+SNAPSHOT_VERSION = 3
+
+# The marshal format may change between Python versions, so snapshots record the version
+# that wrote them and are only read back by the same one.
+_SNAPSHOT_HEADER = SNAPSHOT_MAGIC + bytes(
+    (SNAPSHOT_VERSION, marshal.version, sys.version_info.major, sys.version_info.minor)
+)
+
+
+def pack_state(state: tuple) -> bytes:
+    """Packs a widget state tuple into compact bytes."""
+    return marshal.dumps(state)
+
+
+def unpack_state(data: bytes) -> tuple:
+    """Unpacks bytes produced by `pack_state`."""
+    return marshal.loads(data)
+
+
+def write_snapshot(path: str, sections: list) -> None:
+    """
+    Atomically writes storage sections into a snapshot file.
+
+    Args:
+        path (str): Destination file path.
+        sections (list): List of `(storage_name, key_state, class_names, entries)` tuples,
+            where `key_state` is the state of the storage key allocator (or None) and entries are
+            `(key, class_index, state, callables)` tuples ordered from the least to the most
+            recently used, `callables` being the mask of callables set on the widget.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_SNAPSHOT_HEADER)
+        f.write(marshal.dumps(sections))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> list:
+    """
+    Reads storage sections written by `write_snapshot` under the same Python version.
+
+    Args:
+        path (str): Snapshot file path.
+
+    Returns:
+        list: Storage sections.
+
+    Raises:
+        ValueError: If the file is not a snapshot, was written by an unsupported snapshot or
+            Python version, or is corrupted.
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(_SNAPSHOT_HEADER))
+        if header[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an AiogramX storage snapshot")
+        if header != _SNAPSHOT_HEADER:
+            raise ValueError(
+                f"{path} was written by another snapshot format or Python version"
+            )
+        # Reading the whole file at once is much faster than letting marshal read it piece by piece
+        data = f.read()
+    try:
+        return marshal.loads(data)
+    except (EOFError, TypeError) as e:
+        raise ValueError(f"{path} is a corrupted storage snapshot") from e
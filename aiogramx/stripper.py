@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, TYPE_CHECKING
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import TelegramObject
+from flipcache import LRUDict
+
+if TYPE_CHECKING:
+    from aiogramx.base import WidgetBase
+
+logger = logging.getLogger(__name__)
+
+
+class KeyboardStripper(BaseMiddleware):
+    """
+    Removes inline keyboards from messages of widgets dropped by their storage, so that stale
+    buttons stop generating expired-widget clicks.
+
+    Installed as a storage eviction hook (see `BaseStorage.set_eviction_hook`), it records
+    `(chat_id, message_id)` of evicted, expired and over-quota widgets whose message is known,
+    i.e. widgets clicked at least once. A message is only recorded while the dropped widget is
+    the last one bound to it: widgets of any class report the message they are clicked on with
+    `bind`, so a message taken over by another widget keeps its live keyboard. Bindings of up to
+    `max_messages` messages are kept, messages whose binding was forgotten are left alone.
+
+    A background task removes recorded keyboards, at most `calls_per_tick` Bot API calls every
+    `interval` seconds, and only in quiet periods: a tick is skipped when the dispatcher handled
+    more than `busy_updates` updates since the previous one. As an outer update middleware,
+    the stripper counts those updates itself. Up to `max_pending` messages are remembered,
+    the oldest are dropped first.
+
+    Args:
+        bot (aiogram.Bot): The bot that sent the widget messages.
+        calls_per_tick (int): Maximum number of Bot API calls per tick.
+        interval (float): Seconds between ticks.
+        busy_updates (Optional[int]): Updates per tick above which the tick is skipped.
+            None disables the check.
+        max_pending (int): Maximum number of messages waiting for their keyboard to be removed.
+        max_messages (int): Maximum number of messages whose widget binding is kept.
+    """
+
+    _REASONS = frozenset(("capacity", "expired", "quota"))
+
+    def __init__(
+        self,
+        bot: Bot,
+        calls_per_tick: int = 5,
+        interval: float = 1.0,
+        busy_updates: Optional[int] = 20,
+        max_pending: int = 10_000,
+        max_messages: int = 100_000,
+    ):
+        self.bot = bot
+        self.calls_per_tick = calls_per_tick
+        self.interval = interval
+        self.busy_updates = busy_updates
+        self.max_pending = max_pending
+        self.stripped = 0
+        self._pending: "OrderedDict[tuple, None]" = OrderedDict()
+        # (chat_id, message_id) -> key of the widget last bound to the message
+        self._bound = LRUDict(max_items=max_messages)
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, message: tuple) -> None:
+        """
+        Schedules removal of the keyboard of a message.
+
+        Args:
+            message (tuple): `(chat_id, message_id)` of the message.
+        """
+        self._pending[message] = None
+        if len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+
+    def bind(self, message: tuple, key: str) -> None:
+        """
+        Remembers the widget whose keyboard a message shows, replacing any widget bound to it.
+
+        Args:
+            message (tuple): `(chat_id, message_id)` of the message.
+            key (str): Key of the widget.
+        """
+        self._bound[message] = key
+
+    def unbind(self, message: tuple, key: str) -> None:
+        """
+        Forgets the binding of a message, if it is still bound to the widget.
+
+        Args:
+            message (tuple): `(chat_id, message_id)` of the message.
+            key (str): Key of the widget.
+        """
+        if self._bound.get(message) == key:
+            del self._bound[message]
+
+    def on_evict(self, key: str, widget: "WidgetBase", reason: str) -> None:
+        """Storage eviction hook recording messages of dropped widgets."""
+        message = widget._message
+        if (
+            message is not None
+            and reason in self._REASONS
+            and self._bound.get(message) == key
+        ):
+            del self._bound[message]
+            self.record(message)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self._updates += 1
+        return await handler(event, data)
+
+    async def strip_once(self) -> int:
+        """
+        Removes keyboards of the oldest recorded messages, within the per-tick budget.
+
+        Returns:
+            int: Number of Bot API calls made.
+        """
+        calls = 0
+        while self._pending and calls < self.calls_per_tick:
+            chat_id, message_id = self._pending.popitem(last=False)[0]
+            calls += 1
+            try:
+                await self.bot.edit_message_reply_markup(
+                    chat_id=chat_id, message_id=message_id, reply_markup=None
+                )
+                self.stripped += 1
+            except TelegramRetryAfter as e:
+                # Try again once the flood wait is over
+                self._pending[(chat_id, message_id)] = None
+                self._pending.move_to_end((chat_id, message_id), last=False)
+                await asyncio.sleep(e.retry_after)
+                break
+            except TelegramBadRequest:
+                # Message deleted, too old to edit, or keyboard already gone
+                pass
+            except Exception as e:
+                # Blocked by the user, network or server errors: give up on this message
+                logger.warning(
+                    "Failed to remove keyboard of message %s in chat %s: %r",
+                    message_id,
+                    chat_id,
+                    e,
+                )
+        return calls
+
+    async def run(self) -> None:
+        """Strips keyboards in quiet periods until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            updates, self._updates = self._updates, 0
+            if self.busy_updates is not None and updates > self.busy_updates:
+                continue
+            await self.strip_once()
@@ -0,0 +1,168 @@
+import zlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from aiogramx.keys import BASE
+from aiogramx.utils import CHARSET
+
+# Separates the widget key from the template code. Not part of `CHARSET`, so allocated
+# keys and shard prefixes never contain it
+TEMPLATE_SEP = "|"
+
+# Handlers by name, see `register_handler`
+handlers: Dict[str, Callable] = {}
+
+# Templates by code
+templates: Dict[str, "WidgetTemplate"] = {}
+
+# Template a widget is being created from, and the key it is rebuilt under if any
+_building: ContextVar[Optional[Tuple["WidgetTemplate", Optional[str]]]] = ContextVar(
+    "aiogramx_template", default=None
+)
+
+
+def register_handler(name: str, fn: Optional[Callable] = None):
+    """
+    Registers a handler under a name, so that widget templates can refer to it.
+    Can be used as a decorator:
+
+        @register_handler("booking.date_selected")
+        async def on_date(query: CallbackQuery, date: date):
+            ...
+
+    Args:
+        name (str): Unique handler name.
+        fn (Optional[Callable]): The handler. If omitted, a decorator is returned.
+    """
+    if fn is None:
+        return lambda f: register_handler(name, f)
+    handlers[name] = fn
+    return fn
+
+
+def template_code(name: str) -> str:
+    """Returns the default two-character code of a template name."""
+    h = zlib.crc32(name.encode()) % (BASE * BASE)
+    return CHARSET[h // BASE] + CHARSET[h % BASE]
+
+
+def template_of(key: str) -> Optional["WidgetTemplate"]:
+    """Returns the template a widget key was created from, if it is registered."""
+    base, sep, code = key.rpartition(TEMPLATE_SEP)
+    if not sep:
+        return None
+    return templates.get(code)
+
+
+class WidgetTemplate:
+    """
+    Named recipe for identical widgets: a widget class, its options and its handlers.
+
+    Widgets created from a template carry the template code in their key, and thus in their
+    callback data. When such a widget is no longer stored, e.g. after eviction or a restart,
+    a click on it rebuilds the widget from the template under the same key instead of showing
+    the expired notice. Widgets keeping their navigation state in callback data (`Calendar`,
+    time selectors, `Paginator`) continue where the user left off. Widgets keeping state changed
+    by clicks in the instance only, like `Checkbox` selections, cannot be templated, since
+    a rebuilt widget would silently lose it.
+
+    Templates are created with `WidgetBase.template()` and must be registered under the same
+    names in every process serving the widgets.
+
+    Args:
+        widget_cls (type): Widget class to create.
+        name (str): Unique template name.
+        options (Dict[str, Any]): Constructor arguments of the widget.
+        handlers (Optional[Dict[str, Union[str, Callable]]]): Callable constructor arguments,
+            e.g. `on_select`, given as handlers or names of handlers registered with
+            `register_handler`. Names are resolved on first use.
+        code (Optional[str]): Short code carried in widget keys. Defaults to a code derived
+            from the name.
+
+    Raises:
+        TypeError: If the widget class keeps state changed by clicks in the instance.
+        ValueError: If the code contains unsupported characters.
+    """
+
+    def __init__(
+        self,
+        widget_cls: type,
+        name: str,
+        options: Dict[str, Any],
+        handlers: Optional[Dict[str, Union[str, Callable]]] = None,
+        code: Optional[str] = None,
+    ):
+        if widget_cls._user_state:
+            raise TypeError(
+                f"{widget_cls.__name__} keeps its state in the instance, "
+                "widgets rebuilt from a template would lose it"
+            )
+        code = code or template_code(name)
+        if not code or any(ch not in CHARSET for ch in code):
+            raise ValueError(f"Template code {code!r} contains unsupported characters")
+
+        self.widget_cls = widget_cls
+        self.name = name
+        self.code = code
+        self.options = options
+        self.handlers = dict(handlers or {})
+        self._resolved: Optional[Dict[str, Callable]] = None
+
+    def resolve_handlers(self) -> Dict[str, Callable]:
+        """
+        Returns handlers of the template by constructor argument, looking up named ones.
+
+        Raises:
+            LookupError: If a named handler is not registered.
+        """
+        if self._resolved is None:
+            resolved = {}
+            for param, handler in self.handlers.items():
+                if isinstance(handler, str):
+                    fn = handlers.get(handler)
+                    if fn is None:
+                        raise LookupError(
+                            f"Handler {handler!r} of template {self.name!r} is not registered"
+                        )
+                    handler = fn
+                resolved[param] = handler
+            self._resolved = resolved
+        return self._resolved
+
+    def _build(self, key: Optional[str]):
+        token = _building.set((self, key))
+        try:
+            return self.widget_cls(**self.options, **self.resolve_handlers())
+        finally:
+            _building.reset(token)
+
+    def create(self):
+        """
+        Creates a widget from the template.
+
+        Returns:
+            WidgetBase: The new widget, whose key carries the template code.
+        """
+        return self._build(None)
+
+    def rebuild(self, key: str):
+        """
+        Recreates a widget of this template under a key it was created with.
+
+        Args:
+            key (str): Key from callback data of the lost widget.
+
+        Returns:
+            WidgetBase: The rebuilt widget, stored under `key`.
+        """
+        return self._build(key)
+
+    def attach(self, widget) -> None:
+        """Sets template handlers on a widget restored from a persisted state."""
+        resolved = self.resolve_handlers()
+        for name in widget._callables:
+            if name in resolved:
+                setattr(widget, name, resolved[name])
+
+    def __repr__(self) -> str:
+        return f"WidgetTemplate({self.widget_cls.__name__}, {self.name!r}, code={self.code!r})"
@@ -1,14 +1,14 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, time, timedelta
-from typing import List, Optional, Callable, Awaitable, Tuple
+from typing import List, Optional, Callable, Awaitable, Tuple, NamedTuple
 
 from aiogram import Router
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from aiogramx.base import WidgetBase
+from aiogramx.base import WidgetBase, ConfigField, intern_config
 from aiogramx.utils import ibtn, fallback_lang
 
 
@@ -35,6 +35,21 @@ class SelectionResult:
     chosen_time: Optional[time] = None
 
 
+class TimeSelectorConfig(NamedTuple):
+    """Immutable configuration of a time selector, shared between instances created alike."""
+
+    up1: str
+    down1: str
+    up2: str
+    down2: str
+    allow_future_only: bool
+    carry_over: bool
+    lang: str
+    past_time_warn_text: str
+    done_button_text: str
+    back_button_text: str
+
+
 class TimeSelectorCB(CallbackData, prefix="aiogramx_ts"):
     """Callback data structure for time selector interactions.
 
@@ -78,8 +93,36 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
     """
 
     _cb = TimeSelectorCB
+    _cb_action_field = "act"
+    _cb_short_prefix = "axt"
+    _cb_actions = {
+        "IGNORE": ".",
+        "CANCEL": "b",
+        "DONE": "d",
+        "INCR_H1": "h",
+        "INCR_H10": "H",
+        "INCR_M1": "m",
+        "INCR_M10": "M",
+        "DECR_H1": "j",
+        "DECR_H10": "J",
+        "DECR_M1": "n",
+        "DECR_M10": "N",
+    }
     _registered = False
 
+    __slots__ = ("_config", "on_select", "on_back")
+
+    up1 = ConfigField()
+    down1 = ConfigField()
+    up2 = ConfigField()
+    down2 = ConfigField()
+    allow_future_only = ConfigField()
+    carry_over = ConfigField()
+    lang = ConfigField()
+    _past_time_warn_text = ConfigField("past_time_warn_text")
+    _done_button_text = ConfigField("done_button_text")
+    _back_button_text = ConfigField("back_button_text")
+
     def __init__(
         self,
         allow_future_only: bool = False,
@@ -100,19 +143,21 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
             if not all(isinstance(btn, str) for btn in control_buttons):
                 raise TypeError("All elements in control_buttons must be strings.")
 
-        self.up1, self.down1, self.up2, self.down2 = (
-            control_buttons or EMOJI_CONTROL_BUTTONS
+        lang = fallback_lang(lang)
+        self._config = intern_config(
+            TimeSelectorConfig(
+                *(control_buttons or EMOJI_CONTROL_BUTTONS),
+                allow_future_only=allow_future_only,
+                carry_over=carry_over,
+                lang=lang,
+                past_time_warn_text=past_time_warn_text
+                or _TEXTS[lang]["PAST_TIME_WARN"],
+                done_button_text=done_button_text or "☑️",
+                back_button_text=back_button_text or "🔙",
+            )
         )
-        self.allow_future_only = allow_future_only
-        self.carry_over = carry_over
         self.on_select = on_select
         self.on_back = on_back
-        self.lang = fallback_lang(lang)
-        self._past_time_warn_text = (
-            past_time_warn_text or _TEXTS[self.lang]["PAST_TIME_WARN"]
-        )
-        self._done_button_text = done_button_text or "☑️"
-        self._back_button_text = back_button_text or "🔙"
 
         super().__init__()
 
@@ -121,7 +166,7 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         Ensures all subclasses of TimeSelectorBase share the same storage and registration state.
 
         This overrides the default WidgetBase behavior, which would assign each subclass its own
-        `_storage` and `_registered` attributes. By explicitly setting these attributes to reference
+        `_storage`, `_registered` and `_routers` attributes. By explicitly setting these attributes to reference
         those of TimeSelectorBase, this method enforces a shared widget registry across all
         concrete implementations like TimeSelectorGrid and TimeSelectorModern.
 
@@ -131,6 +176,7 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         super().__init_subclass__(**kwargs)
         cls._storage = TimeSelectorBase._storage
         cls._registered = TimeSelectorBase._registered
+        cls._routers = TimeSelectorBase._routers
 
     @classmethod
     def register(cls, router: Router) -> None:
@@ -138,13 +184,14 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         Registers the shared widget class with the Aiogram router, if not already registered.
 
         Prevents multiple registrations across subclasses by ensuring only a single registration
-        occurs for all TimeSelectorBase-derived classes. This allows different visual variants
-        (e.g., grid or modern layout) to interoperate using the same callback handling logic.
+        per router occurs for all TimeSelectorBase-derived classes. This allows different visual
+        variants (e.g., grid or modern layout) to interoperate using the same callback handling
+        logic, while each of several routers or dispatchers gets its own handler.
 
         Args:
             router (Router): The router instance to register this widget's callback handler with.
         """
-        if TimeSelectorBase._registered:
+        if router in TimeSelectorBase._routers:
             return
         super().register(router)
         TimeSelectorBase._registered = True
@@ -163,6 +210,16 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         """
         return TimeSelectorBase._registered
 
+    def _dump_state(self) -> tuple:
+        config = self._config
+        return (config[:4], *config[4:])
+
+    def _load_state(self, state: tuple) -> None:
+        control_buttons, *rest = state
+        self._config = intern_config(TimeSelectorConfig(*control_buttons, *rest))
+        self.on_select = None
+        self.on_back = None
+
     def _(self, act: str, hour: int = 0, minute: int = 0) -> str:
         """Packs callback data into a string with key implicitly.
 
@@ -174,7 +231,7 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         Returns:
             str: Packed callback data string.
         """
-        return self._cb(act=act, hour=hour, minute=minute, key=self._key).pack()
+        return self._codec.pack(act=act, hour=hour, minute=minute, key=self._key)
 
     def _resolve_time(
         self,
@@ -272,80 +329,104 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         Returns:
             Optional[SelectionResult]: Result of processing the callback, if any.
         """
-        return_data = SelectionResult(completed=False, chosen_time=None)
-        action, hour, minute = data.act, data.hour, data.minute
-
-        if action == "IGNORE":
-            await query.answer(cache_time=60)
-
-        elif action == "CANCEL":
-            if self.on_back:
-                await self.on_back(query)
-            elif self.is_registered:
-                await query.message.edit_text("Operation canceled")
-                await query.answer()
-            else:
-                return SelectionResult(completed=True, chosen_time=None)
-
-        elif action == "DONE":
-            now = datetime.now() + timedelta(minutes=1)
-            selected = time(hour=hour, minute=minute)
-
-            future_only = (
-                allow_future_only
-                if allow_future_only is not None
-                else self.allow_future_only
+        action = data.act
+        if action in self._ADJUSTMENTS:
+            result = await self._on_adjust(query, data)
+        else:
+            handler = self._ACTIONS.get(action)
+            result = (
+                await handler(self, query, data, allow_future_only)
+                if handler is not None
+                else None
             )
-            if future_only and selected < now.time():
-                await query.answer(self._past_time_warn_text, show_alert=True)
-
-                if not self.is_registered:
-                    return return_data
-                return None
-
-            if self.on_select:
-                await self.on_select(query, selected)
-            elif self.is_registered:
-                await query.message.edit_text(
-                    f"Selected time: {selected.strftime('%H:%M')}"
-                )
-                await query.answer()
-            else:
-                return SelectionResult(completed=True, chosen_time=selected)
-
-        elif action.startswith("INCR") or action.startswith("DECR"):
-            if action == "INCR_H1":
-                hour = (hour + 1) % 24
 
-            elif action == "INCR_H10":
-                hour = (hour + 10) % 24
-
-            elif action == "INCR_M1":
-                hour, minute = self._adjust_minute(hour, minute, delta_minute=1)
-
-            elif action == "INCR_M10":
-                hour, minute = self._adjust_minute(hour, minute, delta_minute=10)
-
-            elif action == "DECR_H1":
-                hour = (hour - 1) % 24
+        if not self.is_registered:
+            return result or SelectionResult(completed=False, chosen_time=None)
+        return None
 
-            elif action == "DECR_H10":
-                hour = (hour - 10) % 24
+    async def _on_ignore(
+        self,
+        query: CallbackQuery,
+        data: TimeSelectorCB,
+        allow_future_only: Optional[bool] = None,
+    ) -> None:
+        await self._reply(query.answer(cache_time=60))
 
-            elif action == "DECR_M1":
-                hour, minute = self._adjust_minute(hour, minute, delta_minute=-1)
+    async def _on_cancel(
+        self,
+        query: CallbackQuery,
+        data: TimeSelectorCB,
+        allow_future_only: Optional[bool] = None,
+    ) -> Optional[SelectionResult]:
+        if self.on_back:
+            await self.on_back(query)
+        elif self.is_registered:
+            await query.message.edit_text("Operation canceled")
+            await self._reply(query.answer())
+        else:
+            return SelectionResult(completed=True, chosen_time=None)
+        return None
 
-            elif action == "DECR_M10":
-                hour, minute = self._adjust_minute(hour, minute, delta_minute=-10)
+    async def _on_done(
+        self,
+        query: CallbackQuery,
+        data: TimeSelectorCB,
+        allow_future_only: Optional[bool] = None,
+    ) -> Optional[SelectionResult]:
+        now = datetime.now() + timedelta(minutes=1)
+        selected = time(hour=data.hour, minute=data.minute)
 
-            await query.message.edit_reply_markup(
-                reply_markup=self.render_kb(hour, minute)
+        future_only = (
+            allow_future_only
+            if allow_future_only is not None
+            else self.allow_future_only
+        )
+        if future_only and selected < now.time():
+            await self._reply(query.answer(self._past_time_warn_text, show_alert=True))
+            return None
+
+        if self.on_select:
+            await self.on_select(query, selected)
+        elif self.is_registered:
+            await query.message.edit_text(
+                f"Selected time: {selected.strftime('%H:%M')}"
             )
-
-        if not self.is_registered:
-            return return_data
+            await self._reply(query.answer())
+        else:
+            return SelectionResult(completed=True, chosen_time=selected)
         return None
 
+    async def _on_adjust(self, query: CallbackQuery, data: TimeSelectorCB) -> None:
+        """Applies an INCR_*/DECR_* action and re-renders the keyboard."""
+        hour, minute = data.hour, data.minute
+        delta_hour, delta_minute = self._ADJUSTMENTS[data.act]
+        if delta_hour:
+            hour = (hour + delta_hour) % 24
+        else:
+            hour, minute = self._adjust_minute(hour, minute, delta_minute)
+
+        if not await self._edit_markup(query, self.render_kb(hour, minute)):
+            await self._reply(query.answer())
+
+    _ACTIONS = {
+        "IGNORE": _on_ignore,
+        "CANCEL": _on_cancel,
+        "DONE": _on_done,
+    }
+
+    # (delta_hour, delta_minute) of adjustment actions
+    _ADJUSTMENTS = {
+        "INCR_H1": (1, 0),
+        "INCR_H10": (10, 0),
+        "INCR_M1": (0, 1),
+        "INCR_M10": (0, 10),
+        "DECR_H1": (-1, 0),
+        "DECR_H10": (-10, 0),
+        "DECR_M1": (0, -1),
+        "DECR_M10": (0, -10),
+    }
+    _navigation_actions = frozenset(_ADJUSTMENTS)
+
     @abstractmethod
     def render_kb(
         self,
@@ -388,6 +469,8 @@ class TimeSelectorGrid(TimeSelectorBase):
         ValueError: If `control_buttons` does not contain exactly 4 elements.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         allow_future_only: bool = False,
@@ -488,6 +571,8 @@ class TimeSelectorModern(TimeSelectorBase):
         ValueError: If `control_buttons` does not contain exactly 4 elements.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         allow_future_only: bool = False,
@@ -3,12 +3,15 @@ from contextlib import asynccontextmanager
 from typing import Union, Optional, Callable, Awaitable
 
 from aiogram.filters.callback_data import CallbackData
-from aiogram.types import InlineKeyboardButton
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 import string
 import random
 
 
+# Button fields covered by `markup_fingerprint`
+_FINGERPRINT_FIELDS = frozenset(("text", "callback_data", "url"))
+
 ExceptionHandler = Callable[[Exception], Union[None, Awaitable[None]]]
 SUPPORTED_LANGS = {"en", "ru", "uz"}
 
@@ -45,6 +48,30 @@ def ibtn(text: str, cb: Union[CallbackData, str]) -> InlineKeyboardButton:
     return InlineKeyboardButton(text=text, callback_data=cb)
 
 
+def markup_fingerprint(markup: Optional[InlineKeyboardMarkup]) -> Optional[int]:
+    """
+    Returns a hash of the buttons of a keyboard, equal for keyboards that look and act the same.
+
+    Only text, callback data and URL of buttons are hashed. Keyboards with other kinds of
+    buttons get no fingerprint.
+
+    Args:
+        markup (Optional[InlineKeyboardMarkup]): The keyboard, None for no keyboard.
+
+    Returns:
+        Optional[int]: The fingerprint, or None if the keyboard cannot be fingerprinted.
+    """
+    if markup is None:
+        return hash(())
+    rows = []
+    for row in markup.inline_keyboard:
+        for b in row:
+            if not _FINGERPRINT_FIELDS.issuperset(b.model_fields_set):
+                return None
+        rows.append(tuple((b.text, b.callback_data, b.url) for b in row))
+    return hash(tuple(rows))
+
+
 @asynccontextmanager
 async def silent_fail(on_exception: Optional[ExceptionHandler] = None):
     """Asynchronous context manager that suppresses exceptions and optionally handles them with a callback."""
@@ -0,0 +1,60 @@
+"""
+Runs the benchmark suite and emits a JSON report.
+
+    python -m benchmarks                          # print the report
+    python -m benchmarks -o results.json          # save it
+    python -m benchmarks -k render_kb             # only benchmarks matching a regex
+    python -m benchmarks -o new.json --compare old.json
+
+With `--compare`, benchmarks slower than the baseline report by more than `--threshold`
+are listed and the exit code is 1.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks import bench_codec, bench_storage, bench_widgets  # noqa: F401
+from benchmarks.suite import compare, run
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-o", "--output", help="write the JSON report to a file")
+    parser.add_argument("-k", "--pattern", help="regex selecting benchmarks by name")
+    parser.add_argument("-n", "--number", type=int, help="calls per timing run")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="timing runs")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON report")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown reported as a regression (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    def progress(name, result):
+        print(f"{name:<45} {result['best_us']:10.3f} us", file=sys.stderr)
+
+    report = run(args.pattern, args.number, args.repeat, on_result=progress)
+    dump = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(dump + "\n")
+    else:
+        print(dump)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for name in regressions:
+            before = baseline["results"][name]["best_us"]
+            after = report["results"][name]["best_us"]
+            print(f"REGRESSION {name}: {before} us -> {after} us", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Packing and unpacking widget callback data through pydantic `CallbackData` models
+and through `CallbackCodec`, in both wire formats.
+
+Run from the repository root to print a side-by-side comparison:
+
+    python -m benchmarks.bench_codec
+"""
+
+from aiogramx.calendar import CalendarCB
+from aiogramx.codec import CallbackCodec
+from aiogramx.time_selector import TimeSelectorBase, TimeSelectorCB
+from benchmarks.suite import benchmark, run
+
+VALUES = dict(action="PREV-MONTH", year=2025, month=6, day=1, key="A1b2")
+TS_VALUES = dict(act="INCR_M10", hour=9, minute=5, key="A1b2")
+
+LEGACY = CallbackCodec(CalendarCB, short_prefix="axc")
+COMPACT = CallbackCodec(
+    CalendarCB, short_prefix="axc", actions={"PREV-MONTH": "<"}, compact=True
+)
+TS_CODEC = CallbackCodec(
+    TimeSelectorCB,
+    action_field="act",
+    short_prefix="axt",
+    actions=TimeSelectorBase._cb_actions,
+)
+
+
+@benchmark("callback_data.pack.model", number=10_000)
+def _():
+    return lambda: CalendarCB(**VALUES).pack()
+
+
+@benchmark("callback_data.pack.codec", number=10_000)
+def _():
+    return lambda: LEGACY.pack(**VALUES)
+
+
+@benchmark("callback_data.pack.codec_compact", number=10_000)
+def _():
+    return lambda: COMPACT.pack(**VALUES)
+
+
+@benchmark("callback_data.unpack.model", number=10_000)
+def _():
+    packed = CalendarCB(**VALUES).pack()
+    return lambda: CalendarCB.unpack(packed)
+
+
+@benchmark("callback_data.unpack.codec", number=10_000)
+def _():
+    packed = LEGACY.pack(**VALUES)
+    return lambda: LEGACY.unpack(packed)
+
+
+@benchmark("callback_data.unpack.codec_compact", number=10_000)
+def _():
+    packed = COMPACT.pack(**VALUES)
+    return lambda: COMPACT.unpack(packed)
+
+
+@benchmark("callback_data.pack.time_selector.model", number=10_000)
+def _():
+    return lambda: TimeSelectorCB(**TS_VALUES).pack()
+
+
+@benchmark("callback_data.pack.time_selector.codec", number=10_000)
+def _():
+    return lambda: TS_CODEC.pack(**TS_VALUES)
+
+
+def main() -> None:
+    packed, packed_compact = LEGACY.pack(**VALUES), COMPACT.pack(**VALUES)
+    assert packed == CalendarCB(**VALUES).pack()
+    print(f"legacy:  {packed!r} ({len(packed)} bytes)")
+    print(f"compact: {packed_compact!r} ({len(packed_compact)} bytes)\n")
+
+    results = run(r"^callback_data\.")["results"]
+    for name, result in results.items():
+        print(f"{name:<45} {result['best_us']:8.3f} us")
+
+    for op in ("pack", "unpack"):
+        model = results[f"callback_data.{op}.model"]["best_us"]
+        codec = results[f"callback_data.{op}.codec"]["best_us"]
+        print(f"{op} speedup: x{model / codec:.1f}")
+
+
+if __name__ == "__main__":
+    main()
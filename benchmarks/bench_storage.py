@@ -0,0 +1,130 @@
+"""Key generation, widget creation and `from_cb` lookups at various storage fill levels."""
+
+import contextvars
+import itertools
+import os
+import random
+import tempfile
+import types
+
+from aiogramx import Checkbox, storage
+from aiogramx.context import WidgetContext, _current_context
+from aiogramx.storage import SharedMemoryStorage
+from aiogramx.utils import CHARSET, gen_key
+from benchmarks.suite import benchmark
+
+CAPACITY = 10_000
+FILL_LEVELS = (0, 50, 100)  # percent of CAPACITY
+GEN_KEY_SIZES = (0, 10_000, 1_000_000)
+
+
+def filled_checkbox(fill: int, **storage_options):
+    """Returns a Checkbox subclass with its own storage, filled to `fill` percent."""
+    cls = types.new_class(
+        f"BenchCheckbox{fill}",
+        (Checkbox,),
+        {"max_items": CAPACITY, **storage_options},
+    )
+    widgets = [cls(["a", "b"]) for _ in range(CAPACITY * fill // 100)]
+    return cls, widgets
+
+
+def random_keys(n: int, length: int = 4) -> dict:
+    keys = {}
+    while len(keys) < n:
+        keys["".join(random.choices(CHARSET, k=length))] = None
+    return keys
+
+
+for size in GEN_KEY_SIZES:
+
+    @benchmark(f"gen_key.{size}")
+    def _(size=size):
+        existing = random_keys(size)
+        return lambda: gen_key(existing, length=4)
+
+
+for fill in FILL_LEVELS:
+
+    @benchmark(f"allocate_key.fill_{fill}")
+    def _(fill=fill):
+        cls, _ = filled_checkbox(fill)
+        return cls._storage.allocate_key
+
+    @benchmark(f"create.checkbox.fill_{fill}")
+    def _(fill=fill):
+        cls, _ = filled_checkbox(fill)
+        return lambda: cls(["a", "b"])
+
+
+for policy in ("lru", "lfu"):
+
+    @benchmark(f"from_cb.hit.{policy}", number=10_000)
+    def _(policy=policy):
+        cls, widgets = filled_checkbox(100, eviction=policy)
+        data = [
+            cls._codec.unpack(w._codec.pack(action="IGNORE", key=w._key))
+            for w in widgets
+        ]
+        it = itertools.cycle(data)
+        return lambda: cls.from_cb(next(it))
+
+
+for policy, options in (
+    ("lfu", {"eviction": "lfu"}),
+    ("size", {"max_bytes": CAPACITY * 256}),
+):
+
+    @benchmark(f"create.checkbox.fill_100.{policy}")
+    def _(options=options):
+        cls, _ = filled_checkbox(100, **options)
+        return lambda: cls(["a", "b"])
+
+
+@benchmark("from_cb.miss", number=10_000)
+def _():
+    cls, _ = filled_checkbox(100)
+    data = cls._codec.unpack(cls._codec.pack(action="IGNORE", key="-miss"))
+    return lambda: cls.from_cb(data)
+
+
+def shared_checkbox(cache_size: int):
+    """Returns a Checkbox subclass on a `SharedMemoryStorage` in a temporary file, filled up."""
+    path = os.path.join(tempfile.mkdtemp(), "widgets")
+    cls = types.new_class(f"SharedCheckbox{cache_size}", (Checkbox,))
+    cls.use_storage(
+        SharedMemoryStorage(path, slots=CAPACITY * 2, cache_size=cache_size)
+    )
+    widgets = [cls(["a", "b"]) for _ in range(CAPACITY)]
+    return cls, widgets
+
+
+if storage.fcntl is not None:
+    for cached in (True, False):
+
+        @benchmark(f"from_cb.hit.shared.{'cached' if cached else 'restored'}")
+        def _(cached=cached):
+            cls, widgets = shared_checkbox(CAPACITY if cached else 1)
+            data = [
+                cls._codec.unpack(w._codec.pack(action="IGNORE", key=w._key))
+                for w in widgets
+            ]
+            it = itertools.cycle(data)
+            return lambda: cls.from_cb(next(it))
+
+
+@benchmark("from_cb.hit.per_bot", number=10_000)
+def _():
+    # Widgets of one bot among several, looked up in the context of that bot
+    cls = types.new_class(
+        "PerBotCheckbox", (Checkbox,), {"max_items": CAPACITY, "per_bot": True}
+    )
+    for bot_id in range(1, 5):
+        ctx = contextvars.copy_context()
+        ctx.run(_current_context.set, WidgetContext(bot_id=bot_id))
+        widgets = ctx.run(lambda: [cls(["a", "b"]) for _ in range(CAPACITY)])
+    data = [
+        cls._codec.unpack(w._codec.pack(action="IGNORE", key=w._key)) for w in widgets
+    ]
+    it = itertools.cycle(data)
+    return lambda: ctx.run(cls.from_cb, next(it))
@@ -0,0 +1,174 @@
+"""render_kb and process_cb of the built-in widgets."""
+
+from datetime import date
+
+from aiogram.types import InlineKeyboardButton
+
+from aiogramx import (
+    Calendar,
+    Checkbox,
+    Paginator,
+    TimeSelectorGrid,
+    TimeSelectorModern,
+)
+from benchmarks.suite import benchmark
+
+TODAY = date.today()
+
+
+class StubMessage:
+    """Stands in for the callback message, so that no requests are made."""
+
+    class chat:
+        id = 1
+
+    message_id = 1
+
+    async def edit_reply_markup(self, *args, **kwargs):
+        # Move on to another message, so that repeated renders are not skipped as unchanged
+        self.message_id += 1
+
+    async def edit_text(self, *args, **kwargs):
+        pass
+
+    async def delete(self, *args, **kwargs):
+        pass
+
+
+class StubQuery:
+    """Stands in for `CallbackQuery` in `process_cb`, which only answers and edits."""
+
+    message = StubMessage()
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+def buttons(n: int):
+    return [
+        InlineKeyboardButton(text=f"Element {i}", callback_data=f"elem {i}")
+        for i in range(n)
+    ]
+
+
+def lazy_paginator(total: int = 10_000) -> Paginator:
+    data = buttons(total)
+
+    async def lazy_data(cur_page: int, per_page: int):
+        start = (cur_page - 1) * per_page
+        return data[start : start + per_page]
+
+    async def lazy_count():
+        return total
+
+    return Paginator(per_page=15, per_row=2, lazy_data=lazy_data, lazy_count=lazy_count)
+
+
+@benchmark("render_kb.paginator.static")
+def _():
+    pg = Paginator(per_page=15, per_row=2, data=buttons(10_000))
+    return lambda: pg.render_kb(page=42)
+
+
+@benchmark("render_kb.paginator.lazy")
+def _():
+    pg = lazy_paginator()
+    return lambda: pg.render_kb(page=42)
+
+
+@benchmark("render_kb.calendar", number=50)
+def _():
+    cal = Calendar(show_quick_buttons=True)
+    return lambda: cal.render_kb(TODAY.year, TODAY.month)
+
+
+@benchmark("render_kb.time_selector.grid", number=500)
+def _():
+    ts = TimeSelectorGrid()
+    return lambda: ts.render_kb(12, 30)
+
+
+@benchmark("render_kb.time_selector.modern", number=500)
+def _():
+    ts = TimeSelectorModern()
+    return lambda: ts.render_kb(12, 30)
+
+
+@benchmark("render_kb.checkbox", number=200)
+def _():
+    cb = Checkbox([f"Option {i}" for i in range(10)])
+    return cb.render_kb
+
+
+@benchmark("process_cb.paginator.nav")
+def _():
+    pg = Paginator(per_page=15, per_row=2, data=buttons(10_000))
+    query, data = StubQuery(), pg._codec.unpack(pg._("NAV", "42"))
+    return lambda: pg.process_cb(query, data)
+
+
+@benchmark("process_cb.calendar.next_month", number=50)
+def _():
+    cal = Calendar()
+    query = StubQuery()
+    data = cal._codec.unpack(
+        cal._codec.pack(
+            action="NEXT-MONTH", year=TODAY.year, month=TODAY.month, key=cal._key
+        )
+    )
+    return lambda: cal.process_cb(query, data)
+
+
+@benchmark("process_cb.calendar.ignore")
+def _():
+    cal = Calendar()
+    query, data = StubQuery(), cal._codec.unpack(cal._codec.pack(action="IGNORE"))
+    return lambda: cal.process_cb(query, data)
+
+
+@benchmark("process_cb.time_selector.incr", number=500)
+def _():
+    ts = TimeSelectorGrid()
+    query, data = StubQuery(), ts._codec.unpack(ts._("INCR_M10", 12, 30))
+    return lambda: ts.process_cb(query, data)
+
+
+@benchmark("process_cb.checkbox.check", number=200)
+def _():
+    cb = Checkbox([f"Option {i}" for i in range(10)])
+    query = StubQuery()
+    data = cb._codec.unpack(cb._codec.pack(action="CHECK", arg="Option 3", key=cb._key))
+    return lambda: cb.process_cb(query, data)
+
+
+class FixedStubMessage(StubMessage):
+    """`StubMessage` that keeps its message id."""
+
+    async def edit_reply_markup(self, *args, **kwargs):
+        pass
+
+
+@benchmark("process_cb.time_selector.unchanged", number=500)
+def _():
+    # Re-rendering the keyboard already shown, skipped without an edit
+    ts = TimeSelectorGrid()
+    query, data = StubQuery(), ts._codec.unpack(ts._("INCR_M10", 12, 30))
+    query.message = FixedStubMessage()
+    return lambda: ts.process_cb(query, data)
+
+
+class StubUserQuery(StubQuery):
+    """`StubQuery` from a user, as seen by `handle_cb`."""
+
+    class from_user:
+        id = 1
+
+
+@benchmark("handle_cb.time_selector.throttled", number=10_000)
+def _():
+    # A user tapping faster than the click limit, answered without re-rendering
+    cls = type("ThrottledTimeSelector", (TimeSelectorGrid,), {"__slots__": ()})
+    cls.limit_clicks(rate=1e-9, burst=1).allow(StubUserQuery.from_user.id)
+    ts = cls()
+    query, data = StubUserQuery(), ts._codec.unpack(ts._("INCR_M10", 12, 30))
+    return lambda: cls.handle_cb(query, data)
@@ -0,0 +1,120 @@
+"""
+Measures memory held per live widget instance and checks it against documented figures.
+
+    python -m benchmarks.memory            # print bytes per instance
+    python -m benchmarks.memory --check    # also fail if a figure is exceeded
+
+Each widget is created `N` times with the same configuration, as a bot creates them from
+a handler, in a storage large enough to keep all of them. Storage bookkeeping is included.
+Paginators share the same button list, so only the widget itself is measured.
+A broadcast checkbox is measured as a whole, with the overlays of users who clicked it.
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+import types
+
+from aiogram.types import InlineKeyboardButton
+
+from aiogramx import Calendar, Checkbox, Paginator, TimeSelectorGrid, TimeSelectorModern
+
+N = 20_000
+
+# Documented upper bounds of bytes per instance, see README
+BUDGETS = {
+    "Calendar": 300,
+    "Checkbox": 320,
+    "Paginator": 330,
+    "TimeSelectorGrid": 220,
+    "TimeSelectorModern": 220,
+}
+
+BUTTONS = [
+    InlineKeyboardButton(text=f"Element {i}", callback_data=f"elem {i}")
+    for i in range(100)
+]
+
+
+async def on_select(*args):
+    pass
+
+
+FACTORIES = {
+    "Calendar": (Calendar, lambda cls: cls(on_select=on_select)),
+    "Checkbox": (
+        Checkbox,
+        lambda cls: cls(["Option 1", "Option 2", "Option 3"], on_select=on_select),
+    ),
+    "Paginator": (
+        Paginator,
+        lambda cls: cls(per_page=10, data=BUTTONS, on_select=on_select),
+    ),
+    "TimeSelectorGrid": (TimeSelectorGrid, lambda cls: cls(on_select=on_select)),
+    "TimeSelectorModern": (TimeSelectorModern, lambda cls: cls(on_select=on_select)),
+}
+
+
+def measure(name: str, n: int = N) -> float:
+    """Returns the average number of bytes allocated per live widget instance."""
+    base, factory = FACTORIES[name]
+    cls = types.new_class(f"Mem{name}", (base,), {"max_items": n})
+    factory(cls)  # warm up interned configs and caches
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    widgets = [factory(cls) for _ in range(n)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The list holding the widgets is not part of their footprint
+    return (after - before - sys.getsizeof(widgets)) / len(widgets)
+
+
+def measure_broadcast(users: int) -> float:
+    """
+    Returns the number of bytes allocated by a broadcast `Checkbox` after `users` recipients
+    changed their selection, overlays included.
+    """
+    cls = types.new_class("MemBroadcastCheckbox", (Checkbox,))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    widget = cls.broadcast(["Option 1", "Option 2", "Option 3"], on_select=on_select)
+    for user_id in range(users):
+        view = widget._user_view(user_id)
+        view._selected ^= 1
+        widget._save_user_view(user_id, view)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--check", action="store_true", help="fail over budget")
+    args = parser.parse_args()
+
+    failed = []
+    for name, budget in BUDGETS.items():
+        size = measure(name)
+        status = "ok" if size <= budget else "OVER BUDGET"
+        print(f"{name:<20} {size:8.0f} B/instance  (budget {budget} B)  {status}")
+        if size > budget:
+            failed.append(name)
+
+    for users in (0, 1000):
+        size = measure_broadcast(users)
+        print(
+            f"Checkbox broadcast, {users} users changed their selection: {size / 1024:,.1f} KiB"
+        )
+
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
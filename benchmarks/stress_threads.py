@@ -0,0 +1,129 @@
+"""
+Stress test of widget storages used from many threads, each running its own event loop.
+
+    python -m benchmarks.stress_threads                   # StripedMemoryStorage, 8 threads
+    python -m benchmarks.stress_threads -t 32 -n 20000    # more threads and widgets per thread
+    python -m benchmarks.stress_threads --storage memory  # plain MemoryStorage, for comparison
+
+Every thread creates widgets, some of them under a widget context of a random chat, looks each
+one up right after creation, and looks up widgets created by other threads. The storage is large
+enough to keep every widget, even in an unevenly filled stripe, so each lookup must return the widget created under the key, and
+in the end the storage must hold exactly the created widgets. Any violation or exception is
+reported and the exit code is 1. The thread switch interval is lowered to provoke races.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+import types
+
+from aiogramx import Checkbox, MemoryStorage, StripedMemoryStorage
+from aiogramx.context import WidgetContext, _current_context
+
+
+def make_class(storage: str, total: int, stripes: int) -> type:
+    cls = types.new_class("StressCheckbox", (Checkbox,))
+    # Stripes get an even share of the capacity but chats are not spread evenly,
+    # leave enough headroom for no widget to be evicted
+    total *= 2
+    if storage == "striped":
+        cls.use_storage(StripedMemoryStorage(stripes=stripes, max_items=total))
+    else:
+        cls.use_storage(MemoryStorage(max_items=total))
+    return cls
+
+
+def run(threads: int, number: int, storage: str, stripes: int) -> int:
+    """Runs the stress test and returns the number of detected errors."""
+    cls = make_class(storage, threads * number, stripes)
+    created = [[] for _ in range(threads)]
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    async def worker(idx: int):
+        rnd = random.Random(idx)
+        own = created[idx]
+        barrier.wait()
+        for i in range(number):
+            token = None
+            if i % 2:
+                token = _current_context.set(
+                    WidgetContext(chat_id=rnd.randrange(1000), user_id=idx)
+                )
+            try:
+                widget = cls(["a", "b"])
+            finally:
+                if token is not None:
+                    _current_context.reset(token)
+            own.append(widget)
+
+            if cls._storage.get_nowait(widget._key) is not widget:
+                errors.append(f"thread {idx}: fresh widget {widget._key!r} not found")
+
+            # A widget of another thread, possibly being created right now
+            other = created[rnd.randrange(threads)]
+            if other:
+                peer = other[rnd.randrange(len(other))]
+                found = await cls._storage.get(peer._key)
+                if found is not peer:
+                    errors.append(
+                        f"thread {idx}: lookup of {peer._key!r} got {found!r}"
+                    )
+
+            if i % 64 == 0:
+                await asyncio.sleep(0)
+
+    def target(idx: int):
+        try:
+            asyncio.run(worker(idx))
+        except Exception as e:  # reported below
+            errors.append(f"thread {idx}: {type(e).__name__}: {e}")
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    start = time.perf_counter()
+    try:
+        pool = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    elapsed = time.perf_counter() - start
+
+    widgets = [w for own in created for w in own]
+    keys = {w._key for w in widgets}
+    if len(keys) != len(widgets):
+        errors.append(f"{len(widgets) - len(keys)} duplicate keys issued")
+    if len(cls._storage) != len(widgets):
+        errors.append(f"storage holds {len(cls._storage)} of {len(widgets)} widgets")
+    missing = sum(1 for w in widgets if cls._storage.get_nowait(w._key) is not w)
+    if missing:
+        errors.append(f"{missing} widgets missing from storage")
+
+    for error in errors[:20]:
+        print(error, file=sys.stderr)
+    ops = len(widgets) * 3
+    print(
+        f"{storage}: {threads} threads x {number} widgets, "
+        f"{ops / elapsed:,.0f} ops/s, {len(errors)} errors"
+    )
+    return len(errors)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stress_threads")
+    parser.add_argument("-t", "--threads", type=int, default=8)
+    parser.add_argument("-n", "--number", type=int, default=5000, help="per thread")
+    parser.add_argument("--storage", choices=("striped", "memory"), default="striped")
+    parser.add_argument("--stripes", type=int, default=16)
+    args = parser.parse_args()
+    return 1 if run(args.threads, args.number, args.storage, args.stripes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
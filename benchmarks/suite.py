@@ -0,0 +1,148 @@
+import asyncio
+import inspect
+import platform
+import re
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BenchmarkSetup = Callable[[], Callable[[], Any]]
+
+# name -> (setup, default number of calls per timing run)
+BENCHMARKS: Dict[str, Tuple[BenchmarkSetup, int]] = {}
+
+
+def benchmark(
+    name: str, number: int = 1000
+) -> Callable[[BenchmarkSetup], BenchmarkSetup]:
+    """
+    Registers a benchmark.
+
+    The decorated function performs the setup and returns the callable to be timed.
+    If the callable returns an awaitable, it is awaited within the timed loop.
+
+    Args:
+        name (str): Unique benchmark name, e.g. "render_kb.calendar".
+        number (int): Default number of calls per timing run.
+    """
+
+    def decorator(setup: BenchmarkSetup) -> BenchmarkSetup:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name!r} is already registered")
+        BENCHMARKS[name] = setup, number
+        return setup
+
+    return decorator
+
+
+async def _time_async(fn: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await fn()
+    return time.perf_counter() - start
+
+
+def _time_sync(fn: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn: Callable[[], Any], number: int, repeat: int) -> Dict[str, float]:
+    """
+    Times `number` calls of `fn`, `repeat` times, after a warm-up call.
+
+    Returns:
+        Dict[str, float]: Best and mean time per call in microseconds, and the call counts.
+    """
+    # The first call warms up caches and tells whether `fn` is asynchronous
+    probe = fn()
+    if inspect.isawaitable(probe):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(probe)
+            runs = [
+                loop.run_until_complete(_time_async(fn, number)) for _ in range(repeat)
+            ]
+        finally:
+            loop.close()
+    else:
+        runs = [_time_sync(fn, number) for _ in range(repeat)]
+
+    per_call = [r / number * 1e6 for r in runs]
+    return {
+        "best_us": round(min(per_call), 4),
+        "mean_us": round(sum(per_call) / repeat, 4),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(
+    pattern: Optional[str] = None,
+    number: Optional[int] = None,
+    repeat: int = 5,
+    on_result: Optional[Callable[[str, Dict[str, float]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs registered benchmarks.
+
+    Args:
+        pattern (Optional[str]): Regular expression selecting benchmarks by name.
+        number (Optional[int]): Calls per timing run, overriding the benchmark defaults.
+        repeat (int): Timing runs per benchmark.
+        on_result (Optional[Callable]): Called with the name and result of every benchmark.
+
+    Returns:
+        Dict[str, Any]: JSON-serializable report with environment metadata and results.
+    """
+    results = {}
+    for name, (setup, default_number) in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        results[name] = measure(setup(), number or default_number, repeat)
+        if on_result:
+            on_result(name, results[name])
+
+    return {
+        "meta": {
+            "aiogramx": _version("aiogramx"),
+            "aiogram": _version("aiogram"),
+            "pydantic": _version("pydantic"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2
+) -> List[str]:
+    """
+    Compares two reports by best time per call.
+
+    Args:
+        baseline (Dict[str, Any]): Report of the reference run.
+        current (Dict[str, Any]): Report of the run being checked.
+        threshold (float): Relative slowdown reported as a regression.
+
+    Returns:
+        List[str]: Names of benchmarks slower than the baseline by more than `threshold`.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base and result["best_us"] > base["best_us"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def _version(dist: str) -> Optional[str]:
+    try:
+        return version(dist)
+    except PackageNotFoundError:
+        return None
@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogramx import Checkbox
+
+
+class SmallCheckbox(Checkbox, max_items=2, ttl=60):
+    __slots__ = ()
+
+
+class StubMessage:
+    """Message whose keyboard edits take a while."""
+
+    def __init__(self, chat_id: int):
+        self.chat = SimpleNamespace(id=chat_id)
+        self.message_id = 1
+
+    async def edit_reply_markup(self, reply_markup=None):
+        await asyncio.sleep(0.01)
+
+
+class StubQuery:
+    def __init__(self, user_id: int):
+        self.from_user = SimpleNamespace(id=user_id, language_code="en")
+        self.message = StubMessage(user_id)
+        self.data = None
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+def check(widget, arg: str):
+    return widget._codec.unpack(
+        widget._codec.pack(action="CHECK", arg=arg, key=widget._key)
+    )
+
+
+def test_broadcast_widget_is_not_evicted():
+    storage = SmallCheckbox._storage
+    poll = SmallCheckbox.broadcast(["a", "b"])
+    for _ in range(5):
+        SmallCheckbox(["c"])
+
+    assert storage.get_nowait(poll._key) is poll
+    assert not storage.is_stale(poll._key)
+    assert len(storage) == 3
+
+    # Nor expired
+    storage._atime = dict.fromkeys(storage._atime, 0.0)
+    storage.sweep()
+    assert storage.get_nowait(poll._key) is poll
+
+    storage.delete_nowait(poll._key)
+    assert storage.get_nowait(poll._key) is None
+
+
+def test_double_click_of_a_user_keeps_both_changes():
+    poll = Checkbox.broadcast(["a", "b"])
+
+    async def main():
+        await asyncio.gather(
+            poll._process_broadcast(StubQuery(1), check(poll, "a")),
+            poll._process_broadcast(StubQuery(1), check(poll, "b")),
+            poll._process_broadcast(StubQuery(2), check(poll, "b")),
+        )
+
+    asyncio.run(main())
+    assert poll._overlays[1] == 0b11
+    assert poll._overlays[2] == 0b10
+    assert poll._selected == 0
+    assert not poll._flight
@@ -0,0 +1,80 @@
+import pytest
+
+from aiogramx import Checkbox
+from aiogramx.base import WidgetBase
+from aiogramx.budget import BudgetManager
+from aiogramx.metrics import metrics
+
+
+@pytest.fixture
+def widgets():
+    class Busy(Checkbox):
+        __slots__ = ()
+
+    class Idle(Checkbox):
+        __slots__ = ()
+
+    yield Busy, Idle
+    WidgetBase.enable_metrics(False)
+    metrics.reset()
+
+
+def test_manager_turns_metrics_on(widgets):
+    assert not metrics.enabled
+    BudgetManager(1000, widgets=widgets)
+    assert metrics.enabled
+
+
+def test_capacity_follows_demand(widgets):
+    busy, idle = widgets
+    manager = BudgetManager(1000, min_items=100, smoothing=0, widgets=widgets)
+
+    # No demand yet, equal split
+    assert manager.rebalance() == {"Busy": 500, "Idle": 500}
+
+    metrics.widget("Busy").lookup_hits += 300
+    metrics.widget("Idle").lookup_hits += 100
+    assert manager.rebalance() == {"Busy": 700, "Idle": 300}
+    assert busy._storage.max_items == 700
+    assert idle._storage.max_items == 300
+
+
+def test_expired_clicks_weigh_more(widgets):
+    manager = BudgetManager(
+        1000, min_items=100, expired_weight=4, smoothing=0, widgets=widgets
+    )
+    manager.rebalance()
+    metrics.widget("Busy").lookup_hits += 100
+    metrics.widget("Idle").expired_clicks += 100
+    assert manager.rebalance() == {"Busy": 260, "Idle": 740}
+
+
+def test_only_new_activity_counts(widgets):
+    manager = BudgetManager(1000, min_items=100, smoothing=0.5, widgets=widgets)
+    metrics.widget("Busy").lookup_hits += 400
+    manager.rebalance()
+    assert manager.demand == {"Busy": 400, "Idle": 0}
+
+    # Nothing happened since, smoothed demand halves
+    manager.rebalance()
+    assert manager.demand == {"Busy": 200, "Idle": 0}
+
+    # A reset registry does not give negative demand
+    metrics.reset()
+    manager.rebalance()
+    assert manager.demand == {"Busy": 100, "Idle": 0}
+
+
+def test_snapshot_reports_storages(widgets):
+    busy, _ = widgets
+    manager = BudgetManager(1000, min_items=100, widgets=widgets)
+    manager.rebalance()
+    busy(["a"])
+    assert manager.snapshot()["Busy"] == {"capacity": 500, "size": 1, "demand": 0.0}
+
+
+def test_budget_must_cover_minimum(widgets):
+    with pytest.raises(ValueError):
+        BudgetManager(1000, smoothing=1, widgets=widgets)
+    with pytest.raises(ValueError):
+        BudgetManager(150, min_items=100, widgets=widgets).rebalance()
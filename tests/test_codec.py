@@ -0,0 +1,98 @@
+import asyncio
+from typing import Optional
+
+import pytest
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+
+from aiogramx import Calendar, Checkbox, Paginator, TimeSelectorGrid
+from aiogramx.base import WidgetBase
+
+
+class ToggleCB(CallbackData, prefix="test_toggle"):
+    key: str
+    value: str
+
+
+class Toggle(WidgetBase[ToggleCB, "Toggle"]):
+    """Custom widget whose callback data has no action field."""
+
+    _cb = ToggleCB
+
+    async def process_cb(self, c, data):
+        pass
+
+    def render_kb(self):
+        pass
+
+
+class FlagCB(CallbackData, prefix="test_flag"):
+    action: str
+    flag: bool = False
+    count: Optional[int] = None
+    key: str = ""
+
+
+class Flag(WidgetBase[FlagCB, "Flag"]):
+    """Custom widget with callback data fields the precompiled format cannot convert."""
+
+    _cb = FlagCB
+    _cb_short_prefix = "tfl"
+
+    async def process_cb(self, c, data):
+        pass
+
+    def render_kb(self):
+        pass
+
+
+def query(data: str) -> CallbackQuery:
+    return CallbackQuery.model_construct(id="1", data=data, chat_instance="1")
+
+
+@pytest.mark.parametrize(
+    "widget_cls", [Calendar, Checkbox, Paginator, TimeSelectorGrid]
+)
+def test_builtin_widgets_use_precompiled_format(widget_cls):
+    assert widget_cls._codec.fast
+
+
+def test_widget_without_action_field():
+    widget = Toggle()
+    data = widget._codec.pack(key=widget._key, value="on")
+    assert data == ToggleCB(key=widget._key, value="on").pack()
+
+    callback_data = asyncio.run(Toggle.filter()(query(data)))["callback_data"]
+    assert callback_data == ToggleCB(key=widget._key, value="on")
+    assert not widget._is_navigation(callback_data)
+
+
+def test_typed_fields_are_validated():
+    widget = Flag()
+    assert not Flag._codec.fast
+
+    data = widget._codec.pack(action="SET", key=widget._key)
+    callback_data = Flag._codec.unpack(data)
+    assert callback_data.flag is False
+    assert callback_data.count is None
+
+    data = widget._codec.pack(action="SET", flag=True, count=3, key=widget._key)
+    callback_data = Flag._codec.unpack(data)
+    assert callback_data.flag is True
+    assert callback_data.count == 3
+
+
+def test_compact_mode_needs_precompiled_format():
+    with pytest.raises(ValueError):
+        Flag.use_compact_callbacks()
+    Flag.use_compact_callbacks(False)
+
+
+def test_compact_mode_skips_unsupported_widgets():
+    WidgetBase.use_compact_callbacks()
+    try:
+        assert Calendar._codec.compact
+        assert not Toggle._codec.compact
+        assert not Flag._codec.compact
+    finally:
+        WidgetBase.use_compact_callbacks(False)
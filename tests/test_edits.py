@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageReplyMarkup
+from aiogram.types import Chat, Message
+
+from aiogramx import Checkbox, EditScheduler
+from aiogramx.base import WidgetBase, _webhook_reply
+
+
+class StubMessage:
+    """Callback message recording keyboard edits, failing while `fail` is set."""
+
+    def __init__(self, fail: bool = False):
+        self.chat = SimpleNamespace(id=1)
+        self.message_id = 10
+        self.fail = fail
+        self.edits = 0
+
+    async def edit_reply_markup(self, reply_markup=None):
+        if self.fail:
+            raise TelegramBadRequest(
+                EditMessageReplyMarkup(chat_id=1, message_id=10),
+                "message to edit not found",
+            )
+        self.edits += 1
+
+
+def edit(widget, message) -> bool:
+    return asyncio.run(
+        widget._edit_markup(SimpleNamespace(message=message), widget.render_kb())
+    )
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = WidgetBase._edit_scheduler = EditScheduler()
+    yield scheduler
+    WidgetBase._edit_scheduler = None
+
+
+def test_unchanged_keyboard_is_skipped():
+    cb, message = Checkbox(["a", "b"]), StubMessage()
+    assert edit(cb, message)
+    assert not edit(cb, message)
+    assert message.edits == 1
+
+    cb._selected ^= 1
+    assert edit(cb, message)
+    assert message.edits == 2
+
+
+def test_failed_edit_is_not_remembered():
+    cb, message = Checkbox(["a", "b"]), StubMessage(fail=True)
+    with pytest.raises(TelegramBadRequest):
+        edit(cb, message)
+
+    message.fail = False
+    assert edit(cb, message)
+    assert message.edits == 1
+
+
+def test_queued_edit_is_remembered_once_sent(scheduler):
+    cb, message = Checkbox(["a", "b"]), StubMessage(fail=True)
+
+    async def main():
+        c = SimpleNamespace(message=message)
+        assert await cb._edit_markup(c, cb.render_kb())
+        scheduler.flush()
+        await asyncio.gather(*scheduler._tasks)
+
+        # The failed edit does not count as shown
+        message.fail = False
+        assert await cb._edit_markup(c, cb.render_kb())
+        # Neither does a queued one
+        assert await cb._edit_markup(c, cb.render_kb())
+        scheduler.flush()
+        await asyncio.gather(*scheduler._tasks)
+
+        assert not await cb._edit_markup(c, cb.render_kb())
+
+    asyncio.run(main())
+    assert message.edits == 1
+
+
+def test_edit_left_as_webhook_reply_is_not_remembered():
+    cb = Checkbox(["a", "b"])
+    message = Message.model_construct(
+        message_id=10, date=0, chat=Chat(id=1, type="private")
+    )
+
+    async def main():
+        c = SimpleNamespace(message=message)
+        reply = []
+        token = _webhook_reply.set(reply)
+        try:
+            assert await cb._edit_markup(c, cb.render_kb())
+        finally:
+            _webhook_reply.reset(token)
+        assert isinstance(reply[0], EditMessageReplyMarkup)
+
+        stub = StubMessage()
+        assert await cb._edit_markup(SimpleNamespace(message=stub), cb.render_kb())
+        assert stub.edits == 1
+
+    asyncio.run(main())
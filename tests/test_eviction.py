@@ -0,0 +1,115 @@
+import pytest
+from aiogram.types import InlineKeyboardButton
+
+from aiogramx import Checkbox, Paginator
+from aiogramx.eviction import LFUPolicy, SizePolicy, make_policy
+from aiogramx.storage import MemoryStorage
+
+
+class Item:
+    """Stands in for a widget of a known size."""
+
+    _owner = _message = None
+
+    def __init__(self, size: int = 100):
+        self.size = size
+
+    def approx_size(self) -> int:
+        return self.size
+
+
+def store(storage: MemoryStorage, item: Item) -> str:
+    key = storage.allocate_key()
+    storage.set_nowait(key, item)
+    return key
+
+
+def test_lfu_evicts_the_least_used_widget():
+    storage = MemoryStorage(max_items=3, eviction="lfu")
+    popular, rare, newer = (store(storage, Item()) for _ in range(3))
+    for _ in range(3):
+        storage.get_nowait(popular)
+    storage.get_nowait(newer)
+
+    # LRU would evict `popular`, the least recently used one
+    store(storage, Item())
+    assert rare not in storage
+    assert popular in storage and newer in storage
+
+
+def test_lfu_breaks_ties_by_recency():
+    policy = LFUPolicy()
+    for key in "abc":
+        policy.insert(key, Item())
+    policy.access("a")
+    assert policy.victim([]) == "b"
+
+    policy.remove("b")
+    assert policy.victim([]) == "c"
+
+
+def test_lfu_counts_saturate():
+    policy = LFUPolicy(max_count=3)
+    policy.insert("a", Item())
+    for _ in range(10):
+        policy.access("a")
+    assert policy.count("a") == 3
+    assert policy.count("missing") == 0
+
+
+def test_size_policy_keeps_stored_widgets_within_budget():
+    storage = MemoryStorage(max_items=100, eviction="size", max_bytes=1000)
+    small = [store(storage, Item(100)) for _ in range(5)]
+    big = store(storage, Item(700))
+
+    assert storage.policy.total <= 1000
+    # The least recently used widgets go first
+    assert [key in storage for key in small] == [False, False, True, True, True]
+    assert big in storage
+
+
+def test_size_policy_tracks_resaved_widgets():
+    policy = SizePolicy(max_bytes=1000)
+    item = Item(100)
+    policy.insert("a", item)
+    item.size = 300
+    policy.insert("a", item)
+    assert policy.total == 300
+
+    policy.remove("a")
+    assert policy.total == 0
+
+
+def test_single_widget_over_budget_is_kept():
+    storage = MemoryStorage(eviction="size", max_bytes=100)
+    key = store(storage, Item(500))
+    assert key in storage
+
+
+def test_switching_policy_evicts_over_budget():
+    storage = MemoryStorage(max_items=100)
+    keys = [store(storage, Item(400)) for _ in range(4)]
+    storage.configure(max_bytes=1000)
+    assert storage.policy.name == "size"
+    assert [key in storage for key in keys] == [False, False, True, True]
+
+
+def test_make_policy_validates_arguments():
+    with pytest.raises(ValueError):
+        make_policy("mru")
+    with pytest.raises(ValueError):
+        make_policy("size")
+    with pytest.raises(ValueError):
+        SizePolicy(max_bytes=0)
+
+
+def test_widgets_report_their_size():
+    small = Checkbox(["a"])
+    large = Paginator(
+        per_page=10,
+        data=[
+            InlineKeyboardButton(text=str(i), callback_data=f"item {i}")
+            for i in range(1000)
+        ],
+    )
+    assert 0 < small.approx_size() < large.approx_size()
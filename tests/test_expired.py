@@ -0,0 +1,118 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aiogramx import Checkbox
+from aiogramx.base import WidgetBase
+from aiogramx.expired import ExpiredClickCache, expired_cache
+
+
+class StubQuery:
+    """Click on an old keyboard, recording answers and keyboard removals."""
+
+    data = None
+
+    def __init__(self, chat_id: int = 1):
+        self.from_user = SimpleNamespace(id=chat_id, language_code="en")
+        self.message = SimpleNamespace(
+            chat=SimpleNamespace(id=chat_id),
+            message_id=1,
+            delete_reply_markup=self._strip,
+        )
+        self.answers = []
+        self.stripped = 0
+
+    async def answer(self, text=None, cache_time=None, **kwargs):
+        self.answers.append((text, cache_time))
+
+    async def _strip(self):
+        self.stripped += 1
+
+
+class Gone(Checkbox):
+    __slots__ = ()
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Counts storage lookups of `Gone` widgets."""
+    expired_cache.clear()
+    storage = Gone._storage
+    counted = []
+    get = storage.get
+
+    async def counting_get(key):
+        counted.append(key)
+        return await get(key)
+
+    monkeypatch.setattr(storage, "get", counting_get)
+    monkeypatch.setattr(storage, "is_stale", lambda key: False)
+    yield counted
+    WidgetBase.configure_expired(answer_cache_time=30)
+    expired_cache.clear()
+
+
+def click(query: StubQuery, key: str = "gone") -> None:
+    data = Gone._codec.unpack(Gone._codec.pack(action="CHECK", arg="a", key=key))
+    asyncio.run(Gone._dispatch_cb(query, data))
+
+
+def test_repeated_clicks_skip_the_lookup(lookups):
+    first = StubQuery()
+    click(first)
+    assert lookups == ["gone"]
+    assert first.stripped == 1
+
+    second = StubQuery()
+    click(second)
+    assert lookups == ["gone"]
+    assert len(second.answers) == 1
+    assert second.stripped == 0
+
+
+def test_answers_are_cached_by_clients(lookups):
+    query = StubQuery()
+    click(query)
+    assert query.answers == [(Gone.get_expired_text("en"), 30)]
+
+    WidgetBase.configure_expired(answer_cache_time=0)
+    query = StubQuery()
+    click(query, key="other")
+    assert query.answers[0][1] is None
+
+
+def test_keyboard_removal_is_throttled_per_chat(lookups):
+    queries = [StubQuery(chat_id=1), StubQuery(chat_id=1), StubQuery(chat_id=2)]
+    for i, query in enumerate(queries):
+        click(query, key=f"gone{i}")
+    assert [q.stripped for q in queries] == [1, 0, 1]
+
+
+def test_remembered_keys_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = ExpiredClickCache(ttl=10, strip_interval=5)
+
+    cache.add("scope", "key")
+    assert cache.is_known("scope", "key")
+    assert not cache.is_known("other", "key")
+    now[0] += 11
+    assert not cache.is_known("scope", "key")
+
+    assert cache.allow_strip(1)
+    assert not cache.allow_strip(1)
+    now[0] += 5
+    assert cache.allow_strip(1)
+
+
+def test_cache_is_bounded():
+    cache = ExpiredClickCache(max_keys=2)
+    for key in "abc":
+        cache.add("scope", key)
+    assert not cache.is_known("scope", "a")
+    assert cache.is_known("scope", "c")
+
+    cache.configure(max_keys=1)
+    assert len(cache._keys) == 1
@@ -0,0 +1,106 @@
+import pytest
+
+from aiogramx import Calendar, Checkbox
+from aiogramx.base import WidgetBase
+from aiogramx.metrics import Histogram, MetricsRegistry, metrics
+
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    WidgetBase.enable_metrics()
+    yield metrics
+    WidgetBase.enable_metrics(False)
+    metrics.reset()
+
+
+def test_histogram_is_cumulative():
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(value)
+
+    assert hist.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert hist.count == 4
+    assert hist.sum == pytest.approx(2.65)
+
+
+def test_snapshot_reports_storages():
+    registry = MetricsRegistry()
+    registry.widget("Checkbox").created += 2
+    registry.evicted("Checkbox", "capacity", count=3)
+
+    snapshot = registry.snapshot({"Checkbox": Checkbox._storage})
+    widget = snapshot["widgets"]["Checkbox"]
+    assert widget["created"] == 2
+    assert widget["evictions"] == {"capacity": 3}
+    assert snapshot["storages"]["Checkbox"] == {
+        "size": len(Checkbox._storage),
+        "capacity": Checkbox._storage.max_items,
+    }
+    assert "edits" not in snapshot
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(buckets=(0.5,))
+    m = registry.widget("Checkbox")
+    m.lookup_hits = 3
+    m.lookup_misses = 1
+    m.render.observe(0.25)
+    registry.evicted("Checkbox", "expired")
+
+    text = registry.to_prometheus(namespace="bot")
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE bot_lookups_total counter" in lines
+    assert 'bot_lookups_total{widget="Checkbox",result="hit"} 3' in lines
+    assert 'bot_lookups_total{widget="Checkbox",result="miss"} 1' in lines
+    assert 'bot_evictions_total{widget="Checkbox",reason="expired"} 1' in lines
+    assert "# TYPE bot_render_seconds histogram" in lines
+    assert 'bot_render_seconds_bucket{widget="Checkbox",le="0.5"} 1' in lines
+    assert 'bot_render_seconds_bucket{widget="Checkbox",le="+Inf"} 1' in lines
+    assert 'bot_render_seconds_count{widget="Checkbox"} 1' in lines
+    # No storages given, no gauges
+    assert not any("storage_size" in line for line in lines)
+
+
+def test_disabled_metrics_collect_nothing():
+    metrics.reset()
+    Checkbox(["a"]).render_kb()
+    assert metrics.snapshot()["widgets"] == {}
+
+
+def test_widgets_are_measured_when_enabled(enabled):
+    cb = Checkbox(["a"])
+    cb.render_kb()
+
+    m = enabled.widget("Checkbox")
+    assert m.created == 1
+    assert m.render.count == 1
+
+    text = Checkbox.get_metrics_text()
+    assert 'aiogramx_widgets_created_total{widget="Checkbox"} 1' in text
+    assert 'aiogramx_storage_size{storage="Checkbox"}' in text
+
+
+def test_widgets_are_only_wrapped_while_enabled():
+    plain = Checkbox.__dict__["render_kb"]
+    assert not hasattr(plain, "__timed__")
+
+    WidgetBase.enable_metrics()
+    try:
+        assert Checkbox.render_kb.__wrapped__ is plain
+        assert Calendar.__dict__["process_cb"].__timed__
+
+        class Late(Checkbox):
+            __slots__ = ()
+
+            def render_kb(self):
+                return super().render_kb()
+
+        assert Late.__dict__["render_kb"].__timed__
+    finally:
+        WidgetBase.enable_metrics(False)
+        metrics.reset()
+
+    assert Checkbox.__dict__["render_kb"] is plain
+    assert not hasattr(Late.__dict__["render_kb"], "__timed__")
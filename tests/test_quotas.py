@@ -0,0 +1,100 @@
+from aiogramx import Checkbox
+from aiogramx.context import WidgetContext, _current_context
+from aiogramx.storage import MemoryStorage
+
+
+class Item:
+    """Stands in for a widget created for an owner and a message."""
+
+    def __init__(self, owner=None, message=None):
+        self._owner = owner
+        self._message = message
+
+
+def store(storage: MemoryStorage, item: Item) -> str:
+    key = storage.allocate_key()
+    storage.set_nowait(key, item)
+    return key
+
+
+def test_owner_loses_its_oldest_widget():
+    storage = MemoryStorage(per_user=2)
+    alice = [store(storage, Item(owner=(1, 1))) for _ in range(2)]
+    bob = store(storage, Item(owner=(1, 2)))
+
+    newest = store(storage, Item(owner=(1, 1)))
+    assert alice[0] not in storage
+    assert alice[1] in storage and newest in storage
+    # Other owners are not affected
+    assert bob in storage
+
+
+def test_widgets_without_owner_are_not_counted():
+    storage = MemoryStorage(per_user=1)
+    keys = [store(storage, Item()) for _ in range(3)]
+    assert all(key in storage for key in keys)
+
+
+def test_restoring_a_widget_does_not_count_twice():
+    storage = MemoryStorage(per_user=2)
+    item = Item(owner=(1, 1))
+    key = store(storage, item)
+    other = store(storage, Item(owner=(1, 1)))
+    storage.set_nowait(key, item)
+    assert key in storage and other in storage
+
+
+def test_deleted_widgets_free_the_quota():
+    storage = MemoryStorage(per_user=1)
+    first = store(storage, Item(owner=(1, 1)))
+    storage.delete_nowait(first)
+    assert not storage._owned
+    store(storage, Item(owner=(1, 1)))
+    assert len(storage) == 1
+
+
+def test_disabling_the_quota():
+    storage = MemoryStorage(per_user=1)
+    store(storage, Item(owner=(1, 1)))
+    storage.configure(per_user=0)
+    store(storage, Item(owner=(1, 1)))
+    assert len(storage) == 2
+
+
+def test_message_keeps_a_single_widget():
+    storage = MemoryStorage(per_message=True)
+    first = store(storage, Item(message=(1, 10)))
+    assert storage.key_for_message((1, 10)) == first
+
+    second = store(storage, Item(message=(1, 10)))
+    assert first not in storage
+    assert storage.key_for_message((1, 10)) == second
+    assert storage.key_for_message((1, 11)) is None
+
+    storage.delete_nowait(second)
+    assert storage.key_for_message((1, 10)) is None
+
+
+def test_messages_are_not_tracked_when_disabled():
+    storage = MemoryStorage()
+    first = store(storage, Item(message=(1, 10)))
+    store(storage, Item(message=(1, 10)))
+    assert first in storage
+    assert storage.key_for_message((1, 10)) is None
+
+
+def test_widget_reuses_key_of_the_callback_message():
+    class Reused(Checkbox, per_user=2, per_message=True):
+        __slots__ = ()
+
+    token = _current_context.set(WidgetContext(chat_id=1, user_id=1, message_id=10))
+    try:
+        first = Reused(["a"])
+        second = Reused(["b"])
+    finally:
+        _current_context.reset(token)
+
+    assert first._owner == (1, 1)
+    assert second._key == first._key
+    assert Reused._storage.get_nowait(first._key) is second
+    assert len(Reused._storage) == 1
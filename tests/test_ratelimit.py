@@ -0,0 +1,104 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aiogramx import Checkbox
+from aiogramx.ratelimit import ClickLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_rate(clock):
+    limiter = ClickLimiter(rate=2, burst=3)
+    assert [limiter.allow(1) for _ in range(4)] == [True, True, True, False]
+
+    # Half a second refills a single token
+    clock[0] += 0.5
+    assert limiter.allow(1)
+    assert not limiter.allow(1)
+
+    # Tokens never exceed the burst
+    clock[0] += 100
+    assert [limiter.allow(1) for _ in range(4)] == [True, True, True, False]
+
+
+def test_users_have_own_buckets(clock):
+    limiter = ClickLimiter(rate=1, burst=1)
+    assert limiter.allow(1)
+    assert not limiter.allow(1)
+    assert limiter.allow(2)
+
+
+def test_throttled_clicks_refill_partially(clock):
+    limiter = ClickLimiter(rate=1, burst=1)
+    limiter.allow(1)
+    clock[0] += 0.6
+    assert not limiter.allow(1)
+    # Time before the rejected click still counts
+    clock[0] += 0.5
+    assert limiter.allow(1)
+
+
+def test_least_recent_users_are_dropped(clock):
+    limiter = ClickLimiter(rate=1, burst=1, max_users=2)
+    for user in (1, 2, 3):
+        limiter.allow(user)
+    assert len(limiter) == 2
+    # User 1 starts over with a full bucket
+    assert limiter.allow(1)
+
+    limiter.clear()
+    assert len(limiter) == 0
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        ClickLimiter(rate=0)
+    with pytest.raises(ValueError):
+        ClickLimiter(burst=0)
+
+
+class Limited(Checkbox):
+    __slots__ = ()
+
+
+class StubQuery:
+    data = None
+
+    def __init__(self):
+        self.from_user = SimpleNamespace(id=1, language_code="en")
+        self.message = None
+        self.answers = []
+
+    async def answer(self, text=None, **kwargs):
+        self.answers.append(text)
+
+
+def test_throttled_clicks_are_answered_without_lookup(clock, monkeypatch):
+    limiter = Limited.limit_clicks(rate=1, burst=1, text="Slow down")
+    try:
+        looked_up = []
+
+        async def get(key):
+            looked_up.append(key)
+
+        monkeypatch.setattr(Limited._storage, "get", get)
+        data = Limited._codec.unpack(
+            Limited._codec.pack(action="CHECK", arg="a", key="k")
+        )
+        limiter.allow(1)
+
+        query = StubQuery()
+        asyncio.run(Limited._dispatch_cb(query, data))
+        assert query.answers == ["Slow down"]
+        assert looked_up == []
+    finally:
+        Limited.limit_clicks(None)
+    assert Limited._limiter is None
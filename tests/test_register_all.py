@@ -0,0 +1,79 @@
+import asyncio
+
+from aiogram import Router
+from aiogram.types import CallbackQuery
+
+from aiogramx import Calendar, Checkbox, Paginator, register_all
+from aiogramx.base import WidgetRouteFilter
+
+
+def handlers(router: Router) -> int:
+    return len(router.callback_query.handlers)
+
+
+def route_filter(router: Router) -> WidgetRouteFilter:
+    (handler,) = router.callback_query.handlers
+    return next(
+        f.callback for f in handler.filters if isinstance(f.callback, WidgetRouteFilter)
+    )
+
+
+def route(router: Router, data: str):
+    query = CallbackQuery.model_construct(id="1", data=data, chat_instance="1")
+    return asyncio.run(route_filter(router)(query))
+
+
+def test_single_handler_for_all_widgets():
+    router = Router()
+    register_all(router)
+    register_all(router)
+    assert handlers(router) == 1
+    assert Calendar().is_registered
+
+    routed = route_filter(router).routes
+    assert any(Checkbox in classes for classes in routed.values())
+
+
+def test_registered_widgets_are_skipped():
+    router = Router()
+    Calendar.register(router)
+    register_all(router, [Calendar])
+    assert handlers(router) == 1
+
+    register_all(router, [Calendar, Checkbox])
+    assert handlers(router) == 2
+    filters = [
+        f.callback
+        for handler in router.callback_query.handlers
+        for f in handler.filters
+        if isinstance(f.callback, WidgetRouteFilter)
+    ]
+    (only,) = filters
+    assert {k for classes in only.routes.values() for k in classes} == {Checkbox}
+
+
+def test_routes_by_prefix():
+    router = Router()
+    register_all(router, [Calendar, Checkbox, Paginator])
+
+    cb = Checkbox(["a"])
+    data = cb._codec.pack(action="CHECK", arg="a", key=cb._key)
+    result = route(router, data)
+    assert result["widget_cls"] is Checkbox
+    assert result["callback_data"].key == cb._key
+
+    assert route(router, "approve:42") is False
+
+
+def test_subclasses_with_own_storage_share_the_prefix():
+    class OwnCheckbox(Checkbox, max_items=10):
+        __slots__ = ()
+
+    router = Router()
+    register_all(router, [Checkbox, OwnCheckbox])
+    assert handlers(router) == 1
+
+    for widget_cls in (Checkbox, OwnCheckbox):
+        cb = widget_cls(["a"])
+        data = cb._codec.pack(action="CHECK", arg="a", key=cb._key)
+        assert route(router, data)["widget_cls"] is widget_cls
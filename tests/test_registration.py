@@ -0,0 +1,47 @@
+from aiogram import Router
+
+import aiogramx
+from aiogramx import Calendar, TimeSelectorGrid, TimeSelectorModern
+from aiogramx.base import WidgetBase, WidgetMeta
+
+
+def handlers(router: Router) -> int:
+    return len(router.callback_query.handlers)
+
+
+def test_widget_registers_on_every_router():
+    first, second = Router(), Router()
+    Calendar.register(first)
+    Calendar.register(first)
+    Calendar.register(second)
+    assert handlers(first) == 1
+    assert handlers(second) == 1
+
+
+def test_time_selectors_register_on_every_router():
+    first, second = Router(), Router()
+    TimeSelectorGrid.register(first)
+    TimeSelectorModern.register(first)
+    TimeSelectorModern.register(second)
+    assert handlers(first) == 1
+    assert handlers(second) == 1
+    assert TimeSelectorGrid().is_registered
+
+
+def test_widget_classes_with_the_same_name_are_told_apart():
+    class Checkbox(aiogramx.Checkbox):
+        __slots__ = ()
+
+    try:
+        assert WidgetMeta.lookup("aiogramx.checkbox.Checkbox") is aiogramx.Checkbox
+        assert WidgetMeta.lookup(Checkbox._widget_name) is Checkbox
+        # A plain class name is ambiguous now
+        assert WidgetMeta.lookup("Checkbox") is None
+
+        cb = Checkbox(["a"])
+        restored = WidgetBase.load_state(
+            Checkbox._widget_name, cb._key, cb.dump_state()
+        )
+        assert type(restored) is Checkbox
+    finally:
+        del WidgetMeta.widgets[Checkbox._widget_name]
@@ -0,0 +1,43 @@
+import asyncio
+
+from aiogram.types import CallbackQuery
+
+from aiogramx import Calendar, Checkbox, Paginator, TimeSelectorGrid
+from aiogramx.base import WidgetRouteFilter
+
+WIDGETS = [Calendar, Checkbox, Paginator, TimeSelectorGrid]
+
+
+def query(data: str) -> CallbackQuery:
+    return CallbackQuery.model_construct(id="1", data=data, chat_instance="1")
+
+
+def route(data: str):
+    return asyncio.run(WidgetRouteFilter(WIDGETS)(query(data)))
+
+
+def test_common_prefix_per_format():
+    prefixes = WidgetRouteFilter(WIDGETS).common_prefixes
+    assert all(len(prefix) > 1 for prefix in prefixes)
+    assert "ax" in prefixes
+
+
+def test_foreign_callback_data_is_rejected():
+    assert route("approve:42") is False
+    assert route("a") is False
+
+
+def test_both_formats_are_routed():
+    cal = Calendar()
+    regular = cal._codec.pack(action="IGNORE", key=cal._key)
+    result = route(regular)
+    assert result["widget_cls"] is Calendar
+
+    Checkbox.use_compact_callbacks()
+    try:
+        cb = Checkbox(["a"])
+        compact = cb._codec.pack(action="CHECK", arg="a", key=cb._key)
+        assert compact.startswith(Checkbox._cb_short_prefix)
+        assert route(compact)["widget_cls"] is Checkbox
+    finally:
+        Checkbox.use_compact_callbacks(False)
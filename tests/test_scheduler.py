@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import EditMessageReplyMarkup
+
+from aiogramx import EditScheduler
+
+
+class StubMessage:
+    """Message recording keyboard edits, raising `error` once if given."""
+
+    def __init__(self, chat_id: int, error: Exception = None):
+        self.chat = SimpleNamespace(id=chat_id)
+        self.message_id = 1
+        self.error = error
+        self.markups = []
+
+    async def edit_reply_markup(self, reply_markup=None):
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+        self.markups.append(reply_markup)
+
+
+def method(chat_id: int) -> EditMessageReplyMarkup:
+    return EditMessageReplyMarkup(chat_id=chat_id, message_id=1)
+
+
+async def drain(scheduler: EditScheduler) -> None:
+    scheduler.flush()
+    await asyncio.gather(*scheduler._tasks)
+
+
+def test_latest_keyboard_wins():
+    scheduler, message = EditScheduler(), StubMessage(1)
+
+    async def main():
+        for markup in ("a", "b", "c"):
+            scheduler.submit(message, markup)
+        await drain(scheduler)
+
+    asyncio.run(main())
+    assert message.markups == ["c"]
+    assert scheduler.superseded == 2
+    assert scheduler.sent == 1
+
+
+def test_api_error_does_not_stop_other_edits():
+    scheduler = EditScheduler()
+    blocked = StubMessage(1, TelegramForbiddenError(method(1), "bot was blocked"))
+    other = StubMessage(2)
+
+    async def main():
+        task = asyncio.create_task(scheduler.run())
+        scheduler.submit(blocked, "a")
+        scheduler.submit(other, "b")
+        await asyncio.sleep(0.1)
+        scheduler.submit(other, "c")
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(main())
+    assert scheduler.failed == 1
+    assert other.markups == ["b", "c"]
+
+
+def test_flood_wait_is_retried():
+    scheduler = EditScheduler()
+    message = StubMessage(1, TelegramRetryAfter(method(1), "flood", retry_after=0))
+
+    async def main():
+        scheduler.submit(message, "a")
+        await drain(scheduler)
+        await drain(scheduler)
+
+    asyncio.run(main())
+    assert scheduler.retried == 1
+    assert message.markups == ["a"]
+
+
+def test_scheduler_created_outside_of_a_loop_runs_in_any_loop():
+    scheduler = EditScheduler(interval=0)
+
+    async def main(markup):
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0)
+        message = StubMessage(1)
+        scheduler.submit(message, markup)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(*scheduler._tasks)
+        return message.markups
+
+    assert asyncio.run(main("a")) == ["a"]
+    # Started again by a new event loop, e.g. another polling session
+    assert asyncio.run(main("b")) == ["b"]
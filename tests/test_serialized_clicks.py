@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from aiogramx import Checkbox
+
+
+class StubQuery:
+    """Click recording its answers, without a message to edit."""
+
+    message = None
+    data = None
+
+    def __init__(self):
+        self.answers = 0
+
+    async def answer(self, *args, **kwargs):
+        self.answers += 1
+
+
+class FailingCheckbox(Checkbox):
+    """Checkbox whose clicks on option "bad" fail while being processed."""
+
+    __slots__ = ()
+
+    async def process_cb(self, c, data):
+        await asyncio.sleep(0.01)
+        if data.arg == "bad":
+            raise RuntimeError("failed")
+        await c.answer()
+
+
+def check(cb, arg: str):
+    return cb._codec.unpack(cb._codec.pack(action="CHECK", arg=arg, key=cb._key))
+
+
+def test_failing_queued_click_does_not_drop_the_rest():
+    cb = FailingCheckbox(["ok", "bad"])
+    clicks = [StubQuery() for _ in range(3)]
+
+    async def main():
+        await asyncio.gather(
+            cb._process_serialized(clicks[0], check(cb, "ok")),
+            cb._process_serialized(clicks[1], check(cb, "bad")),
+            cb._process_serialized(clicks[2], check(cb, "ok")),
+        )
+
+    asyncio.run(main())
+    assert [c.answers for c in clicks] == [1, 1, 1]
+    assert cb._flight is None
+
+
+def test_failing_first_click_is_raised_after_the_queue():
+    cb = FailingCheckbox(["ok", "bad"])
+    first, queued = StubQuery(), StubQuery()
+
+    async def main():
+        results = await asyncio.gather(
+            cb._process_serialized(first, check(cb, "bad")),
+            cb._process_serialized(queued, check(cb, "ok")),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], RuntimeError)
+
+    asyncio.run(main())
+    assert queued.answers == 1
+
+
+def test_queued_clicks_are_answered_when_interrupted():
+    cb = FailingCheckbox(["ok", "bad"])
+    first, queued = StubQuery(), StubQuery()
+
+    async def main():
+        task = asyncio.create_task(cb._process_serialized(first, check(cb, "ok")))
+        await asyncio.sleep(0)
+        await cb._process_serialized(queued, check(cb, "ok"))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert queued.answers == 1
+    assert cb._flight is None
@@ -0,0 +1,49 @@
+import pytest
+
+from aiogramx import Calendar, shard_of
+from aiogramx.base import WidgetBase
+from aiogramx.keys import KeyAllocator
+from aiogramx.sharding import shard_prefix
+
+
+@pytest.fixture
+def sharded():
+    WidgetBase.set_shard(2, 4)
+    yield
+    WidgetBase._key_prefix = ""
+    Calendar.configure_storage(key_prefix="")
+
+
+def test_sharded_keys_are_routed(sharded):
+    cal = Calendar()
+    data = cal._codec.pack(action="IGNORE", key=cal._key)
+    assert shard_of(data, 4) == 2
+
+
+def test_keys_without_shard_prefix_are_not_routed():
+    cal = Calendar()
+    assert shard_of(cal._codec.pack(action="IGNORE", key=cal._key), 4) is None
+    # Random keys of other storages may start with any character
+    for key in ("abcd", "bxyz", "d012"):
+        assert shard_of(cal._codec.pack(action="IGNORE", key=key), 4) is None
+
+
+def test_restored_state_keeps_configured_prefix():
+    old = KeyAllocator(capacity=100, prefix=shard_prefix(1, 4))
+    issued = old.allocate()
+
+    keys = KeyAllocator(capacity=100, prefix=shard_prefix(3, 4))
+    keys.set_state(old.get_state())
+    assert keys.prefix == shard_prefix(3, 4)
+    assert keys.allocate().startswith(shard_prefix(3, 4))
+    assert not keys.is_stale(issued)
+
+
+def test_restored_state_with_same_prefix_resumes_counter():
+    old = KeyAllocator(capacity=100, prefix=shard_prefix(1, 4))
+    issued = old.allocate()
+
+    keys = KeyAllocator(capacity=100, prefix=shard_prefix(1, 4))
+    keys.set_state(old.get_state())
+    assert not keys.is_stale(issued)
+    assert keys.allocate() != issued
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram import Dispatcher
+
+from aiogramx import Calendar
+from aiogramx.base import WidgetBase
+from aiogramx.storage import SNAPSHOT_MAGIC, read_snapshot
+
+
+def startup(path) -> None:
+    dp = Dispatcher()
+    WidgetBase.setup_snapshot(dp, str(path))
+    asyncio.run(dp.emit_startup())
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "widgets.snapshot"
+    cal = Calendar()
+    WidgetBase.dump_storage(str(path))
+    Calendar._storage.delete_nowait(cal._key)
+
+    startup(path)
+    assert cal._key in Calendar._storage
+
+
+def test_widget_with_callbacks_is_expired_after_restore(tmp_path):
+    path = tmp_path / "widgets.snapshot"
+    selected = []
+
+    async def on_select(c, date):
+        selected.append(date)
+
+    cal = Calendar(on_select=on_select)
+    WidgetBase.dump_storage(str(path))
+    Calendar._storage.delete_nowait(cal._key)
+
+    startup(path)
+    assert cal._key not in Calendar._storage
+
+    answers = []
+
+    async def answer(text=None, **kwargs):
+        answers.append(text)
+
+    click = SimpleNamespace(
+        answer=answer,
+        from_user=SimpleNamespace(id=1, language_code="en"),
+        message=None,
+    )
+    data = cal._codec.unpack(
+        cal._codec.pack(action="DAY", year=2025, month=1, day=2, key=cal._key)
+    )
+    asyncio.run(Calendar._dispatch_cb(click, data))
+    assert answers == [Calendar.get_expired_text("en")]
+    assert not selected
+
+
+def test_snapshot_of_another_python_version_is_rejected(tmp_path):
+    path = tmp_path / "widgets.snapshot"
+    Calendar()
+    WidgetBase.dump_storage(str(path))
+    data = bytearray(path.read_bytes())
+    data[len(SNAPSHOT_MAGIC) + 3] ^= 0xFF  # minor Python version
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+
+
+@pytest.mark.parametrize("tail", [b"", b"\xff\x00garbage"])
+def test_unreadable_snapshot_starts_empty(tmp_path, caplog, tail):
+    path = tmp_path / "widgets.snapshot"
+    Calendar()
+    WidgetBase.dump_storage(str(path))
+    header = path.read_bytes()[: len(SNAPSHOT_MAGIC) + 4]
+    path.write_bytes(header + tail)
+
+    startup(path)
+    assert "Cannot restore widgets" in caplog.text
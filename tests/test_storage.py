@@ -0,0 +1,261 @@
+import asyncio
+
+import pytest
+
+from aiogramx import Checkbox
+from aiogramx.storage import (
+    MemoryStorage,
+    SQLiteStorage,
+    SharedMemoryStorage,
+    fcntl,
+)
+
+
+class Item:
+    """Stands in for a widget, memory storages keep any object."""
+
+    _owner = None
+
+    def __init__(self, message=None):
+        self._message = message
+
+
+def test_live_widget_is_not_stale_after_generation_cycle():
+    storage = MemoryStorage(max_items=4)
+    hot = storage.allocate_key()
+    storage.set_nowait(hot, Item())
+
+    # Walk the counter over the whole slot space while the widget stays stored
+    for _ in range(storage.keys.space):
+        storage.allocate_key()
+
+    assert storage.keys.is_stale(hot)
+    assert hot in storage
+    assert not storage.is_stale(hot)
+
+
+def test_widget_moves_to_clicked_message():
+    storage = MemoryStorage(per_message=True)
+    key = storage.allocate_key()
+    item = Item(message=(1, 100))
+    storage.set_nowait(key, item)
+
+    # Clicked on the message it was actually sent in, then saved again
+    item._message = (1, 200)
+    storage.set_nowait(key, item)
+    assert storage.key_for_message((1, 100)) is None
+    assert storage.key_for_message((1, 200)) == key
+
+
+def test_evicted_key_is_stale():
+    storage = MemoryStorage(max_items=1)
+    old = storage.allocate_key()
+    storage.set_nowait(old, Item())
+    storage.set_nowait(storage.allocate_key(), Item())
+    for _ in range(storage.keys.space):
+        storage.allocate_key()
+
+    assert old not in storage
+    assert storage.is_stale(old)
+
+
+def test_sqlite_workers_see_each_other_updates(tmp_path):
+    path = str(tmp_path / "widgets.db")
+    first, second = SQLiteStorage(path), SQLiteStorage(path)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    cb = Checkbox(["a", "b"])
+    first.set_nowait(cb._key, cb)
+
+    # Another worker toggles the first option
+    other = second.get_nowait(cb._key)
+    other._selected ^= 0b01
+    second.set_nowait(cb._key, other)
+
+    # This worker refreshes its cached instance before toggling the second one
+    mine = first.get_nowait(cb._key)
+    assert mine is cb
+    mine._selected ^= 0b10
+    first.set_nowait(cb._key, mine)
+
+    assert second.get_nowait(cb._key)._selected == 0b11
+    first.close()
+    second.close()
+
+
+def test_sqlite_delete_by_another_worker(tmp_path):
+    path = str(tmp_path / "widgets.db")
+    first, second = SQLiteStorage(path), SQLiteStorage(path)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    cb = Checkbox(["a"])
+    first.set_nowait(cb._key, cb)
+    second.delete_nowait(cb._key)
+
+    assert cb._key not in first
+    assert first.get_nowait(cb._key) is None
+    first.close()
+    second.close()
+
+
+def test_sqlite_restores_widget_after_restart(tmp_path):
+    path = str(tmp_path / "widgets.db")
+    storage = SQLiteStorage(path)
+    storage.bind(Checkbox)
+    cb = Checkbox(["a", "b"])
+    cb._selected = 0b10
+    storage.set_nowait(cb._key, cb)
+    storage.close()
+
+    storage = SQLiteStorage(path)
+    storage.bind(Checkbox)
+    restored = storage.get_nowait(cb._key)
+    assert restored is not cb
+    assert restored._selected == 0b10
+    assert len(storage) == 1
+    storage.close()
+
+
+def test_sqlite_widget_with_callbacks_is_not_restored_without_them(tmp_path):
+    path = str(tmp_path / "widgets.db")
+    first, second = SQLiteStorage(path), SQLiteStorage(path)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    async def on_select(c, data):
+        pass
+
+    cb = Checkbox(["a"], on_select=on_select)
+    first.set_nowait(cb._key, cb)
+
+    # Another worker cannot call the handler, so the widget is expired there
+    assert second.get_nowait(cb._key) is None
+    assert first.get_nowait(cb._key) is cb
+    first.close()
+    second.close()
+
+
+def test_sqlite_stale_copy_does_not_overwrite_newer_state(tmp_path):
+    path = str(tmp_path / "widgets.db")
+    first, second = SQLiteStorage(path), SQLiteStorage(path)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    cb = Checkbox(["a", "b"])
+    first.set_nowait(cb._key, cb)
+    other = second.get_nowait(cb._key)
+    other._selected ^= 0b01
+    second.set_nowait(cb._key, other)
+
+    # Saved without refreshing the cached instance first
+    cb._selected ^= 0b10
+    first.set_nowait(cb._key, cb)
+
+    assert cb._selected == 0b01
+    assert second.get_nowait(cb._key)._selected == 0b01
+    first.close()
+    second.close()
+
+
+def test_sqlite_lease_serializes_clicks_of_workers(tmp_path):
+    path = str(tmp_path / "widgets.db")
+    first, second = SQLiteStorage(path), SQLiteStorage(path)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+    cb = Checkbox(["a", "b"])
+    first.set_nowait(cb._key, cb)
+
+    async def click(storage, bit):
+        async with storage.lock(cb._key):
+            widget = await storage.get(cb._key)
+            await asyncio.sleep(0.05)
+            widget._selected ^= bit
+            await storage.set(cb._key, widget)
+
+    async def main():
+        await asyncio.gather(click(first, 0b01), click(second, 0b10))
+
+    asyncio.run(main())
+    assert first.get_nowait(cb._key)._selected == 0b11
+    first.close()
+    second.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="requires POSIX file locks")
+def test_shared_memory_workers_see_each_other_updates(tmp_path):
+    path = str(tmp_path / "widgets.shm")
+    first = SharedMemoryStorage(path, slots=64)
+    second = SharedMemoryStorage(path, slots=64)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    cb = Checkbox(["a", "b"])
+    first.set_nowait(cb._key, cb)
+    other = second.get_nowait(cb._key)
+    other._selected ^= 0b01
+    second.set_nowait(cb._key, other)
+
+    assert first.get_nowait(cb._key) is cb
+    assert cb._selected == 0b01
+    first.close()
+    second.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="requires POSIX file locks")
+def test_shared_memory_version_survives_slot_reuse(tmp_path):
+    path = str(tmp_path / "widgets.shm")
+    first = SharedMemoryStorage(path, slots=64)
+    second = SharedMemoryStorage(path, slots=64)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    cb = Checkbox(["a", "b"])
+    first.set_nowait(cb._key, cb)
+    other = second.get_nowait(cb._key)
+
+    # Deleted and saved again, the slot starts over
+    second.delete_nowait(cb._key)
+    other._selected = 0b01
+    second.set_nowait(cb._key, other)
+
+    assert first.get_nowait(cb._key) is cb
+    assert cb._selected == 0b01
+    first.close()
+    second.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="requires POSIX file locks")
+def test_shared_memory_allocated_key_is_reserved(tmp_path):
+    path = str(tmp_path / "widgets.shm")
+    first = SharedMemoryStorage(path, slots=64)
+    second = SharedMemoryStorage(path, slots=64)
+    first.bind(Checkbox)
+    second.bind(Checkbox)
+
+    key = first.allocate_key()
+    # Taken for other processes, but not a widget yet
+    assert key in second
+    assert second.get_nowait(key) is None
+    assert len(second) == 0
+
+    cb = Checkbox(["a"])
+    first.set_nowait(key, cb)
+    assert second.get_nowait(key)._key == key
+    assert len(second) == 1
+    first.close()
+    second.close()
+
+
+def test_memory_storage_evicts_least_recently_used():
+    storage = MemoryStorage(max_items=2)
+    keys = [storage.allocate_key() for _ in range(3)]
+    storage.set_nowait(keys[0], Item())
+    storage.set_nowait(keys[1], Item())
+    storage.get_nowait(keys[0])
+    storage.set_nowait(keys[2], Item())
+
+    assert keys[0] in storage
+    assert keys[1] not in storage
+    assert len(storage) == 2
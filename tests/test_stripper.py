@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import EditMessageReplyMarkup
+
+from aiogramx import Calendar
+from aiogramx.base import WidgetBase
+from aiogramx.context import WidgetContext, _current_context
+from aiogramx.stripper import KeyboardStripper
+
+MESSAGE = (100, 10)
+
+
+class StubBot:
+    """Records keyboard removals, failing for chats listed in `forbidden`."""
+
+    def __init__(self, forbidden=()):
+        self.forbidden = set(forbidden)
+        self.stripped = []
+
+    async def edit_message_reply_markup(self, chat_id, message_id, reply_markup):
+        if chat_id in self.forbidden:
+            raise TelegramForbiddenError(
+                EditMessageReplyMarkup(chat_id=chat_id, message_id=message_id),
+                "bot was blocked by the user",
+            )
+        self.stripped.append((chat_id, message_id))
+
+
+class StubQuery:
+    """Click on a widget message, answered silently."""
+
+    data = None
+
+    def __init__(self, chat_id: int, message_id: int):
+        self.message = SimpleNamespace(
+            chat=SimpleNamespace(id=chat_id), message_id=message_id
+        )
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+def widget(message=MESSAGE):
+    return SimpleNamespace(_message=message)
+
+
+def test_evicted_widget_message_is_recorded():
+    stripper = KeyboardStripper(StubBot())
+    stripper.bind(MESSAGE, "cal")
+    stripper.on_evict("cal", widget(), "capacity")
+    assert MESSAGE in stripper._pending
+
+
+def test_message_taken_over_by_another_widget_is_kept():
+    stripper = KeyboardStripper(StubBot())
+    stripper.bind(MESSAGE, "cal")
+    # A checkbox now shows on the calendar message and got clicked there
+    stripper.bind(MESSAGE, "chk")
+    stripper.on_evict("cal", widget(), "capacity")
+    assert len(stripper) == 0
+
+
+def test_unbind_keeps_binding_of_another_widget():
+    stripper = KeyboardStripper(StubBot())
+    stripper.bind(MESSAGE, "chk")
+    stripper.unbind(MESSAGE, "cal")
+    stripper.on_evict("chk", widget(), "capacity")
+    assert MESSAGE in stripper._pending
+
+
+def test_widget_created_from_menu_is_bound_on_click():
+    stripper = KeyboardStripper(StubBot())
+    WidgetBase._stripper = stripper
+    # Created while handling a click on a menu message, and sent in a new message
+    token = _current_context.set(WidgetContext(chat_id=1, user_id=1, message_id=100))
+    try:
+        cal = Calendar()
+    finally:
+        _current_context.reset(token)
+
+    try:
+        stripper.on_evict(cal._key, cal, "capacity")
+        assert len(stripper) == 0
+
+        data = cal._codec.unpack(cal._codec.pack(action="IGNORE", key=cal._key))
+        asyncio.run(cal._process_click(StubQuery(1, 200), data))
+        assert cal._message == (1, 200)
+
+        stripper.on_evict(cal._key, cal, "capacity")
+        assert list(stripper._pending) == [(1, 200)]
+    finally:
+        WidgetBase._stripper = None
+
+
+def test_unbound_message_is_not_recorded():
+    stripper = KeyboardStripper(StubBot())
+    stripper.on_evict("cal", widget(), "capacity")
+    assert len(stripper) == 0
+
+
+def test_strip_continues_after_api_error():
+    bot = StubBot(forbidden={1})
+    stripper = KeyboardStripper(bot, calls_per_tick=5)
+    stripper.record((1, 1))
+    stripper.record((2, 2))
+
+    assert asyncio.run(stripper.strip_once()) == 2
+    assert bot.stripped == [(2, 2)]
+    assert stripper.stripped == 1
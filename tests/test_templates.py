@@ -0,0 +1,21 @@
+import pytest
+
+from aiogramx import Calendar, Checkbox
+from aiogramx.templates import TEMPLATE_SEP
+
+
+def test_template_widget_is_rebuilt_under_its_key():
+    template = Calendar.template("tests.calendar")
+    widget = template.create()
+    assert TEMPLATE_SEP in widget._key
+
+    Calendar._storage.delete_nowait(widget._key)
+    rebuilt = Calendar._rehydrate(widget._key)
+    assert rebuilt is not None
+    assert rebuilt is not widget
+    assert rebuilt._key == widget._key
+
+
+def test_checkbox_cannot_be_templated():
+    with pytest.raises(TypeError):
+        Checkbox.template("tests.checkbox", options=["a", "b"])
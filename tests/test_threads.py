@@ -0,0 +1,66 @@
+import sys
+import threading
+
+from aiogramx.base import intern_config
+from aiogramx.checkbox import CheckboxConfig
+from aiogramx.expired import ExpiredClickCache
+from benchmarks.stress_threads import run
+
+
+def hammer(threads: int, target) -> list:
+    """Runs `target(idx)` in threads with a tiny switch interval, returns raised errors."""
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def wrapper(idx: int):
+        barrier.wait()
+        try:
+            target(idx)
+        except Exception as e:  # reported by the test
+            errors.append(e)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        pool = [threading.Thread(target=wrapper, args=(i,)) for i in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    return errors
+
+
+def test_striped_storage_under_threads():
+    assert run(threads=4, number=500, storage="striped", stripes=4) == 0
+
+
+def test_configs_are_interned_once_across_threads():
+    configs = [
+        CheckboxConfig(((f"{i}", f"Option {i}"),), False, True, "en", "Back", "Done")
+        for i in range(2000)
+    ]
+    interned = [[] for _ in range(4)]
+
+    def target(idx: int):
+        for config in configs:
+            # An equal but distinct object must give back the shared one
+            interned[idx].append(intern_config(config._replace()))
+
+    assert hammer(4, target) == []
+    for shared in zip(*interned):
+        assert all(config is shared[0] for config in shared)
+
+
+def test_expired_cache_across_threads():
+    cache = ExpiredClickCache(max_keys=64, max_chats=64, ttl=0)
+
+    def target(idx: int):
+        for i in range(2000):
+            cache.add("scope", f"{idx}-{i % 100}")
+            cache.is_known("scope", f"{idx}-{i % 100}")
+            cache.allow_strip(i % 100)
+
+    assert hammer(4, target) == []
+    assert len(cache._keys) <= 64
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from aiogramx import Checkbox
+from aiogramx.storage import MemoryStorage
+
+
+class Item:
+    """Stands in for a widget, memory storages keep any object."""
+
+    _owner = _message = None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_idle_widget_expires_on_lookup(clock):
+    storage = MemoryStorage(ttl=10)
+    key = storage.allocate_key()
+    storage.set_nowait(key, Item())
+
+    clock[0] += 5
+    assert storage.get_nowait(key) is not None
+    # The lookup counts as use
+    clock[0] += 8
+    assert storage.get_nowait(key) is not None
+    clock[0] += 11
+    assert storage.get_nowait(key) is None
+    assert key not in storage
+
+
+def test_touch_keeps_widget_alive(clock):
+    storage = MemoryStorage(ttl=10)
+    key = storage.allocate_key()
+    storage.set_nowait(key, Item())
+
+    clock[0] += 9
+    storage.touch_nowait(key)
+    clock[0] += 9
+    assert storage.get_nowait(key) is not None
+
+
+def test_sweep_drops_only_expired_widgets(clock):
+    storage = MemoryStorage(ttl=10)
+    old = [storage.allocate_key() for _ in range(3)]
+    for key in old:
+        storage.set_nowait(key, Item())
+    clock[0] += 6
+    fresh = storage.allocate_key()
+    storage.set_nowait(fresh, Item())
+
+    clock[0] += 6
+    assert storage.sweep() == 3
+    assert list(storage) == [fresh]
+
+
+def test_writes_sweep_a_few_expired_widgets(clock):
+    storage = MemoryStorage(ttl=10)
+    for _ in range(5):
+        storage.set_nowait(storage.allocate_key(), Item())
+
+    clock[0] += 11
+    storage.set_nowait(storage.allocate_key(), Item())
+    assert len(storage) == 6 - MemoryStorage._SWEEP_STEP
+
+
+def test_expiry_can_be_enabled_and_disabled(clock):
+    storage = MemoryStorage()
+    key = storage.allocate_key()
+    storage.set_nowait(key, Item())
+    assert storage.sweep() == 0
+
+    storage.configure(ttl=10)
+    clock[0] += 11
+    assert storage.sweep() == 1
+
+    key = storage.allocate_key()
+    storage.set_nowait(key, Item())
+    storage.configure(ttl=0)
+    clock[0] += 100
+    assert storage.get_nowait(key) is not None
+
+
+def test_class_ttl_applies_to_its_widgets(clock):
+    class ShortLived(Checkbox, ttl=10):
+        __slots__ = ()
+
+    widgets = [ShortLived(["a"]) for _ in range(3)]
+    clock[0] += 11
+    assert ShortLived.sweep_storage() == 3
+    assert all(ShortLived._storage.get_nowait(w._key) is None for w in widgets)
@@ -0,0 +1,94 @@
+import sys
+
+import pytest
+from aiogram.types import InlineKeyboardButton
+
+from aiogramx import (
+    Calendar,
+    Checkbox,
+    Paginator,
+    TimeSelectorGrid,
+    TimeSelectorModern,
+)
+from aiogramx.base import WidgetBase
+from benchmarks.memory import BUDGETS, FACTORIES
+
+
+def buttons(n: int):
+    return [
+        InlineKeyboardButton(text=str(i), callback_data=f"item {i}") for i in range(n)
+    ]
+
+
+WIDGETS = [
+    lambda: Calendar(),
+    lambda: Checkbox(["a", "b", "c"]),
+    lambda: Paginator(per_page=5, data=buttons(20)),
+    lambda: TimeSelectorGrid(),
+    lambda: TimeSelectorModern(),
+]
+
+
+@pytest.mark.parametrize("make", WIDGETS)
+def test_builtin_widgets_have_no_instance_dict(make):
+    widget = make()
+    assert not hasattr(widget, "__dict__")
+
+
+def instance_size(widget, other) -> int:
+    """
+    Returns bytes held by a widget alone: the object itself, plus its attribute values that are
+    not shared with `other`, an equally configured widget.
+    """
+    size = sys.getsizeof(widget)
+    values = dict(getattr(widget, "__dict__", {}))
+    if values:
+        size += sys.getsizeof(widget.__dict__)
+    for klass in type(widget).__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if not name.startswith("__"):
+                values[name] = getattr(widget, name, None)
+    for name, value in values.items():
+        if value is not None and value is not getattr(other, name, None):
+            size += sys.getsizeof(value)
+    return size
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_widget_size_is_within_budget(name):
+    widget_cls, make = FACTORIES[name]
+    widget, other = make(widget_cls), make(widget_cls)
+    assert instance_size(widget, other) <= BUDGETS[name]
+
+
+@pytest.mark.parametrize("make", WIDGETS)
+def test_equal_configs_are_shared(make):
+    assert make()._config is make()._config
+
+
+def test_checkbox_bitmask_round_trips():
+    cb = Checkbox({"a": None, "b": {"text": "B", "flag": True}, "c": {"flag": True}})
+    assert cb._selected == 0b110
+    assert cb._options == {
+        "a": {"text": "a", "flag": False},
+        "b": {"text": "B", "flag": True},
+        "c": {"text": "c", "flag": True},
+    }
+
+    restored = WidgetBase.load_state("Checkbox", cb._key, cb.dump_state())
+    assert restored._selected == cb._selected
+    assert restored._options == cb._options
+    assert restored._config is cb._config
+
+
+def test_config_field_assignment_affects_one_widget():
+    first, second = Calendar(lang="en"), Calendar(lang="en")
+    first.lang = "ru"
+
+    assert first.lang == "ru"
+    assert second.lang == "en"
+    assert first._config is not second._config
+
+    second.lang = "ru"
+    assert second._config is first._config